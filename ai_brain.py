@@ -10,122 +10,294 @@ import re
 from collections import defaultdict, deque
 import pickle
 import hashlib
+import threading
+from collections import OrderedDict
+from itertools import islice
+from autosave import AUTOSAVE
+from brain_actor import BrainActor
+from brain_journal import BrainJournal
+from conversation_store import ConversationStore
+from pattern_store import PatternStore
+from sentiment import SentimentLexicon
+
+TOKEN_PATTERN = re.compile(r'\b\w+\b')
+
+
+class TextFeatures:
+    """Everything the brain derives from one piece of text, computed in a single pass"""
+    
+    __slots__ = ('text', 'lower', 'tokens', 'pattern_key', 'sentiment', 'command_type', 'response_class')
+    
+    def __init__(self, text, lower, tokens, pattern_key, sentiment, command_type, response_class):
+        self.text = text
+        self.lower = lower
+        self.tokens = tokens
+        self.pattern_key = pattern_key
+        self.sentiment = sentiment
+        self.command_type = command_type
+        self.response_class = response_class
+
+
+class BrainSnapshot:
+    """Immutable view of brain state published by the writer; safe to read from any thread"""
+    
+    __slots__ = ('preferences', 'profile', 'recent', 'memory_entries')
+    
+    def __init__(self, preferences, profile, recent, memory_entries):
+        self.preferences = preferences
+        self.profile = profile
+        self.recent = recent  # Tuple of the last few memory entries, oldest first
+        self.memory_entries = memory_entries
+
 
 class AIBrain:
+    ANALYSIS_CACHE_SIZE = 256  # Recent texts whose features are memoized
+    SNAPSHOT_TURNS = 10  # Recent memory entries carried in each published snapshot
+    
     def __init__(self, data_dir="jarvis_data"):
         self.data_dir = data_dir
         self.ensure_data_directory()
         
-        # Memory systems
+        # Memory systems (owned by the writer thread; other threads read self.snapshot)
         self.conversation_memory = deque(maxlen=100)  # Recent conversations
-        self.user_preferences = {}
-        self.learned_patterns = defaultdict(list)
+        # Every turn is also persisted and full-text indexed; the deque is a warm tail of it
+        self.conversation_history = ConversationStore(os.path.join(self.data_dir, "conversations.db"))
+        self._preferences = {}
+        # Learned patterns live in SQLite and are queried on demand, never loaded wholesale
+        self.learned_patterns = PatternStore(os.path.join(self.data_dir, "patterns.db"))
         self.context_stack = []
-        self.user_profile = {}
+        self._profile = {}
         
-        # Load existing data
-        self.load_brain_data()
+        # Changes are journaled as they happen and compacted into a snapshot in the background
+        self.journal = BrainJournal(self.data_dir)
         
-        # Sentiment keywords
-        self.positive_words = ['good', 'great', 'excellent', 'awesome', 'perfect', 'love', 'like', 'happy', 'pleased']
-        self.negative_words = ['bad', 'terrible', 'awful', 'hate', 'dislike', 'angry', 'frustrated', 'annoyed']
+        # Weighted sentiment lexicon; drop a "term<TAB>weight" file in the data directory to extend it
+        self.sentiment_lexicon = SentimentLexicon.load(os.path.join(self.data_dir, "sentiment_lexicon.txt"))
         
+        # The main loop, GUI and brain all look at the same command; analyze it once
+        self._analysis_cache = OrderedDict()
+        self._analysis_lock = threading.Lock()
+        
+        # All mutations run in order on one writer thread, which republishes the snapshot after each batch
+        self.snapshot = BrainSnapshot({}, {}, (), 0)
+        self.actor = BrainActor(publish=self.publish_snapshot)
+        
+        # Load existing data
+        self.actor.call(self.load_brain_data)
+    
     def ensure_data_directory(self):
         """Create data directory if it doesn't exist"""
         if not os.path.exists(self.data_dir):
             os.makedirs(self.data_dir)
     
     def load_brain_data(self):
-        """Load saved brain data"""
+        """Load the latest snapshot and replay the journal on top of it"""
+        try:
+            self.conversation_memory.extend(self.conversation_history.recent(self.conversation_memory.maxlen))
+        except Exception as e:
+            print(f"Error loading conversation history: {e}")
+        try:
+            state, records = self.journal.load()
+            if state is None:
+                migrated = self.load_legacy_data()
+            else:
+                self._preferences = state.get('preferences', {})
+                self._profile = state.get('profile', {})
+                # Snapshots written before the pattern store still carry patterns
+                migrated = bool(state.get('patterns'))
+                self.learned_patterns.import_patterns(state.get('patterns', {}), marker='snapshot_patterns')
+            for record in records:
+                self.apply_change(record)
+            if migrated:
+                self.save_brain_data()
+        except Exception as e:
+            print(f"Error loading brain data: {e}")
+    
+    def load_legacy_data(self):
+        """Load data saved by older versions (full rewrites of three files); True if anything was found"""
+        found = False
         try:
             # Load user preferences
             pref_file = os.path.join(self.data_dir, "preferences.json")
             if os.path.exists(pref_file):
                 with open(pref_file, 'r') as f:
-                    self.user_preferences = json.load(f)
+                    self._preferences = json.load(f)
+                found = True
             
             # Load user profile
             profile_file = os.path.join(self.data_dir, "user_profile.json")
             if os.path.exists(profile_file):
                 with open(profile_file, 'r') as f:
-                    self.user_profile = json.load(f)
+                    self._profile = json.load(f)
+                found = True
             
             # Load learned patterns
             patterns_file = os.path.join(self.data_dir, "patterns.pkl")
             if os.path.exists(patterns_file):
                 with open(patterns_file, 'rb') as f:
-                    self.learned_patterns = pickle.load(f)
+                    # One-time migration: the full history is folded into rolling statistics
+                    self.learned_patterns.import_patterns(pickle.load(f), marker='legacy_patterns_pkl')
+                found = True
                     
         except Exception as e:
             print(f"Error loading brain data: {e}")
+        return found
+    
+    @property
+    def user_preferences(self):
+        """Preferences as of the latest published snapshot (read-only)"""
+        return self.snapshot.preferences
+    
+    @property
+    def user_profile(self):
+        """Usage profile as of the latest published snapshot (read-only)"""
+        return self.snapshot.profile
+    
+    def publish_snapshot(self):
+        """Copy writer-owned state into a fresh snapshot (runs on the writer after each batch)"""
+        self.snapshot = BrainSnapshot(
+            dict(self._preferences),
+            {key: dict(value) if isinstance(value, dict) else value for key, value in self._profile.items()},
+            tuple(islice(reversed(self.conversation_memory), self.SNAPSHOT_TURNS))[::-1],
+            len(self.conversation_memory)
+        )
     
     def save_brain_data(self):
-        """Save brain data to files"""
+        """Compact the journal into a fresh snapshot, after every change queued so far"""
+        self.actor.call(self._compact)
+    
+    def _compact(self):
         try:
-            # Save preferences
-            with open(os.path.join(self.data_dir, "preferences.json"), 'w') as f:
-                json.dump(self.user_preferences, f, indent=2)
-            
-            # Save user profile
-            with open(os.path.join(self.data_dir, "user_profile.json"), 'w') as f:
-                json.dump(self.user_profile, f, indent=2)
-            
-            # Save patterns
-            with open(os.path.join(self.data_dir, "patterns.pkl"), 'wb') as f:
-                pickle.dump(dict(self.learned_patterns), f)
-                
+            self.journal.compact({
+                'preferences': self._preferences,
+                'profile': self._profile
+            })
         except Exception as e:
             print(f"Error saving brain data: {e}")
     
-    def add_to_memory(self, user_input, jarvis_response, context=None):
-        """Add interaction to conversation memory"""
+    def close(self):
+        """Compact, stop the writer and release every file (profile eviction, shutdown)"""
+        self.save_brain_data()
+        self.actor.close()
+        self.journal.close()
+        self.learned_patterns.close()
+        self.conversation_history.close()
+    
+    def record_change(self, record):
+        """Queue a change for the writer, which applies and journals it (O(change) disk I/O)"""
+        return self.actor.submit(self._record, record)
+    
+    def _record(self, record):
+        self.apply_change(record)
+        try:
+            self.journal.append(record)
+            if self.journal.needs_compaction():
+                # The snapshot rewrite happens on the autosave worker, never on a command thread
+                AUTOSAVE.mark_dirty(self.journal.snapshot_path, self.save_brain_data)
+        except Exception as e:
+            print(f"Error saving brain data: {e}")
+    
+    def apply_change(self, record):
+        """Apply one journaled change; used both live and when replaying the journal"""
+        if record['op'] == 'preference':
+            self._preferences[record['key']] = record['value']
+        elif record['op'] == 'interaction':
+            # Older journals carried the pattern entry; entries still in the recent ring are skipped
+            if record.get('entry'):
+                self.learned_patterns.add(record['pattern'], record['entry'])
+            profile = self._profile
+            frequency = profile.setdefault('command_frequency', defaultdict(int))
+            frequency[record['command_type']] = frequency.get(record['command_type'], 0) + 1
+            hours = profile.setdefault('usage_hours', defaultdict(int))
+            hours[record['hour']] = hours.get(record['hour'], 0) + 1
+            profile['last_interaction'] = record['timestamp']
+            profile['total_interactions'] = profile.get('total_interactions', 0) + 1
+    
+    def analyze(self, text):
+        """Tokenize and classify text once; returns a memoized TextFeatures record"""
+        lower = text.lower()
+        with self._analysis_lock:
+            features = self._analysis_cache.get(lower)
+            if features is not None:
+                self._analysis_cache.move_to_end(lower)
+                return features
+        
+        tokens = TOKEN_PATTERN.findall(lower)
+        features = TextFeatures(
+            text,
+            lower,
+            tokens,
+            ' '.join(tokens[:2]) if len(tokens) > 1 else None,  # First two words as pattern
+            self.sentiment_lexicon.classify_tokens(tokens),
+            self._command_type(lower),
+            self._response_class(lower)
+        )
+        with self._analysis_lock:
+            self._analysis_cache[lower] = features
+            if len(self._analysis_cache) > self.ANALYSIS_CACHE_SIZE:
+                self._analysis_cache.popitem(last=False)
+        return features
+    
+    def add_to_memory(self, user_input, jarvis_response, context=None, command_type=None):
+        """Add interaction to conversation memory (queued; returns without waiting for disk)
+        
+        command_type overrides the keyword guess, e.g. 'history' for questions about past turns.
+        """
+        features = self.analyze(user_input)
+        now = datetime.datetime.now()
         memory_entry = {
-            'timestamp': datetime.datetime.now().isoformat(),
+            'timestamp': now.isoformat(),
             'user_input': user_input,
             'jarvis_response': jarvis_response,
-            'context': context or {},
-            'sentiment': self.analyze_sentiment(user_input)
+            'context': dict(context or {}),
+            'sentiment': features.sentiment,
+            'command_type': command_type or features.command_type
         }
+        return self.actor.submit(self._remember, memory_entry, now)
+    
+    def _remember(self, memory_entry, now):
         self.conversation_memory.append(memory_entry)
+        try:
+            self.conversation_history.append(memory_entry)
+        except Exception as e:
+            print(f"Error saving conversation history: {e}")
         
         # Learn from this interaction
-        self.learn_from_interaction(user_input, jarvis_response)
+        self._learn(memory_entry['user_input'], memory_entry['jarvis_response'], now)
     
     def analyze_sentiment(self, text):
-        """Simple sentiment analysis"""
-        text = text.lower()
-        positive_score = sum(1 for word in self.positive_words if word in text)
-        negative_score = sum(1 for word in self.negative_words if word in text)
-        
-        if positive_score > negative_score:
-            return 'positive'
-        elif negative_score > positive_score:
-            return 'negative'
-        else:
-            return 'neutral'
+        """Lexicon sentiment of text: positive, negative or neutral"""
+        return self.analyze(text).sentiment
     
     def learn_from_interaction(self, user_input, jarvis_response):
-        """Learn patterns from user interactions"""
+        """Learn patterns from user interactions (queued for the writer)"""
+        return self.actor.submit(self._learn, user_input, jarvis_response, datetime.datetime.now())
+    
+    def _learn(self, user_input, jarvis_response, now):
         # Extract keywords and patterns
-        words = re.findall(r'\b\w+\b', user_input.lower())
+        features = self.analyze(user_input)
         
-        # Learn command patterns
-        if len(words) > 1:
-            pattern_key = ' '.join(words[:2])  # First two words as pattern
-            if pattern_key not in self.learned_patterns:
-                self.learned_patterns[pattern_key] = []
-            self.learned_patterns[pattern_key].append({
-                'full_command': user_input,
-                'response_type': self.classify_response(jarvis_response),
-                'timestamp': datetime.datetime.now().isoformat()
-            })
+        # Learn command patterns (stored directly in the pattern database)
+        if features.pattern_key:
+            try:
+                self.learned_patterns.add(features.pattern_key, {
+                    'full_command': user_input,
+                    'response_type': self.classify_response(jarvis_response),
+                    'timestamp': now.isoformat()
+                })
+            except Exception as e:
+                print(f"Error saving learned pattern: {e}")
         
         # Update user profile
-        self.update_user_profile(user_input)
+        record = {'op': 'interaction'}
+        record.update(self.profile_update(user_input, now))
+        self._record(record)
     
     def classify_response(self, response):
         """Classify the type of response given"""
-        response_lower = response.lower()
+        return self.analyze(response).response_class
+    
+    def _response_class(self, response_lower):
         if any(word in response_lower for word in ['time', 'clock']):
             return 'time_query'
         elif any(word in response_lower for word in ['calculate', 'answer', 'result']):
@@ -139,26 +311,23 @@ class AIBrain:
     
     def update_user_profile(self, user_input):
         """Update user profile based on interactions"""
-        # Track command frequency
-        if 'command_frequency' not in self.user_profile:
-            self.user_profile['command_frequency'] = defaultdict(int)
-        
-        command_type = self.extract_command_type(user_input)
-        self.user_profile['command_frequency'][command_type] += 1
-        
-        # Track time patterns
-        current_hour = datetime.datetime.now().hour
-        if 'usage_hours' not in self.user_profile:
-            self.user_profile['usage_hours'] = defaultdict(int)
-        self.user_profile['usage_hours'][str(current_hour)] += 1
-        
-        # Update last interaction
-        self.user_profile['last_interaction'] = datetime.datetime.now().isoformat()
-        self.user_profile['total_interactions'] = self.user_profile.get('total_interactions', 0) + 1
+        record = {'op': 'interaction'}
+        record.update(self.profile_update(user_input, datetime.datetime.now()))
+        return self.record_change(record)
+    
+    def profile_update(self, user_input, now):
+        """Profile fields of an interaction record: command type, hour and timestamp"""
+        return {
+            'command_type': self.extract_command_type(user_input),
+            'hour': str(now.hour),
+            'timestamp': now.isoformat()
+        }
     
     def extract_command_type(self, user_input):
         """Extract the type of command from user input"""
-        user_input = user_input.lower()
+        return self.analyze(user_input).command_type
+    
+    def _command_type(self, user_input):
         if any(word in user_input for word in ['time', 'clock']):
             return 'time'
         elif any(word in user_input for word in ['calculate', 'math', '+', '-', '*', '/']):
@@ -178,12 +347,10 @@ class AIBrain:
         recent_context = self.get_recent_context()
         
         # Check for learned patterns
-        words = re.findall(r'\b\w+\b', user_input.lower())
-        if len(words) >= 2:
-            pattern_key = ' '.join(words[:2])
-            if pattern_key in self.learned_patterns:
-                # User has used similar commands before
-                return self.generate_learned_response(pattern_key)
+        pattern_key = self.analyze(user_input).pattern_key
+        if pattern_key and pattern_key in self.learned_patterns:
+            # User has used similar commands before
+            return self.generate_learned_response(pattern_key)
         
         # Check user preferences
         preferred_response_style = self.user_preferences.get('response_style', 'formal')
@@ -193,22 +360,36 @@ class AIBrain:
     
     def get_recent_context(self):
         """Get context from recent conversations"""
-        if len(self.conversation_memory) < 2:
+        if self.snapshot.memory_entries < 2:
             return None
         
-        recent = list(self.conversation_memory)[-3:]  # Last 3 interactions
+        recent = self.recent_turns(3)  # Last 3 interactions
         return {
             'recent_topics': [entry['context'] for entry in recent if entry.get('context')],
             'recent_sentiment': [entry['sentiment'] for entry in recent],
-            'recent_commands': [self.extract_command_type(entry['user_input']) for entry in recent]
+            'recent_commands': [entry.get('command_type') or self.extract_command_type(entry['user_input']) for entry in recent]
         }
     
+    def recent_turns(self, count):
+        """Last count memory entries (up to SNAPSHOT_TURNS), oldest first, from the published snapshot"""
+        return list(self.snapshot.recent[-count:]) if count > 0 else []
+    
+    def search_history(self, query, since=None, until=None, limit=10):
+        """Past turns whose input contains every word of query, newest first
+        
+        Earlier history questions are left out, so asking again still finds the real turns.
+        """
+        try:
+            return self.conversation_history.search(query, since, until, limit, exclude_types=('history',))
+        except Exception as e:
+            print(f"Error searching conversation history: {e}")
+            return []
+    
     def generate_learned_response(self, pattern_key):
         """Generate response based on learned patterns"""
-        patterns = self.learned_patterns[pattern_key]
-        most_recent = max(patterns, key=lambda x: x['timestamp'])
+        most_recent = self.learned_patterns.most_recent(pattern_key)
         
-        response_type = most_recent['response_type']
+        response_type = most_recent['response_type'] if most_recent else None
         
         learned_responses = {
             'time_query': "I notice you often ask about time. The current time is available, sir.",
@@ -222,14 +403,16 @@ class AIBrain:
     def generate_personalized_response(self, user_input, context, style):
         """Generate personalized response based on user profile"""
         # Get user's most common command type
-        if 'command_frequency' in self.user_profile:
-            most_used = max(self.user_profile['command_frequency'].items(), key=lambda x: x[1])[0]
+        profile = self.user_profile
+        if profile.get('command_frequency'):
+            most_used = max(profile['command_frequency'].items(), key=lambda x: x[1])[0]
         else:
             most_used = 'general'
         
         # Personalized greetings based on usage patterns
-        if any(word in user_input.lower() for word in ['hello', 'hi', 'hey']):
-            total_interactions = self.user_profile.get('total_interactions', 0)
+        lower = self.analyze(user_input).lower
+        if any(word in lower for word in ['hello', 'hi', 'hey']):
+            total_interactions = profile.get('total_interactions', 0)
             if total_interactions > 50:
                 return "Welcome back, sir. I've learned quite a bit about your preferences."
             elif total_interactions > 10:
@@ -251,9 +434,10 @@ class AIBrain:
         suggestions = []
         
         # Time-based suggestions
+        profile = self.user_profile
         current_hour = datetime.datetime.now().hour
-        if 'usage_hours' in self.user_profile:
-            if str(current_hour) in self.user_profile['usage_hours']:
+        if 'usage_hours' in profile:
+            if str(current_hour) in profile['usage_hours']:
                 if current_hour < 12:
                     suggestions.append("Good morning, sir. Would you like me to check your schedule?")
                 elif current_hour < 18:
@@ -262,8 +446,8 @@ class AIBrain:
                     suggestions.append("Good evening, sir. Shall I help you wrap up today's tasks?")
         
         # Command-based suggestions
-        if 'command_frequency' in self.user_profile:
-            most_used = max(self.user_profile['command_frequency'].items(), key=lambda x: x[1])
+        if profile.get('command_frequency'):
+            most_used = max(profile['command_frequency'].items(), key=lambda x: x[1])
             if most_used[0] == 'calculation':
                 suggestions.append("I notice you use calculations frequently. I'm ready for math problems.")
             elif most_used[0] == 'search':
@@ -272,9 +456,8 @@ class AIBrain:
         return suggestions
     
     def set_user_preference(self, key, value):
-        """Set user preference"""
-        self.user_preferences[key] = value
-        self.save_brain_data()
+        """Set user preference (waits until the writer applied it, so a following get sees it)"""
+        self.record_change({'op': 'preference', 'key': key, 'value': value}).wait()
     
     def get_user_preference(self, key, default=None):
         """Get user preference"""
@@ -282,16 +465,17 @@ class AIBrain:
     
     def get_memory_summary(self):
         """Get summary of learned information"""
+        snapshot = self.snapshot
         summary = {
-            'total_interactions': self.user_profile.get('total_interactions', 0),
+            'total_interactions': snapshot.profile.get('total_interactions', 0),
             'learned_patterns': len(self.learned_patterns),
-            'preferences_set': len(self.user_preferences),
-            'memory_entries': len(self.conversation_memory)
+            'preferences_set': len(snapshot.preferences),
+            'memory_entries': snapshot.memory_entries
         }
         
-        if 'command_frequency' in self.user_profile:
+        if snapshot.profile.get('command_frequency'):
             summary['most_used_command'] = max(
-                self.user_profile['command_frequency'].items(), 
+                snapshot.profile['command_frequency'].items(), 
                 key=lambda x: x[1]
             )[0]
         
@@ -0,0 +1,109 @@
+"""
+L.U.F.F.Y Autosave - Shared background worker for debounced state persistence
+Components mark their state dirty instead of writing it; one worker thread waits
+out a short window (LUFFY_AUTOSAVE_DELAY seconds, default 2) so a burst of
+changes costs a single write, then runs each save off the command threads.
+Pending saves are flushed on shutdown and at interpreter exit
+"""
+
+import atexit
+import os
+import threading
+import time
+
+
+class Autosaver:
+    """Debounced save queue: mark_dirty(key, save) runs save() once per window per key"""
+    
+    def __init__(self, delay=2.0, name="luffy-autosave"):
+        self.delay = delay
+        self.name = name
+        self._dirty = {}  # key -> [save callable, deadline]
+        self._cond = threading.Condition()
+        # Saves never overlap, so two writers can't race on one temp file
+        self._write_lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+        self.requests = 0
+        self.writes = 0
+        self.failures = 0
+    
+    def mark_dirty(self, key, save):
+        """Schedule save() to run within delay seconds; marks before it runs are coalesced"""
+        with self._cond:
+            self.requests += 1
+            if self._closed:
+                inline = True
+            else:
+                inline = False
+                if key not in self._dirty:
+                    self._dirty[key] = [save, time.monotonic() + self.delay]
+                else:
+                    self._dirty[key][0] = save
+                self._start()
+                self._cond.notify()
+        if inline:
+            # After shutdown there is no worker left; write on the caller rather than lose the change
+            self._run_saves([(key, save)])
+    
+    def _start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._worker, name=self.name, daemon=True)
+            self._thread.start()
+            atexit.register(self.shutdown)
+    
+    def _worker(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        return
+                    now = time.monotonic()
+                    due = [key for key, (_, deadline) in self._dirty.items() if deadline <= now]
+                    if due:
+                        batch = [(key, self._dirty.pop(key)[0]) for key in due]
+                        break
+                    timeout = min((deadline for _, deadline in self._dirty.values()), default=None)
+                    self._cond.wait(None if timeout is None else timeout - now)
+            self._run_saves(batch)
+    
+    def _run_saves(self, batch):
+        with self._write_lock:
+            for key, save in batch:
+                try:
+                    save()
+                    self.writes += 1
+                except Exception as e:
+                    self.failures += 1
+                    print(f"Autosave error ({key}): {e}")
+                    # State mutated mid-serialization or a transient I/O error: try again next window
+                    with self._cond:
+                        if not self._closed and key not in self._dirty:
+                            self._dirty[key] = [save, time.monotonic() + self.delay]
+                            self._cond.notify()
+    
+    def pending(self):
+        with self._cond:
+            return len(self._dirty)
+    
+    def flush(self):
+        """Run every pending save now, on the calling thread"""
+        with self._cond:
+            batch = [(key, save) for key, (save, _) in self._dirty.items()]
+            self._dirty.clear()
+        self._run_saves(batch)
+    
+    def shutdown(self):
+        """Flush pending saves and stop the worker; later marks are written synchronously"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self.flush()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+    
+    def stats(self):
+        return {'requests': self.requests, 'writes': self.writes, 'failures': self.failures, 'pending': self.pending()}
+
+
+AUTOSAVE = Autosaver(delay=float(os.environ.get("LUFFY_AUTOSAVE_DELAY", "2.0")))
@@ -0,0 +1,130 @@
+"""
+L.U.F.F.Y Brain Actor - Single writer thread for brain state
+Every mutation is queued and run in order on one thread, so overlapping commands
+from the GUI, voice and scheduler threads can't interleave updates or journal
+writes. After each drained batch the owner publishes an immutable snapshot that
+readers use without taking a lock
+"""
+
+import atexit
+import queue
+import threading
+
+
+class WriteTicket:
+    """One queued mutation; wait() blocks until it ran and its batch was published"""
+    
+    __slots__ = ('func', 'args', 'done', 'result', 'error')
+    
+    def __init__(self, func, args):
+        self.func = func
+        self.args = args
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+    
+    def wait(self, timeout=None):
+        return self.done.wait(timeout)
+
+
+class BrainActor:
+    """Runs submitted functions one at a time on a dedicated thread, calling publish() after each batch"""
+    
+    def __init__(self, publish=None, name="luffy-brain"):
+        self.publish = publish
+        self._queue = queue.Queue()
+        self._closed = False
+        self._lock = threading.Lock()
+        # Serializes mutations that run on the caller once the writer has stopped
+        self._late_lock = threading.Lock()
+        self.batches = 0
+        self.mutations = 0
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+    
+    def on_writer_thread(self):
+        return threading.current_thread() is self._thread
+    
+    def submit(self, func, *args):
+        """Queue func(*args) without waiting; returns its WriteTicket"""
+        ticket = WriteTicket(func, args)
+        if self.on_writer_thread():
+            # A mutation made by another mutation runs in place
+            self._execute(ticket)
+            ticket.done.set()
+            return ticket
+        with self._lock:
+            if not self._closed:
+                self._queue.put(ticket)
+                return ticket
+        # After close: wait out the final batch, then run on the caller, still one at a time
+        self._thread.join()
+        with self._late_lock:
+            self._execute(ticket)
+            if self.publish is not None:
+                self.publish()
+        ticket.done.set()
+        return ticket
+    
+    def call(self, func, *args):
+        """Run func(*args) on the writer and return its result once the new state is published"""
+        ticket = self.submit(func, *args)
+        ticket.wait()
+        if ticket.error is not None:
+            raise ticket.error
+        return ticket.result
+    
+    def flush(self):
+        """Wait until every mutation queued so far has been applied and published"""
+        self.call(lambda: None)
+    
+    def _execute(self, ticket):
+        try:
+            ticket.result = ticket.func(*ticket.args)
+        except Exception as e:
+            ticket.error = e
+            print(f"Brain update error: {e}")
+        self.mutations += 1
+    
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            # Drain whatever else queued up so a burst is published once
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = False
+            for ticket in batch:
+                if ticket is None:
+                    stop = True
+                    continue
+                self._execute(ticket)
+            if self.publish is not None:
+                try:
+                    self.publish()
+                except Exception as e:
+                    print(f"Brain snapshot error: {e}")
+            self.batches += 1
+            for ticket in batch:
+                if ticket is not None:
+                    ticket.done.set()
+            if stop:
+                return
+    
+    def pending(self):
+        return self._queue.qsize()
+    
+    def close(self):
+        """Apply everything still queued and stop the writer thread"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        # Don't keep closed actors (and everything they reference) alive until exit
+        atexit.unregister(self.close)
+        if not self.on_writer_thread():
+            self._thread.join()
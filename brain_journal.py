@@ -0,0 +1,92 @@
+"""
+L.U.F.F.Y Brain Journal - Append-only change log with periodic snapshot compaction
+Every change is one JSON line appended to the journal (O(delta) disk I/O); the
+full state is only rewritten on compaction, through a temp file and an atomic
+rename, so a crash at any point leaves a loadable snapshot plus journal
+"""
+
+import json
+import os
+
+
+def atomic_write_text(path, text):
+    """Write text to path via a temp file and os.replace, so readers never see a partial file"""
+    temp_path = path + ".tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+class BrainJournal:
+    """Sequence-numbered change journal on top of an atomically replaced JSON snapshot"""
+    
+    def __init__(self, data_dir, name="brain", compact_every=500):
+        self.snapshot_path = os.path.join(data_dir, f"{name}_snapshot.json")
+        self.journal_path = os.path.join(data_dir, f"{name}_journal.log")
+        self.compact_every = compact_every
+        self.seq = 0
+        self.pending = 0  # Records appended since the last snapshot
+        self._file = None
+    
+    def load(self):
+        """Return (snapshot state or None, journal records newer than the snapshot)"""
+        state = None
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+            self.seq = snapshot.get('seq', 0)
+            state = snapshot.get('state')
+        
+        records = []
+        if os.path.exists(self.journal_path):
+            intact = 0
+            with open(self.journal_path, 'rb') as f:
+                for line in f:
+                    # A torn final line from a crash mid-append; everything before it is intact
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break
+                    intact += len(line)
+                    # Records already folded into the snapshot survive a crash between
+                    # snapshot replace and journal truncation; skip them by sequence number
+                    if record.get('seq', 0) > self.seq:
+                        records.append(record)
+                        self.seq = record['seq']
+            if intact < os.path.getsize(self.journal_path):
+                # Drop the torn tail so new appends start on a clean line
+                with open(self.journal_path, 'r+b') as f:
+                    f.truncate(intact)
+        self.pending = len(records)
+        return state, records
+    
+    def append(self, record):
+        """Stamp record with the next sequence number and append it to the journal"""
+        self.seq += 1
+        record['seq'] = self.seq
+        if self._file is None:
+            self._file = open(self.journal_path, 'a', encoding='utf-8')
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+        self.pending += 1
+        return record
+    
+    def needs_compaction(self):
+        return self.pending >= self.compact_every
+    
+    def compact(self, state):
+        """Write state as the new snapshot, then start an empty journal"""
+        atomic_write_text(self.snapshot_path, json.dumps({'seq': self.seq, 'state': state}))
+        if self._file is not None:
+            self._file.close()
+        self._file = open(self.journal_path, 'w', encoding='utf-8')
+        self.pending = 0
+    
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,91 @@
+"""
+L.U.F.F.Y Brain Profiles - Per-user AIBrain instances with lazy loading and LRU eviction
+A shared workstation keeps one brain per person under jarvis_data/profiles/<name>/;
+a profile is loaded the first time its user speaks, and once more than max_loaded
+are in memory the least recently used one is written back and closed
+"""
+
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from ai_brain import AIBrain
+
+DEFAULT_PROFILE = "default"  # Lives directly in the data directory, where single-user data always was
+
+
+def profile_key(name):
+    """Normalized profile name usable as a directory ("Wesley S." -> "wesley_s")"""
+    key = re.sub(r'[^a-z0-9_-]+', '_', (name or '').strip().lower()).strip('_')
+    return key or DEFAULT_PROFILE
+
+
+class BrainProfiles:
+    """LRU cache of AIBrain instances keyed by user; evicted brains are compacted and closed"""
+    
+    def __init__(self, data_dir="jarvis_data", max_loaded=4, brain_factory=AIBrain):
+        self.data_dir = data_dir
+        self.max_loaded = max_loaded
+        self.brain_factory = brain_factory
+        self._brains = OrderedDict()
+        # Held while loading or evicting so a profile is never opened twice
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.evictions = 0
+    
+    def profile_dir(self, name):
+        key = profile_key(name)
+        if key == DEFAULT_PROFILE:
+            return self.data_dir
+        return os.path.join(self.data_dir, "profiles", key)
+    
+    def get(self, name=DEFAULT_PROFILE):
+        """Brain for a user, loading it on first use and evicting the least recently used beyond the budget"""
+        key = profile_key(name)
+        with self._lock:
+            brain = self._brains.get(key)
+            if brain is not None:
+                self._brains.move_to_end(key)
+                return brain
+            brain = self.brain_factory(self.profile_dir(key))
+            self._brains[key] = brain
+            self.loads += 1
+            while len(self._brains) > self.max_loaded:
+                self._write_back(self._brains.popitem(last=False)[1])
+        return brain
+    
+    def _write_back(self, brain):
+        try:
+            brain.close()
+            self.evictions += 1
+        except Exception as e:
+            print(f"Error closing brain profile: {e}")
+    
+    def loaded(self):
+        """Names of profiles currently in memory, least recently used first"""
+        with self._lock:
+            return list(self._brains)
+    
+    def available(self):
+        """Every profile with data on disk"""
+        names = [DEFAULT_PROFILE]
+        profiles_dir = os.path.join(self.data_dir, "profiles")
+        if os.path.isdir(profiles_dir):
+            names.extend(sorted(entry for entry in os.listdir(profiles_dir)
+                                if os.path.isdir(os.path.join(profiles_dir, entry))))
+        return names
+    
+    def evict(self, name):
+        """Write back and unload one profile; True if it was loaded"""
+        with self._lock:
+            brain = self._brains.pop(profile_key(name), None)
+            if brain is None:
+                return False
+            self._write_back(brain)
+            return True
+    
+    def close_all(self):
+        with self._lock:
+            while self._brains:
+                self._write_back(self._brains.popitem(last=False)[1])
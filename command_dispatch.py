@@ -0,0 +1,400 @@
+"""
+L.U.F.F.Y Command Dispatch - Shared intent registry for every front end
+Intents are declared as data (triggers, entity extractors, handler name) and
+compiled once at import into a single keyword automaton per front end
+"""
+
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from fuzzy_index import COMMON_WORDS, FuzzyIndex, trigger_vocabulary
+from instrumentation import METRICS
+from intent_router import IntentRouter
+
+
+class Intent:
+    """Declarative intent: trigger phrases, entity extractors, a handler name and a scheduling lane
+    
+    fuzzy=False keeps an intent out of typo correction; use it for anything that
+    ends the session or touches the machine (launching apps, opening the browser),
+    so an everyday word is never "corrected" into it.
+    """
+    
+    def __init__(self, name, triggers, handler, extractors=None, lane='normal', fuzzy=True):
+        self.name = name
+        self.triggers = list(triggers)
+        self.handler = handler
+        self.extractors = extractors or {}
+        self.lane = lane
+        self.fuzzy = fuzzy
+    
+    def extract(self, command):
+        """Run every entity extractor over the normalized command"""
+        return {slot: extractor(command) for slot, extractor in self.extractors.items()}
+    
+    def __repr__(self):
+        return f"Intent({self.name!r})"
+
+
+class CommandMatch:
+    """Result of routing one command: the winning intent and its entities"""
+    
+    __slots__ = ('intent', 'text', 'normalized', 'entities')
+    
+    def __init__(self, intent, text, normalized, entities):
+        self.intent = intent
+        self.text = text
+        self.normalized = normalized
+        self.entities = entities
+    
+    @property
+    def name(self):
+        return self.intent.name if self.intent else None
+
+
+class Response:
+    """Structured reply to one command, produced without touching TTS or the GUI"""
+    
+    __slots__ = ('text', 'intent', 'entities', 'command', 'end_session', 'parts')
+    
+    def __init__(self, text, intent=None, entities=None, command=None, end_session=False, parts=None):
+        self.text = text
+        self.intent = intent
+        self.entities = entities or {}
+        self.command = command
+        self.end_session = end_session
+        # Sub-command Responses when this reply merges a compound utterance
+        self.parts = parts or []
+    
+    def to_dict(self):
+        result = {
+            'text': self.text,
+            'intent': self.intent,
+            'entities': self.entities,
+            'command': self.command,
+            'end_session': self.end_session
+        }
+        if self.parts:
+            result['parts'] = [part.to_dict() for part in self.parts]
+        return result
+    
+    def __repr__(self):
+        return f"Response({self.intent!r}, {self.text!r})"
+
+
+class CommandProcessor:
+    """Headless command API shared by the front ends; subclasses implement process_command_text"""
+    
+    def process_command_text(self, command):
+        raise NotImplementedError
+    
+    def process_commands(self, commands):
+        """Process an iterable of commands, yielding one Response per command"""
+        process = self.process_command_text
+        for command in commands:
+            yield process(command)
+
+
+class CommandDispatcher:
+    """Routes commands through a compiled intent table and calls the handler on a front end"""
+    
+    def __init__(self, intents, fallback, fallback_lane='normal'):
+        self.intents = list(intents)
+        self.fallback = fallback
+        self.fallback_lane = fallback_lane
+        self.router = IntentRouter([(intent.name, intent.triggers) for intent in self.intents])
+        self.by_name = {intent.name: intent for intent in self.intents}
+        # Whole-word trigger search for compound splitting: "hi" inside "chips" doesn't make a command
+        self.standalone_pattern = re.compile(r'(?<!\w)(?:%s)(?!\w)' % _alternation(
+            trigger for intent in self.intents for trigger in intent.triggers
+        ))
+        # Only intents that are safe to reach by accident are typo-corrected, and only
+        # tokens that aren't already real words get corrected
+        self.fuzzy = FuzzyIndex(trigger_vocabulary(
+            trigger for intent in self.intents if intent.fuzzy for trigger in intent.triggers
+        ), known_words=COMMON_WORDS)
+    
+    def match(self, command):
+        """Normalize a command once and find its intent and entities"""
+        normalized = command.lower().strip()
+        intent = self.by_name.get(self.router.route(normalized))
+        if intent is None:
+            # Near misses from typos or the recognizer ("waether", "what tiem is it")
+            # get a second chance before falling through to the slow fallback
+            corrected = self.fuzzy.correct(normalized)
+            if corrected:
+                intent = self.by_name.get(self.router.route(corrected))
+                if intent is not None and not intent.fuzzy:
+                    intent = None
+                if intent:
+                    normalized = corrected
+        entities = intent.extract(normalized) if intent else {}
+        return CommandMatch(intent, command, normalized, entities)
+    
+    def plan(self, command):
+        """Split a command into stages and route every part once: a list of stages of CommandMatch.
+        
+        Callers that need the lane, an exit check and the reply pass the plan along
+        instead of splitting and routing the same text again.
+        """
+        return [[self.match(part) for part in stage] for stage in self.split_compound(command)]
+    
+    def lane_for(self, command):
+        """Scheduling lane for a command: its intent's lane, or the fallback's.
+        
+        Compound commands take the slowest lane any of their parts needs.
+        """
+        return self.lane_of(self.plan(command))
+    
+    def lane_of(self, plan):
+        """Scheduling lane for an already routed plan"""
+        lanes = set()
+        for stage in plan:
+            for match in stage:
+                lanes.add(match.intent.lane if match.intent else self.fallback_lane)
+        for lane in ('slow', 'normal'):
+            if lane in lanes:
+                return lane
+        return lanes.pop()
+    
+    def handle(self, target, match):
+        """Call the handler for a match on the given front end object"""
+        handler_name = match.intent.handler if match.intent else self.fallback
+        handler = getattr(target, handler_name)
+        if not METRICS.enabled:
+            return handler(match)
+        return METRICS.timed('intent.' + (match.name or self.fallback), handler, match)
+    
+    def dispatch(self, target, command):
+        """Route a command and return whatever its handler returns"""
+        return self.handle(target, self.match(command))
+    
+    def respond(self, target, command):
+        """Route a command and wrap the handler's reply in a Response; compound commands are split"""
+        plan = self.plan(command)
+        if len(plan) > 1 or len(plan[0]) > 1:
+            return merge_responses(command, run_compound(plan, lambda match: self.respond_match(target, match)))
+        return self.respond_match(target, plan[0][0])
+    
+    def stands_alone(self, piece):
+        """Whether a piece of a compound utterance is a command on its own"""
+        piece = piece.lower().strip()
+        return bool(piece) and (self.standalone_pattern.search(piece) is not None
+                                or QUESTION_START.match(piece) is not None)
+    
+    def respond_one(self, target, command):
+        return self.respond_match(target, self.match(command))
+    
+    def respond_match(self, target, match):
+        command = match.text
+        return Response(self.handle(target, match), match.name, match.entities, command,
+                        end_session=match.name == 'exit')
+    
+    def split_compound(self, command):
+        """Split "open brave and search for x then tell me the time" into ordered stages.
+        
+        Returns a list of stages, each a list of sub-commands that may run concurrently;
+        "and" joins sub-commands within a stage, "then"/"after that" starts a new stage.
+        A piece that neither names an intent nor asks a question stays with the one
+        before it, so "search for tom and jerry" remains a single search.
+        """
+        if not COMPOUND_HINT.search(command):
+            return [[command]]
+        pieces = COMPOUND_SEPARATOR.split(command)
+        stages = [[pieces[0]]]
+        for separator, piece in zip(pieces[1::2], pieces[2::2]):
+            if self.stands_alone(piece) and self.stands_alone(stages[-1][-1]):
+                if separator.strip(' ,').lower() == 'and':
+                    stages[-1].append(piece)
+                else:
+                    stages.append([piece])
+            else:
+                stages[-1][-1] = f"{stages[-1][-1]} {separator.strip()} {piece}".strip()
+        return stages
+
+
+# Compound utterances ("open brave and search for python tutorials then what time is it")
+
+COMPOUND_HINT = re.compile(r'\b(?:and|then|after that)\b', re.IGNORECASE)
+COMPOUND_SEPARATOR = re.compile(r'\s*(,?\s*\b(?:and then|and|then|after that)\b,?)\s*', re.IGNORECASE)
+QUESTION_START = re.compile(r"(?:what|what's|whats|how|who|when|where|why|tell me|is|are|can|could|do)\b")
+
+_compound_pool = None
+
+
+def run_compound(stages, process):
+    """Run process(sub_command) for every sub-command and return the results in utterance order.
+    
+    Stages run one after another; the sub-commands inside a stage run concurrently.
+    """
+    global _compound_pool
+    results = []
+    for stage in stages:
+        if len(stage) == 1:
+            results.append(process(stage[0]))
+            continue
+        if _compound_pool is None:
+            _compound_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="luffy-compound")
+        results.extend(_compound_pool.map(process, stage))
+    return results
+
+
+def merge_responses(command, responses):
+    """Fold sub-command Responses into one reply that is spoken once"""
+    responses = [response for response in responses if response is not None]
+    return Response(
+        " ".join(response.text for response in responses if response.text),
+        'compound',
+        command=command,
+        end_session=any(response.end_session for response in responses),
+        parts=responses,
+    )
+
+
+# Entity extractors: each is one compiled, word-anchored pattern run once per command
+
+# Trailing politeness that never belongs in a slot ("open notepad please")
+POLITE_SUFFIX = r'(?:\s+(?:please|for me|right now|now))*'
+
+
+def _alternation(words):
+    # Longest first so "search for" wins over "search" at the same position
+    return '|'.join(re.escape(word) for word in sorted(words, key=len, reverse=True))
+
+
+def slot_after(*cues):
+    """Extractor returning the text after the first whole-word cue ("open notepad" -> "notepad").
+    
+    When the cue ends the command ("python tutorials google") the text before it is used instead.
+    """
+    pattern = re.compile(r'^(.*?)\s*\b(?:%s)\b\s*(.*?)%s\s*$' % (_alternation(cues), POLITE_SUFFIX))
+    
+    def extractor(command):
+        match = pattern.search(command)
+        if not match:
+            return ''
+        return match.group(2) or match.group(1)
+    return extractor
+
+
+CITY_PATTERN = re.compile(
+    r'\bweather\b(?:.*?\b(?:in|for|at)\b)?\s*(.*?)(?:\s*\b(?:today|tomorrow|right now|now|please|like|forecast)\b)*\s*$'
+)
+
+
+def extract_city(command):
+    """City named after "weather" ("weather in paris", "what's the weather like in paris today")"""
+    match = CITY_PATTERN.search(command)
+    return match.group(1) if match else ''
+
+
+def extract_math_expression(command):
+    """Pull a symbolic arithmetic expression out of a spoken calculation"""
+    math_pattern = r'[\d+\-*/().]+|plus|minus|times|divided by'
+    expression = ' '.join(re.findall(math_pattern, command))
+    return expression.replace('plus', '+').replace('minus', '-').replace('times', '*').replace('divided by', '/')
+
+
+# Basic assistant intents (main.py, luffy_simple.py, luffy_voice_fixed.py, luffy_working_voice.py)
+
+GREETING = Intent('greeting', ['hello', 'hi', 'hey', 'luffy'], 'handle_greeting', lane='fast')
+TIME = Intent('time', ['time'], 'handle_time', lane='fast')
+DATE = Intent('date', ['date', 'today'], 'handle_date', lane='fast')
+CALCULATION = Intent(
+    'calculation',
+    ['calculate', 'compute', 'math', '+', '-', '*', '/', 'plus', 'minus', 'times', 'divided'],
+    'handle_calculation',
+    {'expression': extract_math_expression},
+    lane='fast',
+)
+SEARCH = Intent('search', ['search', 'google'], 'handle_search',
+                {'query': slot_after('search for', 'search', 'google for', 'google')}, fuzzy=False)
+OPEN_APP = Intent('open_app', ['open'], 'handle_open_app', {'app': slot_after('open')}, fuzzy=False)
+WEATHER = Intent('weather', ['weather'], 'handle_weather', lane='slow')
+EXIT = Intent('exit', ['exit', 'quit', 'goodbye', 'bye'], 'handle_exit', fuzzy=False)
+REMEMBER = Intent('remember', ['remember', 'learn'], 'handle_remember')
+MEMORY = Intent('memory', ['what do you know', 'memory'], 'handle_memory', lane='fast')
+# "what did I ask about python last week" searches the persisted conversation history
+HISTORY = Intent('history', ['what did i ask', 'what did i say', 'did i ask about'], 'handle_history',
+                 {'topic': slot_after('ask about', 'asked about', 'say about', 'said about', 'ask', 'say')},
+                 lane='fast')
+# "switch user to wesley" loads that person's brain profile on a shared workstation
+SWITCH_USER = Intent('switch_user', ['switch user', 'switch profile'], 'handle_switch_user',
+                     {'user': slot_after('switch user to', 'switch profile to', 'switch user', 'switch profile')},
+                     lane='fast', fuzzy=False)
+# Performance stats ("stats", "dump stats") come first so they always win; exact only, so
+# everyday words ("status") aren't pulled into them
+STATS = Intent('stats', ['stats'], 'handle_stats', lane='fast', fuzzy=False)
+
+BASIC_INTENTS = [GREETING, TIME, DATE, CALCULATION, SEARCH, OPEN_APP, EXIT]
+LUFFY_INTENTS = [STATS, SWITCH_USER, HISTORY, GREETING, TIME, DATE, CALCULATION, SEARCH, OPEN_APP, WEATHER, EXIT, REMEMBER, MEMORY]
+
+# Advanced assistant intents (luffy_advanced.py)
+
+ADVANCED_INTENTS = [
+    STATS,
+    Intent('greeting', ['hello', 'hi', 'hey', 'good morning', 'good evening'], 'handle_greeting', lane='fast'),
+    Intent('time', ['time'], 'handle_time', lane='fast'),
+    Intent('date', ['date'], 'handle_date', lane='fast'),
+    Intent('system_info', ['system info', 'system status'], 'handle_system_info', lane='fast'),
+    Intent('system_control', ['shutdown', 'restart', 'lock', 'sleep', 'volume', 'mute'], 'handle_system_control',
+           fuzzy=False),
+    Intent('list_apps', ['list apps', 'show apps', 'available apps'], 'handle_list_apps', lane='slow'),
+    Intent('open_app', ['open'], 'handle_open_app', {'app': slot_after('open')}, lane='slow', fuzzy=False),
+    Intent('weather', ['weather'], 'handle_weather', {'city': extract_city}, lane='slow'),
+    Intent('search', ['search', 'google'], 'handle_search', {'query': slot_after('search for', 'search', 'google')},
+           fuzzy=False),
+    Intent('file_operation', ['create folder', 'delete file', 'list files'], 'handle_file_operation', fuzzy=False),
+    Intent('calculation', ['calculate', 'math'], 'handle_calculation',
+           {'expression': slot_after('calculate', 'math')}, lane='fast'),
+    Intent('reminder', ['remind me'], 'handle_reminder', {'reminder': slot_after('remind me to', 'remind me')}),
+    Intent('joke', ['joke'], 'handle_joke', lane='fast'),
+]
+
+# Dashboard intents (luffy_complete.py, jarvis_complete.py)
+
+DASHBOARD_OPEN_APP = Intent('open_app', ['open', 'launch', 'start', 'run'], 'handle_open_app',
+                            {'app': slot_after('open', 'launch', 'start', 'run')}, lane='slow', fuzzy=False)
+YOUTUBE_MUSIC = Intent('youtube_music', ['play youtube music', 'youtube music', 'open youtube music'],
+                       'handle_youtube_music', lane='slow', fuzzy=False)
+BRAVE_SITE = Intent('brave_site', ['from brave', 'in brave'], 'handle_brave_site', lane='slow', fuzzy=False)
+WEB_SEARCH = Intent('search', ['search for', 'google', 'find', 'look up'], 'handle_search',
+                    {'query': slot_after('search for', 'search', 'google', 'find', 'look up')}, fuzzy=False)
+SCREEN_ANALYSIS = Intent('screen_analysis', ['analyze screen', 'screen analysis', "what's on screen", 'see screen'],
+                         'handle_screen_analysis', lane='slow')
+SYSTEM_STATUS = Intent('system_status', ['system status', 'system info', "how's the system", 'computer status'],
+                       'handle_system_status', lane='fast')
+SYSTEM_COMMAND = Intent('system_command',
+                        ['shutdown', 'restart', 'reboot', 'lock', 'sleep', 'volume up', 'volume down', 'mute'],
+                        'handle_system_command', fuzzy=False)
+CLOCK = Intent('time', ['what time', 'current time', 'time is it'], 'handle_time', lane='fast')
+CALENDAR = Intent('date', ['what date', "today's date", 'what day'], 'handle_date', lane='fast')
+JOKE = Intent('joke', ['tell me a joke', 'make me laugh', 'something funny'], 'handle_joke', lane='fast')
+
+DASHBOARD_INTENTS = [STATS, DASHBOARD_OPEN_APP, WEB_SEARCH, SCREEN_ANALYSIS, SYSTEM_STATUS, SYSTEM_COMMAND,
+                     CLOCK, CALENDAR, JOKE]
+LUFFY_DASHBOARD_INTENTS = [STATS, DASHBOARD_OPEN_APP, YOUTUBE_MUSIC, BRAVE_SITE, WEB_SEARCH, SCREEN_ANALYSIS,
+                           SYSTEM_STATUS, SYSTEM_COMMAND, CLOCK, CALENDAR, JOKE]
+
+# Offline brain replies used when no LLM is available (LUFFYBrain / jarvis AIBrain)
+
+CONVERSATION_INTENTS = [
+    Intent('greeting', ['hello', 'hi', 'hey', 'good morning', 'good evening'], 'reply_greeting'),
+    Intent('time', ['time'], 'reply_time'),
+    Intent('date', ['date', 'today'], 'reply_date'),
+    Intent('weather', ['weather'], 'reply_weather'),
+    Intent('identity', ['who are you', 'what are you', 'your name'], 'reply_identity'),
+    Intent('capabilities', ['what can you do', 'help me', 'capabilities'], 'reply_capabilities'),
+    Intent('joke', ['joke', 'funny'], 'reply_joke'),
+    Intent('thanks', ['thank', 'thanks', 'appreciate'], 'reply_thanks'),
+]
+
+# Dispatchers are compiled once at import and shared by every instance
+BASIC_DISPATCHER = CommandDispatcher(BASIC_INTENTS, fallback='handle_unknown')
+LUFFY_DISPATCHER = CommandDispatcher(LUFFY_INTENTS, fallback='handle_unknown')
+ADVANCED_DISPATCHER = CommandDispatcher(ADVANCED_INTENTS, fallback='handle_unknown')
+# Dashboard fallbacks go to the LLM, so unmatched commands run on the slow lane
+DASHBOARD_DISPATCHER = CommandDispatcher(DASHBOARD_INTENTS, fallback='handle_general_query', fallback_lane='slow')
+LUFFY_DASHBOARD_DISPATCHER = CommandDispatcher(LUFFY_DASHBOARD_INTENTS, fallback='handle_general_query',
+                                               fallback_lane='slow')
+CONVERSATION_DISPATCHER = CommandDispatcher(CONVERSATION_INTENTS, fallback='reply_default')
@@ -0,0 +1,157 @@
+"""
+L.U.F.F.Y Command Executor - Bounded worker pool for GUI command execution
+A fixed set of worker threads drains a bounded queue, so bursts of button clicks
+or wake-word triggers queue up (or are turned away) instead of spawning threads
+"""
+
+import queue
+import threading
+import time
+
+from instrumentation import METRICS, LatencyHistogram
+
+
+class CommandTicket:
+    """One queued command; cancel() drops it if no worker has picked it up yet"""
+    
+    __slots__ = ('func', 'args', 'submitted', 'cancelled', 'done')
+    
+    def __init__(self, func, args):
+        self.func = func
+        self.args = args
+        self.submitted = time.monotonic()
+        self.cancelled = False
+        self.done = threading.Event()
+    
+    def cancel(self):
+        self.cancelled = True
+    
+    def wait(self, timeout=None):
+        """Block until the command ran, failed or was dropped; False on timeout"""
+        return self.done.wait(timeout)
+    
+    def age(self):
+        return time.monotonic() - self.submitted
+
+
+class CommandExecutor:
+    """Fixed-size worker pool fed by a bounded queue with stale-command expiry"""
+    
+    def __init__(self, workers=1, max_queue=8, max_age=15.0, name="luffy-command"):
+        # One worker keeps replies in order and TTS single-threaded; commands
+        # that waited longer than max_age seconds are dropped unexecuted
+        self.max_age = max_age
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._wait = LatencyHistogram()
+        self._closed = False
+        self.active = 0
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.expired = 0
+        self.failed = 0
+        self._workers = [
+            threading.Thread(target=self._worker, name=f"{name}-{index}", daemon=True)
+            for index in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+    
+    def submit(self, func, *args):
+        """Queue func(*args); returns a CommandTicket, or None when the queue is full"""
+        if self._closed:
+            return None
+        ticket = CommandTicket(func, args)
+        try:
+            self._queue.put_nowait(ticket)
+        except queue.Full:
+            with self._lock:
+                self.rejected += 1
+            return None
+        with self._lock:
+            self.submitted += 1
+        return ticket
+    
+    def cancel_pending(self):
+        """Drop every command still waiting in the queue; returns how many were dropped"""
+        dropped = 0
+        while True:
+            try:
+                ticket = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if ticket is not None:
+                ticket.cancel()
+                ticket.done.set()
+                dropped += 1
+            self._queue.task_done()
+        with self._lock:
+            self.expired += dropped
+        return dropped
+    
+    def _worker(self):
+        while True:
+            ticket = self._queue.get()
+            if ticket is None:
+                self._queue.task_done()
+                break
+            waited = ticket.age()
+            with self._lock:
+                self._wait.record(int(waited * 1e9))
+            if METRICS.enabled:
+                METRICS.record('executor.wait', int(waited * 1e9))
+            
+            if ticket.cancelled or (self.max_age and waited > self.max_age):
+                with self._lock:
+                    self.expired += 1
+                ticket.done.set()
+                self._queue.task_done()
+                continue
+            
+            with self._lock:
+                self.active += 1
+            outcome = 'failed'
+            try:
+                ticket.func(*ticket.args)
+                outcome = 'completed'
+            except Exception as e:
+                print(f"Command execution error: {e}")
+            finally:
+                with self._lock:
+                    self.active -= 1
+                    setattr(self, outcome, getattr(self, outcome) + 1)
+                ticket.done.set()
+                self._queue.task_done()
+    
+    def queue_depth(self):
+        return self._queue.qsize()
+    
+    def stats(self):
+        """Queue depth, worker activity, outcome counters and queue wait times"""
+        with self._lock:
+            wait = self._wait.summary()
+            return {
+                'queue_depth': self._queue.qsize(),
+                'max_queue': self._queue.maxsize,
+                'workers': len(self._workers),
+                'active': self.active,
+                'submitted': self.submitted,
+                'completed': self.completed,
+                'failed': self.failed,
+                'rejected': self.rejected,
+                'expired': self.expired,
+                'wait_p50_ms': wait['p50_ms'],
+                'wait_p95_ms': wait['p95_ms'],
+                'wait_max_ms': wait['max_ms'],
+            }
+    
+    def shutdown(self, wait=False):
+        """Stop accepting commands, drop queued ones and let the workers exit"""
+        self._closed = True
+        self.cancel_pending()
+        for _ in self._workers:
+            self._queue.put(None)
+        if wait:
+            for worker in self._workers:
+                worker.join()
@@ -0,0 +1,58 @@
+"""
+L.U.F.F.Y Command Scheduler - Per-class lanes so quick commands never wait on slow ones
+Each command is classified by its intent's lane (fast, normal, slow) and queued on
+that lane's own bounded worker pool, so a 20 second LLM or OCR call can't hold up
+"what time is it"
+"""
+
+from command_executor import CommandExecutor
+
+FAST = 'fast'
+NORMAL = 'normal'
+SLOW = 'slow'
+
+# Concurrency limit, queue bound and staleness limit (seconds) per lane
+DEFAULT_LANES = {
+    FAST: {'workers': 2, 'max_queue': 16, 'max_age': 5.0},
+    NORMAL: {'workers': 1, 'max_queue': 8, 'max_age': 15.0},
+    SLOW: {'workers': 1, 'max_queue': 4, 'max_age': 60.0},
+}
+
+
+class CommandScheduler:
+    """Routes commands to per-lane worker pools using the dispatcher's intent table"""
+    
+    def __init__(self, dispatcher, lanes=None):
+        self.dispatcher = dispatcher
+        self.lanes = {
+            name: CommandExecutor(name=f"luffy-{name}", **settings)
+            for name, settings in (lanes or DEFAULT_LANES).items()
+        }
+    
+    def lane_for(self, command, plan=None):
+        """Name of the lane a command runs on; unknown lanes fall back to normal.
+        
+        plan is the dispatcher's already routed plan for command, if the caller has one.
+        """
+        lane = self.dispatcher.lane_of(plan) if plan is not None else self.dispatcher.lane_for(command)
+        return lane if lane in self.lanes else NORMAL
+    
+    def submit(self, command, func, *args, plan=None):
+        """Queue func(*args) on the command's lane; returns a ticket, or None when that lane is full"""
+        return self.lanes[self.lane_for(command, plan)].submit(func, *args)
+    
+    def cancel_pending(self, lane=None):
+        """Drop queued (not yet running) commands on one lane or all of them"""
+        lanes = [self.lanes[lane]] if lane else self.lanes.values()
+        return sum(executor.cancel_pending() for executor in lanes)
+    
+    def queue_depth(self):
+        return sum(executor.queue_depth() for executor in self.lanes.values())
+    
+    def stats(self):
+        """Executor statistics for every lane"""
+        return {name: executor.stats() for name, executor in self.lanes.items()}
+    
+    def shutdown(self, wait=False):
+        for executor in self.lanes.values():
+            executor.shutdown(wait)
@@ -0,0 +1,179 @@
+"""
+L.U.F.F.Y Conversation Store - Persistent, full-text-searchable conversation history
+Every turn is appended to a SQLite (WAL) table and indexed in an FTS5 inverted
+index, so "what did I ask about python last week" is an index lookup over years
+of history instead of a scan, and the recent-memory buffer survives restarts
+"""
+
+import datetime
+import json
+import os
+import re
+import sqlite3
+import threading
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS turns (
+    id INTEGER PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    user_input TEXT NOT NULL,
+    response TEXT,
+    sentiment TEXT,
+    command_type TEXT,
+    context TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_turns_timestamp ON turns (timestamp);
+CREATE VIRTUAL TABLE IF NOT EXISTS turns_fts USING fts5 (
+    user_input, response, content='turns', content_rowid='id'
+);
+"""
+
+WORD_PATTERN = re.compile(r'\w+')
+
+# Spoken time windows understood by history searches
+TIME_WINDOWS = [
+    ('last week', 'last_week'),
+    ('this week', 'this_week'),
+    ('last month', 'last_month'),
+    ('yesterday', 'yesterday'),
+    ('today', 'today'),
+]
+TIME_WINDOW_PATTERN = re.compile(r'\b(' + '|'.join(phrase for phrase, _ in TIME_WINDOWS) + r')\b')
+
+
+def time_window(text, now=None):
+    """(since, until, text without the phrase) for "today", "yesterday", "this/last week", "last month"
+    
+    since/until are datetimes, or None when the text names no window.
+    """
+    match = TIME_WINDOW_PATTERN.search(text)
+    if not match:
+        return None, None, text
+    now = now or datetime.datetime.now()
+    midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    week_start = midnight - datetime.timedelta(days=midnight.weekday())
+    kind = dict(TIME_WINDOWS)[match.group(1)]
+    if kind == 'today':
+        since, until = midnight, None
+    elif kind == 'yesterday':
+        since, until = midnight - datetime.timedelta(days=1), midnight
+    elif kind == 'this_week':
+        since, until = week_start, None
+    elif kind == 'last_week':
+        since, until = week_start - datetime.timedelta(days=7), week_start
+    else:
+        since, until = midnight - datetime.timedelta(days=30), None
+    rest = ' '.join((text[:match.start()] + ' ' + text[match.end():]).split())
+    return since, until, rest
+
+
+def match_expression(query):
+    """FTS5 query requiring every word of query (each quoted, so user text can't inject operators)"""
+    return ' '.join('"%s"' % word for word in WORD_PATTERN.findall(query.lower()))
+
+
+class ConversationStore:
+    """Append-only conversation log with an FTS5 index; the connection opens on first use"""
+    
+    def __init__(self, path):
+        self.path = path
+        self._conn = None
+        # Turns are appended from the scheduler lanes and the GUI threads
+        self._lock = threading.Lock()
+    
+    def _connect(self):
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+    
+    def append(self, entry):
+        """Persist one memory entry (timestamp, user_input, jarvis_response, ...); returns its id"""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN")
+            try:
+                cursor = conn.execute(
+                    "INSERT INTO turns (timestamp, user_input, response, sentiment, command_type, context) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (entry['timestamp'], entry['user_input'], entry.get('jarvis_response'),
+                     entry.get('sentiment'), entry.get('command_type'),
+                     json.dumps(entry.get('context') or {}, default=str))
+                )
+                turn_id = cursor.lastrowid
+                conn.execute("INSERT INTO turns_fts (rowid, user_input, response) VALUES (?, ?, ?)",
+                             (turn_id, entry['user_input'], entry.get('jarvis_response') or ''))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            return turn_id
+    
+    def _entries(self, rows):
+        return [
+            {
+                'id': turn_id,
+                'timestamp': timestamp,
+                'user_input': user_input,
+                'jarvis_response': response,
+                'sentiment': sentiment,
+                'command_type': command_type,
+                'context': json.loads(context) if context else {}
+            }
+            for turn_id, timestamp, user_input, response, sentiment, command_type, context in rows
+        ]
+    
+    def recent(self, limit=100):
+        """Last limit turns, oldest first"""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT id, timestamp, user_input, response, sentiment, command_type, context "
+                "FROM turns ORDER BY id DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return self._entries(reversed(rows))
+    
+    def search(self, query, since=None, until=None, limit=10, field='user_input', exclude_types=()):
+        """Turns whose text contains every word of query, newest first
+        
+        field restricts the match to 'user_input' or 'response' (None searches both);
+        since/until are datetimes bounding the turn's timestamp; turns whose
+        command_type is in exclude_types are skipped.
+        """
+        expression = match_expression(query)
+        if not expression:
+            return []
+        if field:
+            expression = '{%s} : (%s)' % (field, expression)
+        sql = ("SELECT t.id, t.timestamp, t.user_input, t.response, t.sentiment, t.command_type, t.context "
+               "FROM turns_fts JOIN turns t ON t.id = turns_fts.rowid WHERE turns_fts MATCH ?")
+        params = [expression]
+        if since:
+            sql += " AND t.timestamp >= ?"
+            params.append(since.isoformat())
+        if until:
+            sql += " AND t.timestamp < ?"
+            params.append(until.isoformat())
+        if exclude_types:
+            sql += " AND COALESCE(t.command_type, '') NOT IN (%s)" % ', '.join('?' * len(exclude_types))
+            params.extend(exclude_types)
+        sql += " ORDER BY t.id DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._connect().execute(sql, params).fetchall()
+        return self._entries(rows)
+    
+    def __len__(self):
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM turns").fetchone()[0]
+    
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,203 @@
+"""
+L.U.F.F.Y Fuzzy Index - Typo and speech-recognition tolerant word lookup
+SymSpell-style deletion dictionary: every vocabulary word is indexed under all
+of its single and double character deletions, so a near-miss token is resolved
+with a handful of dict lookups instead of an edit-distance scan over the vocabulary
+"""
+
+import random
+import time
+
+# Everyday words (4+ letters, shorter tokens are never corrected) that sit one or two
+# edits from a trigger word. A token that is already a real word was heard right, so
+# "oven", "data" or "fine" must never become "open", "date" or "find"
+COMMON_WORDS = frozenset("""
+    able about above abort across after again against ahead alone along already also always among
+    another answer anything apes area army around away baby back bake bath bear beat became become
+    been before began begin behind being believe bell belong best better between bind bird black
+    blue board boat body book born both bought bowl boys brace brake bravo bread break bring brought
+    build built bunny burn busy cake call came card care carry case cash cast cats cell cello chat
+    check child city class clay clean clear close coat coke cold come comes commute compete compote
+    cook cool copy cost could count course cover crave cream dale dame dare dark data date days dead
+    deal dear deep dell dime does done door down draw dream dress drink drive drop dust each early
+    easy edit even ever every face fact fail fair fall fame fanny farm fast fate fear feather feel
+    feet fell fend fiend file fill film fine fins fire firm fish fist five flat flow fluffy fold
+    food foot form four free frog full fund game gate gave gist give goad goes gold gone goods
+    goggle googly grave gray great green grew grow hair half hall hand hang hard hate have head hear
+    heard heart heat heather held hell hells help here high hill hind hold hole home hood hook hope
+    horse hour house huge idea inch into item jake jello jock joker just keep kept kind king knew
+    knob knot known lake land last late lays lead learns leather left lend less lest lies life lift
+    like lime limes line lint lion list lisp live load lock long loom loon loop loot lose lost loud
+    love lunch lust made mail main make male mane many maps mare mark mash mate maths mats maze mean
+    meat meet member memo mike mild mile milk mime mind mine mines minis mints miss mist mode moon
+    mood more most moth move much must myth name near need news next nice night none nose note
+    nothing omen once only onto oped opens oven over pack page paid paint pair park part pass past
+    path pays pick plan plane plant plate plot plug plum plush poke pole pool poor pray prom pull
+    puffy pure push race rain rake rate read real rest rewind rice rich ride ring rise road rock
+    role roll room rose rule runny safe said sake sale salt same sand save seat seem seen self sell
+    send sent ship shoe shop shot shout shown shows side sign sing sink size slay slow snow soft
+    some song soon sort soul speak spot star stare stark stars stay step stop stow such sunny sure
+    swim table tail take tale talk tall tame tank tart task taste teal team tear tell tells term
+    test than that them then there these they thin thing think this those though tide tides tied
+    tier tile tiles till timed timer tine tiny tire tome tomes tone took toll tool tour town tree
+    trip true tune turn twin type unit upon used very view vote wait wake walk wall want warm wash
+    wave ways weak wear week well went were west wether whale what wheat when where whet whether
+    which while whit white whole wide wife wild will wind wine wise wish with woke wood word wore
+    work world would yard yarn yeah year yearn yell your yours zero
+""".split())
+
+
+def edit_distance(a, b, limit):
+    """Optimal string alignment distance (transpositions count as one edit), or limit + 1 if larger"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        row_best = i
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, previous2[j - 2] + 1)
+            current[j] = value
+            if value < row_best:
+                row_best = value
+        if row_best > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+def _deletes(word, distance):
+    """All strings reachable from word by removing up to distance characters"""
+    found = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {candidate[:i] + candidate[i + 1:] for candidate in frontier for i in range(len(candidate))}
+        found |= frontier
+    return found
+
+
+class FuzzyIndex:
+    """Precomputed deletion dictionary mapping misspelled tokens to vocabulary words"""
+    
+    def __init__(self, words, max_distance=2, min_length=4, long_word=8, known_words=()):
+        # Short tokens only get one edit and very short ones none at all, so
+        # "hi" or "the" never get "corrected" into a trigger word
+        self.max_distance = max_distance
+        # Real words that correct() leaves alone even when they are near a vocabulary word
+        self.known_words = known_words
+        self.min_length = min_length
+        self.long_word = long_word
+        self.words = {}
+        self.deletes = {}
+        for word in words:
+            word = word.lower().strip()
+            if len(word) < min_length or word in self.words:
+                continue
+            # Earlier words win ties, so callers can pass words in priority order
+            self.words[word] = len(self.words)
+            for variant in _deletes(word, self.allowed_distance(word)):
+                self.deletes.setdefault(variant, []).append(word)
+    
+    def allowed_distance(self, token):
+        if len(token) < self.min_length:
+            return 0
+        if len(token) < self.long_word:
+            return min(1, self.max_distance)
+        return self.max_distance
+    
+    def lookup(self, token):
+        """Return the closest vocabulary word within the allowed distance, or None"""
+        if token in self.words:
+            return token
+        limit = self.allowed_distance(token)
+        if not limit:
+            return None
+        best = None
+        best_key = None
+        seen = set()
+        for variant in _deletes(token, limit):
+            for word in self.deletes.get(variant, ()):
+                if word in seen:
+                    continue
+                seen.add(word)
+                distance = edit_distance(token, word, limit)
+                if distance > limit or distance > self.allowed_distance(word):
+                    continue
+                key = (distance, self.words[word])
+                if best_key is None or key < best_key:
+                    best, best_key = word, key
+        return best
+    
+    def correct(self, text):
+        """Replace near-miss tokens in text; returns the corrected text, or None if nothing changed"""
+        tokens = text.split()
+        changed = False
+        for index, token in enumerate(tokens):
+            if token in self.known_words:
+                continue
+            replacement = self.lookup(token)
+            if replacement and replacement != token:
+                tokens[index] = replacement
+                changed = True
+        return ' '.join(tokens) if changed else None
+
+
+def trigger_vocabulary(triggers):
+    """Alphabetic words of every trigger phrase, in trigger order"""
+    return [word for trigger in triggers for word in trigger.split() if word.isalpha()]
+
+
+def benchmark_lookup(index=None, tokens=None, seed=7):
+    """Time fuzzy lookups of randomly mangled vocabulary words against a brute-force scan"""
+    if index is None:
+        from command_dispatch import LUFFY_DASHBOARD_DISPATCHER
+        index = LUFFY_DASHBOARD_DISPATCHER.fuzzy
+    rng = random.Random(seed)
+    vocabulary = list(index.words)
+    if tokens is None:
+        tokens = []
+        for _ in range(20000):
+            word = list(rng.choice(vocabulary))
+            position = rng.randrange(len(word))
+            edit = rng.choice(['drop', 'swap', 'replace', 'insert'])
+            if edit == 'drop' and len(word) > index.min_length:
+                del word[position]
+            elif edit == 'swap' and position < len(word) - 1:
+                word[position], word[position + 1] = word[position + 1], word[position]
+            elif edit == 'insert':
+                word.insert(position, rng.choice('abcdefghijklmnopqrstuvwxyz'))
+            else:
+                word[position] = rng.choice('abcdefghijklmnopqrstuvwxyz')
+            tokens.append(''.join(word))
+    
+    def brute_force(token):
+        limit = index.allowed_distance(token)
+        scored = [
+            (distance, rank, word)
+            for word, rank in index.words.items()
+            for distance in (edit_distance(token, word, limit),)
+            if distance <= min(limit, index.allowed_distance(word))
+        ]
+        return min(scored)[2] if scored else None
+    
+    results = {}
+    for name, lookup in (('index', index.lookup), ('brute_force', brute_force)):
+        start = time.perf_counter()
+        resolved = sum(1 for token in tokens if lookup(token))
+        elapsed = time.perf_counter() - start
+        results[name] = {'resolved': resolved, 'us_per_lookup': elapsed / len(tokens) * 1e6}
+    results['tokens'] = len(tokens)
+    results['vocabulary'] = len(vocabulary)
+    return results
+
+
+if __name__ == "__main__":
+    report = benchmark_lookup()
+    print(f"{report['tokens']} mangled tokens against {report['vocabulary']} trigger words")
+    for name in ('index', 'brute_force'):
+        stats = report[name]
+        print(f"{name:<12} resolved {stats['resolved']:>6}, {stats['us_per_lookup']:.2f} us/lookup")
@@ -8,6 +8,8 @@ import threading
 import queue
 import time
 from main import LUFFY
+from autosave import AUTOSAVE
+from command_dispatch import LUFFY_DISPATCHER
 
 class LUFFYGui:
     def __init__(self):
@@ -168,28 +170,25 @@ class LUFFYGui:
             self.add_to_chat("You", command)
             self.command_entry.delete(0, tk.END)
             
-            # Process command in separate thread
-            threading.Thread(target=self.process_command_thread, args=(command,), daemon=True).start()
+            # Process command on its scheduler lane
+            self.submit_command(command)
     
-    def process_command_thread(self, command):
+    def submit_command(self, command):
+        """Queue a command on L.U.F.F.Y's scheduler, telling the user when its lane is full"""
+        # Routed once here; the lane and the reply reuse the plan
+        plan = LUFFY_DISPATCHER.plan(command)
+        if self.luffy.command_queue.submit(command, self.process_command_thread, command, plan, plan=plan) is None:
+            self.add_to_chat("L.U.F.F.Y", "One moment, sir. I'm still working on your previous commands.")
+    
+    def process_command_thread(self, command, plan=None):
         """Process command in separate thread"""
         self.update_status("PROCESSING")
         
-        # Capture L.U.F.F.Y response
-        original_speak = self.luffy.speak
-        response_text = ""
-        
-        def capture_speak(text):
-            nonlocal response_text
-            response_text = text
-            original_speak(text)
-        
-        self.luffy.speak = capture_speak
-        self.luffy.process_command(command)
-        self.luffy.speak = original_speak
+        response = self.luffy.process_command_text(command, plan)
         
-        if response_text:
-            self.root.after(0, lambda: self.add_to_chat("L.U.F.F.Y", response_text))
+        if response and response.text:
+            self.root.after(0, lambda: self.add_to_chat("L.U.F.F.Y", response.text))
+            self.luffy.speak(response.text)
         
         self.root.after(0, lambda: self.update_status("ONLINE"))
     
@@ -212,8 +211,7 @@ class LUFFYGui:
                 command = self.luffy.listen()
                 if command and self.listening:
                     self.root.after(0, lambda cmd=command: self.add_to_chat("You", cmd))
-                    self.root.after(0, lambda cmd=command: threading.Thread(
-                        target=self.process_command_thread, args=(cmd,), daemon=True).start())
+                    self.root.after(0, lambda cmd=command: self.submit_command(cmd))
             except Exception as e:
                 print(f"Listening error: {e}")
                 break
@@ -230,6 +228,10 @@ class LUFFYGui:
     def run(self):
         """Start the GUI"""
         self.root.mainloop()
+        self.luffy.command_queue.shutdown()
+        self.luffy.profiles.close_all()
+        self.luffy.task_manager.close()
+        AUTOSAVE.shutdown()
 
 if __name__ == "__main__":
     app = LUFFYGui()
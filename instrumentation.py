@@ -0,0 +1,132 @@
+"""
+L.U.F.F.Y Instrumentation - In-process latency histograms and hit counts
+Timing hooks are a single attribute check when disabled; enable with the
+LUFFY_METRICS=1 environment variable or METRICS.enable()
+"""
+
+import json
+import os
+import threading
+import time
+
+
+class LatencyHistogram:
+    """Log2-bucketed latency histogram (nanosecond resolution, constant memory)"""
+    
+    BUCKETS = 64
+    
+    def __init__(self):
+        self.buckets = [0] * self.BUCKETS
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+    
+    def record(self, duration_ns):
+        self.buckets[min(duration_ns.bit_length(), self.BUCKETS - 1)] += 1
+        self.count += 1
+        self.total_ns += duration_ns
+        if duration_ns > self.max_ns:
+            self.max_ns = duration_ns
+    
+    def percentile(self, pct):
+        """Upper bound of the bucket holding the pct-th percentile, in nanoseconds"""
+        if not self.count:
+            return 0
+        threshold = pct / 100.0 * self.count
+        seen = 0
+        for index, hits in enumerate(self.buckets):
+            seen += hits
+            if hits and seen >= threshold:
+                return min(1 << index, self.max_ns)
+        return self.max_ns
+    
+    def summary(self):
+        return {
+            'count': self.count,
+            'total_ms': self.total_ns / 1e6,
+            'mean_ms': self.total_ns / self.count / 1e6 if self.count else 0.0,
+            'p50_ms': self.percentile(50) / 1e6,
+            'p95_ms': self.percentile(95) / 1e6,
+            'p99_ms': self.percentile(99) / 1e6,
+            'max_ms': self.max_ns / 1e6,
+        }
+
+
+class Metrics:
+    """Named latency histograms shared by the dispatcher, the front ends and the brain"""
+    
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.histograms = {}
+        self.started = time.time()
+        self._lock = threading.Lock()
+    
+    def enable(self):
+        self.enabled = True
+    
+    def disable(self):
+        self.enabled = False
+    
+    def reset(self):
+        with self._lock:
+            self.histograms = {}
+            self.started = time.time()
+    
+    def record(self, name, duration_ns):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = LatencyHistogram()
+            histogram.record(duration_ns)
+    
+    def timed(self, name, func, *args):
+        """Call func(*args), recording its latency under name when metrics are enabled"""
+        if not self.enabled:
+            return func(*args)
+        start = time.perf_counter_ns()
+        try:
+            return func(*args)
+        finally:
+            self.record(name, time.perf_counter_ns() - start)
+    
+    def snapshot(self):
+        """Copy of every histogram summary, keyed by metric name"""
+        with self._lock:
+            histograms = {name: histogram.summary() for name, histogram in self.histograms.items()}
+        return {
+            'enabled': self.enabled,
+            'since': self.started,
+            'metrics': histograms,
+        }
+    
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2, sort_keys=True)
+    
+    def dump(self, path):
+        """Write the current snapshot to a JSON file and return its path"""
+        with open(path, 'w') as f:
+            f.write(self.to_json())
+        return path
+    
+    def format_summary(self, limit=5):
+        """Short spoken/text summary of where response time goes"""
+        if not self.enabled:
+            return "Performance tracking is off. Set LUFFY_METRICS=1 to enable it."
+        metrics = self.snapshot()['metrics']
+        if not metrics:
+            return "No commands have been timed yet."
+        busiest = sorted(metrics.items(), key=lambda item: item[1]['total_ms'], reverse=True)[:limit]
+        parts = [
+            f"{name}: {stats['count']} calls, p50 {stats['p50_ms']:.2f} ms, p99 {stats['p99_ms']:.2f} ms"
+            for name, stats in busiest
+        ]
+        return "Top time consumers - " + "; ".join(parts)
+    
+    def reply(self, command, dump_path="luffy_stats.json"):
+        """Answer the 'stats' command; 'dump stats' also writes the JSON snapshot"""
+        if 'dump' in command:
+            return f"Performance stats written to {os.path.abspath(self.dump(dump_path))}"
+        return self.format_summary()
+
+
+METRICS = Metrics(enabled=os.environ.get('LUFFY_METRICS', '') not in ('', '0'))
@@ -0,0 +1,203 @@
+"""
+L.U.F.F.Y Intent Router - Compiled keyword automaton for command routing
+Scans each utterance once and picks the winning intent in branch order
+"""
+
+import random
+import time
+from collections import deque
+
+
+def legacy_luffy_intent(command):
+    """Reference routing: the original if/elif keyword chain of LUFFY.process_command"""
+    if any(word in command for word in ['hello', 'hi', 'hey', 'luffy']):
+        return 'greeting'
+    elif 'time' in command:
+        return 'time'
+    elif 'date' in command or 'today' in command:
+        return 'date'
+    elif any(word in command for word in ['calculate', 'compute', 'math', '+', '-', '*', '/', 'plus', 'minus', 'times', 'divided']):
+        return 'calculation'
+    elif 'search' in command or 'google' in command:
+        return 'search'
+    elif 'open' in command:
+        return 'open_app'
+    elif 'weather' in command:
+        return 'weather'
+    elif any(word in command for word in ['exit', 'quit', 'goodbye', 'bye']):
+        return 'exit'
+    elif 'remember' in command or 'learn' in command:
+        return 'remember'
+    elif 'what do you know' in command or 'memory' in command:
+        return 'memory'
+    return None
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton that finds the lowest-ranked keyword, or every keyword, in one pass"""
+    
+    NO_MATCH = float('inf')
+    
+    def __init__(self, keywords):
+        # keywords: iterable of (keyword, rank); lower rank wins
+        goto = [{}]
+        rank = [self.NO_MATCH]
+        matches = [()]  # Ranks of every keyword ending at each state
+        
+        for keyword, keyword_rank in keywords:
+            if not keyword:
+                continue
+            state = 0
+            for ch in keyword:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    rank.append(self.NO_MATCH)
+                    matches.append(())
+                state = nxt
+            rank[state] = min(rank[state], keyword_rank)
+            matches[state] += (keyword_rank,)
+        
+        # Breadth-first pass: failure links, inherited ranks and a full
+        # transition table so the scan never has to follow failure links
+        fail = [0] * len(goto)
+        delta = [dict(edges) for edges in goto]
+        pending = deque(goto[0].values())
+        while pending:
+            state = pending.popleft()
+            for ch, nxt in goto[state].items():
+                fallback = fail[state]
+                while fallback and ch not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[nxt] = goto[fallback].get(ch, 0)
+                rank[nxt] = min(rank[nxt], rank[fail[nxt]])
+                matches[nxt] += matches[fail[nxt]]
+                pending.append(nxt)
+            for ch, target in delta[fail[state]].items():
+                delta[state].setdefault(ch, target)
+        
+        self.delta = delta
+        self.rank = rank
+        self.matches = matches
+        self.size = len(goto)
+    
+    def best_rank(self, text):
+        """Return the lowest rank of any keyword occurring in text"""
+        delta = self.delta
+        rank = self.rank
+        state = 0
+        best = self.NO_MATCH
+        for ch in text:
+            state = delta[state].get(ch, 0)
+            if rank[state] < best:
+                best = rank[state]
+                if best == 0:
+                    break
+        return best
+    
+    def all_ranks(self, text):
+        """Return the set of ranks of every keyword occurring in text"""
+        delta = self.delta
+        matches = self.matches
+        state = 0
+        found = set()
+        for ch in text:
+            state = delta[state].get(ch, 0)
+            if matches[state]:
+                found.update(matches[state])
+        return found
+
+
+class IntentRouter:
+    """Routes lowercased commands to intents using a single keyword automaton"""
+    
+    def __init__(self, intents):
+        self.intent_names = [name for name, _ in intents]
+        self.automaton = KeywordAutomaton(
+            (keyword, index)
+            for index, (_, keywords) in enumerate(intents)
+            for keyword in keywords
+        )
+    
+    def route(self, command):
+        """Return the first intent (in branch order) whose keywords occur in command"""
+        best = self.automaton.best_rank(command)
+        if best == KeywordAutomaton.NO_MATCH:
+            return None
+        return self.intent_names[best]
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def generate_corpus(size=100000, seed=42):
+    """Build a synthetic corpus of utterances covering every branch and misses"""
+    rng = random.Random(seed)
+    templates = [
+        "hello luffy", "hey there", "what time is it", "tell me the time please",
+        "what's the date today", "what day is today", "calculate 15 plus 25",
+        "what is 100 divided by 4", "search for python tutorials", "google latest news",
+        "open notepad", "open calculator", "what's the weather like", "goodbye",
+        "quit now", "remember that i like coffee", "learn from this",
+        "what do you know about me", "show memory", "play some music",
+        "set an alarm for seven", "how are you doing", "tell me a story",
+        "what is the meaning of life", "turn off the lights in the kitchen",
+    ]
+    fillers = ["", " please", " now", " for me", " right away", " captain"]
+    return [rng.choice(templates) + rng.choice(fillers) for _ in range(size)]
+
+
+def _time_calls(route, corpus):
+    timings = []
+    results = []
+    clock = time.perf_counter_ns
+    for command in corpus:
+        start = clock()
+        result = route(command)
+        timings.append(clock() - start)
+        results.append(result)
+    timings.sort()
+    return results, timings
+
+
+def benchmark_router(router=None, reference=legacy_luffy_intent, corpus=None):
+    """Compare compiled routing against the reference chain and report p50/p99 latency"""
+    if router is None:
+        from command_dispatch import LUFFY_DISPATCHER
+        router = LUFFY_DISPATCHER.router
+    if corpus is None:
+        corpus = generate_corpus()
+    
+    reference_results, reference_timings = _time_calls(reference, corpus)
+    router_results, router_timings = _time_calls(router.route, corpus)
+    mismatches = [
+        (command, expected, actual)
+        for command, expected, actual in zip(corpus, reference_results, router_results)
+        if expected != actual
+    ]
+    
+    return {
+        'utterances': len(corpus),
+        'mismatches': len(mismatches),
+        'mismatch_examples': mismatches[:10],
+        'reference_p50_us': percentile(reference_timings, 50) / 1000.0,
+        'reference_p99_us': percentile(reference_timings, 99) / 1000.0,
+        'router_p50_us': percentile(router_timings, 50) / 1000.0,
+        'router_p99_us': percentile(router_timings, 99) / 1000.0,
+    }
+
+
+if __name__ == "__main__":
+    report = benchmark_router()
+    print(f"Routed {report['utterances']} utterances, {report['mismatches']} mismatches")
+    print(f"Reference chain: p50 {report['reference_p50_us']:.2f} us, p99 {report['reference_p99_us']:.2f} us")
+    print(f"Compiled router: p50 {report['router_p50_us']:.2f} us, p99 {report['router_p99_us']:.2f} us")
+    for command, expected, actual in report['mismatch_examples']:
+        print(f"  MISMATCH {command!r}: expected {expected}, got {actual}")
@@ -24,6 +24,9 @@ import pytesseract
 from pathlib import Path
 import base64
 import io
+from command_dispatch import CommandProcessor, CONVERSATION_DISPATCHER, DASHBOARD_DISPATCHER
+from command_scheduler import CommandScheduler
+from instrumentation import METRICS
 
 # Voice and TTS imports
 try:
@@ -53,6 +56,8 @@ class VoiceInterface:
     """Voice Interface Module - Speech recognition and synthesis"""
     
     def __init__(self):
+        # Commands run on several lanes at once, but the TTS engine speaks one reply at a time
+        self.speech_lock = threading.Lock()
         self.setup_voice()
         self.wake_word_active = False
         
@@ -111,8 +116,9 @@ class VoiceInterface:
         print(f"L.U.F.F.Y: {text}")
         if VOICE_AVAILABLE:
             try:
-                self.tts_engine.say(text)
-                self.tts_engine.runAndWait()
+                with self.speech_lock:
+                    self.tts_engine.say(text)
+                    self.tts_engine.runAndWait()
             except:
                 pass
     
@@ -257,73 +263,73 @@ class AIBrain:
     
     def enhanced_response(self, query):
         """Enhanced responses with personality when LLM unavailable"""
-        query = query.lower()
-        
-        # Greetings with personality
-        if any(word in query for word in ["hello", "hi", "hey", "good morning", "good evening"]):
-            greetings = [
-                "Hello captain! Ready to assist you today.",
-                "Greetings! How may I serve you, captain?",
-                "Good to see you, captain. What can I do for you?",
-                "At your service, captain. How can I help?"
-            ]
-            import random
-            return random.choice(greetings)
-        
-        # Time queries
-        elif "time" in query:
-            current_time = datetime.datetime.now().strftime('%I:%M %p')
-            return f"The current time is {current_time}, captain."
-        
-        # Date queries
-        elif "date" in query or "today" in query:
-            current_date = datetime.datetime.now().strftime('%A, %B %d, %Y')
-            return f"Today is {current_date}, captain."
-        
-        # Weather (placeholder)
-        elif "weather" in query:
-            return "I'd be happy to check the weather for you, captain. Weather integration is ready for API setup."
-        
-        # Personal questions
-        elif any(word in query for word in ["who are you", "what are you", "your name"]):
-            return "I'm L.U.F.F.Y - Learning Universal Friendly Framework for You. I'm your personal AI assistant, captain."
-        
-        # Capabilities
-        elif any(word in query for word in ["what can you do", "help me", "capabilities"]):
-            return "I can help with voice commands, system control, opening applications, web searches, screen analysis, and much more, captain. Just ask!"
-        
-        # Jokes
-        elif "joke" in query or "funny" in query:
-            jokes = [
-                "Why don't scientists trust atoms? Because they make up everything, captain!",
-                "I told my computer a joke about UDP... but I'm not sure if it got it, captain.",
-                "Why do programmers prefer dark mode? Because light attracts bugs, captain!",
-                "How do you comfort a JavaScript bug? You console it, captain!"
-            ]
-            import random
-            return random.choice(jokes)
-        
-        # Thanks
-        elif any(word in query for word in ["thank", "thanks", "appreciate"]):
-            responses = [
-                "You're welcome, captain!",
-                "Always happy to help, captain.",
-                "My pleasure, captain!",
-                "Anytime, captain!"
-            ]
-            import random
-            return random.choice(responses)
-        
-        # Default response
-        else:
-            defaults = [
-                "I'm here to help, captain. What would you like me to do?",
-                "How can I assist you today, captain?",
-                "I'm ready for your command, captain.",
-                "What do you need, captain?"
-            ]
-            import random
-            return random.choice(defaults)
+        return CONVERSATION_DISPATCHER.dispatch(self, query)
+    
+    def reply_greeting(self, match):
+        """Greetings with personality"""
+        greetings = [
+            "Hello captain! Ready to assist you today.",
+            "Greetings! How may I serve you, captain?",
+            "Good to see you, captain. What can I do for you?",
+            "At your service, captain. How can I help?"
+        ]
+        import random
+        return random.choice(greetings)
+    
+    def reply_time(self, match):
+        """Time queries"""
+        current_time = datetime.datetime.now().strftime('%I:%M %p')
+        return f"The current time is {current_time}, captain."
+    
+    def reply_date(self, match):
+        """Date queries"""
+        current_date = datetime.datetime.now().strftime('%A, %B %d, %Y')
+        return f"Today is {current_date}, captain."
+    
+    def reply_weather(self, match):
+        """Weather (placeholder)"""
+        return "I'd be happy to check the weather for you, captain. Weather integration is ready for API setup."
+    
+    def reply_identity(self, match):
+        """Personal questions"""
+        return "I'm L.U.F.F.Y - Learning Universal Friendly Framework for You. I'm your personal AI assistant, captain."
+    
+    def reply_capabilities(self, match):
+        """Capabilities"""
+        return "I can help with voice commands, system control, opening applications, web searches, screen analysis, and much more, captain. Just ask!"
+    
+    def reply_joke(self, match):
+        """Jokes"""
+        jokes = [
+            "Why don't scientists trust atoms? Because they make up everything, captain!",
+            "I told my computer a joke about UDP... but I'm not sure if it got it, captain.",
+            "Why do programmers prefer dark mode? Because light attracts bugs, captain!",
+            "How do you comfort a JavaScript bug? You console it, captain!"
+        ]
+        import random
+        return random.choice(jokes)
+    
+    def reply_thanks(self, match):
+        """Thanks"""
+        responses = [
+            "You're welcome, captain!",
+            "Always happy to help, captain.",
+            "My pleasure, captain!",
+            "Anytime, captain!"
+        ]
+        import random
+        return random.choice(responses)
+    
+    def reply_default(self, match):
+        """Default response"""
+        defaults = [
+            "I'm here to help, captain. What would you like me to do?",
+            "How can I assist you today, captain?",
+            "I'm ready for your command, captain.",
+            "What do you need, captain?"
+        ]
+        import random
+        return random.choice(defaults)
 
 class SystemControl:
     """System Control Module - Application, file, web, and hardware control"""
@@ -673,23 +679,30 @@ class InternetModule:
         except:
             return "News service unavailable"
 
-class Dashboard:
+class Dashboard(CommandProcessor):
     """Dashboard Module - GUI interface, status monitoring, command log"""
     
-    def __init__(self):
-        self.setup_gui()
+    def __init__(self, headless=False):
+        # Headless dashboards skip Tk and the voice interface (batch jobs, tests)
+        self.headless = headless
+        # Commands run on per-lane worker pools so quick ones bypass LLM/OCR calls
+        self.command_queue = CommandScheduler(DASHBOARD_DISPATCHER)
+        if not headless:
+            self.setup_gui()
         self.setup_modules()
         
     def setup_modules(self):
         """Initialize all system modules"""
-        self.voice = VoiceInterface()
+        if not self.headless:
+            self.voice = VoiceInterface()
         self.vision = VisionModule()
         self.ai_brain = AIBrain()
         self.system_control = SystemControl()
         self.internet = InternetModule()
         
         # Set up voice callback
-        self.voice.start_wake_word_detection(self.process_voice_command)
+        if not self.headless:
+            self.voice.start_wake_word_detection(self.process_voice_command)
     
     def setup_gui(self):
         """Setup main dashboard interface"""
@@ -815,60 +828,66 @@ class Dashboard:
         self.input_var.set("")
         
         # Process command
-        threading.Thread(target=self.process_command, args=(message,), daemon=True).start()
+        if self.command_queue.submit(message, self.process_command, message) is None:
+            self.add_message("L.U.F.F.Y", "Still working through your previous commands, captain. One moment.")
     
     def process_command(self, command):
         """Process user command through appropriate module"""
-        command = command.lower()
-        
-        # Enhanced command routing with voice shortcuts
-        command_lower = command.lower()
-        
-        # Voice shortcuts and aliases
-        if any(phrase in command_lower for phrase in ["open", "launch", "start", "run"]):
-            app_name = command_lower
-            for word in ["open", "launch", "start", "run"]:
-                app_name = app_name.replace(word, "").strip()
-            response = self.system_control.open_application(app_name)
-            
-        elif any(phrase in command_lower for phrase in ["search for", "google", "find", "look up"]):
-            query = command_lower
-            for phrase in ["search for", "search", "google", "find", "look up"]:
-                query = query.replace(phrase, "").strip()
-            response = self.internet.web_search(query)
-            
-        elif any(phrase in command_lower for phrase in ["analyze screen", "screen analysis", "what's on screen", "see screen"]):
-            response = self.vision.analyze_screen()
-            
-        elif any(phrase in command_lower for phrase in ["system status", "system info", "how's the system", "computer status"]):
-            response = self.system_control.get_system_info()
-            
-        elif any(phrase in command_lower for phrase in ["shutdown", "restart", "reboot", "lock", "sleep", "volume up", "volume down", "mute"]):
-            response = self.system_control.execute_system_command(command)
-            
-        # Natural language commands
-        elif any(phrase in command_lower for phrase in ["what time", "current time", "time is it"]):
-            response = f"The current time is {datetime.datetime.now().strftime('%I:%M %p')}, captain."
-            
-        elif any(phrase in command_lower for phrase in ["what date", "today's date", "what day"]):
-            response = f"Today is {datetime.datetime.now().strftime('%A, %B %d, %Y')}, captain."
-            
-        elif any(phrase in command_lower for phrase in ["tell me a joke", "make me laugh", "something funny"]):
-            jokes = [
-                "Why don't scientists trust atoms? Because they make up everything, captain!",
-                "I told my computer a joke about UDP... but I'm not sure if it got it, captain.",
-                "Why do programmers prefer dark mode? Because light attracts bugs, captain!"
-            ]
-            import random
-            response = random.choice(jokes)
-            
-        else:
-            # Use AI Brain for general queries
-            response = self.ai_brain.process_with_llm(command)
+        response = self.process_command_text(command).text
         
         self.add_message("L.U.F.F.Y", response)
         self.voice.speak(response)
     
+    def process_command_text(self, command):
+        """Route a command and return a structured Response without touching Tk or TTS"""
+        return DASHBOARD_DISPATCHER.respond(self, command)
+    
+    def handle_stats(self, match):
+        """Performance statistics"""
+        return METRICS.reply(match.normalized)
+    
+    def handle_open_app(self, match):
+        """Voice shortcuts and aliases"""
+        return self.system_control.open_application(match.entities['app'])
+    
+    def handle_search(self, match):
+        """Web search"""
+        return self.internet.web_search(match.entities['query'])
+    
+    def handle_screen_analysis(self, match):
+        """Screen analysis"""
+        return self.vision.analyze_screen()
+    
+    def handle_system_status(self, match):
+        """System status"""
+        return self.system_control.get_system_info()
+    
+    def handle_system_command(self, match):
+        """Power and volume control"""
+        return self.system_control.execute_system_command(match.text)
+    
+    def handle_time(self, match):
+        """Natural language time query"""
+        return f"The current time is {datetime.datetime.now().strftime('%I:%M %p')}, captain."
+    
+    def handle_date(self, match):
+        """Natural language date query"""
+        return f"Today is {datetime.datetime.now().strftime('%A, %B %d, %Y')}, captain."
+    
+    def handle_joke(self, match):
+        """Jokes"""
+        jokes = [
+            "Why don't scientists trust atoms? Because they make up everything, captain!",
+            "I told my computer a joke about UDP... but I'm not sure if it got it, captain.",
+            "Why do programmers prefer dark mode? Because light attracts bugs, captain!"
+        ]
+        import random
+        return random.choice(jokes)
+    
+    def handle_general_query(self, match):
+        """Use AI Brain for general queries"""
+        return self.ai_brain.process_with_llm(match.normalized)
+    
     def process_voice_command(self, command):
         """Process voice-activated command"""
         self.add_message("Voice", command)
@@ -928,6 +947,7 @@ L.U.F.F.Y System Status:
         self.add_message("System", "L.U.F.F.Y Complete System initialized. All modules online, captain.")
         self.voice.speak("L.U.F.F.Y Complete System online. How may I assist you today, captain?")
         self.root.mainloop()
+        self.command_queue.shutdown()
 
 if __name__ == "__main__":
     import tkinter.simpledialog
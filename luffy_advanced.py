@@ -3,6 +3,7 @@ from tkinter import ttk, scrolledtext, messagebox, filedialog
 import threading
 import time
 import datetime
+import itertools
 import os
 import subprocess
 import webbrowser
@@ -13,6 +14,10 @@ import platform
 import socket
 import winreg
 from pathlib import Path
+from command_dispatch import ADVANCED_DISPATCHER, CommandProcessor, Response
+from command_scheduler import CommandScheduler
+from instrumentation import METRICS
+from reminder_scheduler import REMINDERS
 
 # Voice and TTS imports with fallbacks
 try:
@@ -30,13 +35,18 @@ except ImportError:
     TTS_AVAILABLE = False
     print("Text-to-speech not available - install pyttsx3")
 
-class AdvancedLUFFY:
-    def __init__(self):
-        self.setup_voice()
+class AdvancedLUFFY(CommandProcessor):
+    def __init__(self, headless=False):
+        # Commands run on several lanes at once, but the TTS engine speaks one reply at a time
+        self.speech_lock = threading.Lock()
+        if not headless:
+            self.setup_voice()
         self.setup_data_storage()
         self.load_user_preferences()
         self.wake_word_active = False
         self.listening_thread = None
+        self.reminder_ids = itertools.count(1)  # Keys for reminders on the shared scheduler
+        self.reminder_keys = []
         
     def setup_voice(self):
         """Initialize voice recognition and TTS"""
@@ -102,8 +112,9 @@ class AdvancedLUFFY:
         print(f"L.U.F.F.Y: {text}")
         if TTS_AVAILABLE and self.preferences.get("voice_enabled", True):
             try:
-                self.tts_engine.say(text)
-                self.tts_engine.runAndWait()
+                with self.speech_lock:
+                    self.tts_engine.say(text)
+                    self.tts_engine.runAndWait()
             except:
                 pass
     
@@ -482,103 +493,121 @@ class AdvancedLUFFY:
     def set_reminder(self, reminder_text, minutes=5):
         """Set a reminder"""
         def reminder_alert():
-            time.sleep(minutes * 60)
             self.speak(f"Reminder: {reminder_text}")
             messagebox.showinfo("L.U.F.F.Y Reminder", reminder_text)
         
-        threading.Thread(target=reminder_alert, daemon=True).start()
+        def fire():
+            # Speech and the dialog block, so they get their own thread rather than the scheduler's
+            threading.Thread(target=reminder_alert, daemon=True).start()
+        
+        key = ('advanced', id(self), next(self.reminder_ids))
+        self.reminder_keys.append(key)
+        REMINDERS.schedule_in(key, minutes * 60, fire)
         return f"Reminder set for {minutes} minutes: {reminder_text}"
     
+    def shutdown(self):
+        """Drop reminders that haven't fired yet"""
+        for key in self.reminder_keys:
+            REMINDERS.cancel(key)
+        self.reminder_keys = []
+    
     def process_command(self, command):
         """Process and respond to commands"""
+        return self.process_command_text(command).text
+    
+    def process_command_text(self, command):
+        """Process a command and return a structured Response"""
         if not command:
-            return "I didn't catch that, captain."
-            
-        command = command.lower().strip()
-        
-        # Greetings
-        if any(word in command for word in ["hello", "hi", "hey", "good morning", "good evening"]):
-            current_hour = datetime.datetime.now().hour
-            if current_hour < 12:
-                greeting = "Good morning"
-            elif current_hour < 18:
-                greeting = "Good afternoon"
-            else:
-                greeting = "Good evening"
-            return f"{greeting}, {self.preferences.get('name', 'Captain')}! How can I assist you today?"
+            return Response("I didn't catch that, captain.", command=command)
         
-        # Time and date
-        elif "time" in command:
-            current_time = datetime.datetime.now().strftime("%I:%M %p")
-            return f"The current time is {current_time}"
-            
-        elif "date" in command:
-            current_date = datetime.datetime.now().strftime("%A, %B %d, %Y")
-            return f"Today is {current_date}"
-        
-        # System information
-        elif "system info" in command or "system status" in command:
-            info = self.get_system_info()
-            return f"System Status - CPU: {info.get('cpu_usage', 'N/A')}, Memory: {info.get('memory_usage', 'N/A')}, Disk: {info.get('disk_usage', 'N/A')}"
-        
-        # System control
-        elif any(word in command for word in ["shutdown", "restart", "lock", "sleep", "volume", "mute"]):
-            return self.control_system(command)
-        
-        # List available applications
-        elif "list apps" in command or "show apps" in command or "available apps" in command:
-            apps = self.find_installed_apps()
-            app_list = list(apps.keys())[:20]  # Show first 20 apps
-            return f"Available applications: {', '.join(app_list)}. Say 'open [app name]' to launch any app."
-        
-        # Open applications
-        elif "open" in command:
-            app_name = command.replace("open", "").strip()
-            return self.open_application(app_name)
-        
-        # Weather
-        elif "weather" in command:
-            city = command.replace("weather", "").replace("in", "").strip()
-            return self.get_weather(city)
-        
-        # Web search
-        elif "search" in command or "google" in command:
-            query = command.replace("search", "").replace("google", "").strip()
-            return self.search_web(query)
-        
-        # File operations
-        elif any(word in command for word in ["create folder", "delete file", "list files"]):
-            return self.file_operations(command)
-        
-        # Calculator
-        elif "calculate" in command or "math" in command:
-            expression = command.replace("calculate", "").replace("math", "").strip()
-            return self.calculate(expression)
-        
-        # Reminders
-        elif "remind me" in command:
-            reminder_text = command.replace("remind me", "").strip()
-            return self.set_reminder(reminder_text)
-        
-        # Jokes
-        elif "joke" in command:
-            jokes = [
-                "Why don't scientists trust atoms? Because they make up everything!",
-                "I told my wife she was drawing her eyebrows too high. She looked surprised.",
-                "Why don't programmers like nature? It has too many bugs!",
-                "I'm reading a book about anti-gravity. It's impossible to put down!"
-            ]
-            import random
-            return random.choice(jokes)
-        
-        # Default response
+        return ADVANCED_DISPATCHER.respond(self, command)
+    
+    def handle_greeting(self, match):
+        """Greetings"""
+        current_hour = datetime.datetime.now().hour
+        if current_hour < 12:
+            greeting = "Good morning"
+        elif current_hour < 18:
+            greeting = "Good afternoon"
         else:
-            return "I'm not sure how to help with that, captain. Try asking about time, weather, opening apps, or system information."
+            greeting = "Good evening"
+        return f"{greeting}, {self.preferences.get('name', 'Captain')}! How can I assist you today?"
+    
+    def handle_time(self, match):
+        """Time queries"""
+        current_time = datetime.datetime.now().strftime("%I:%M %p")
+        return f"The current time is {current_time}"
+    
+    def handle_date(self, match):
+        """Date queries"""
+        current_date = datetime.datetime.now().strftime("%A, %B %d, %Y")
+        return f"Today is {current_date}"
+    
+    def handle_system_info(self, match):
+        """System information"""
+        info = self.get_system_info()
+        return f"System Status - CPU: {info.get('cpu_usage', 'N/A')}, Memory: {info.get('memory_usage', 'N/A')}, Disk: {info.get('disk_usage', 'N/A')}"
+    
+    def handle_system_control(self, match):
+        """System control"""
+        return self.control_system(match.text)
+    
+    def handle_list_apps(self, match):
+        """List available applications"""
+        apps = self.find_installed_apps()
+        app_list = list(apps.keys())[:20]  # Show first 20 apps
+        return f"Available applications: {', '.join(app_list)}. Say 'open [app name]' to launch any app."
+    
+    def handle_stats(self, match):
+        """Performance statistics"""
+        return METRICS.reply(match.normalized)
+    
+    def handle_open_app(self, match):
+        """Open applications"""
+        return self.open_application(match.entities['app'])
+    
+    def handle_weather(self, match):
+        """Weather"""
+        return self.get_weather(match.entities['city'])
+    
+    def handle_search(self, match):
+        """Web search"""
+        return self.search_web(match.entities['query'])
+    
+    def handle_file_operation(self, match):
+        """File operations"""
+        return self.file_operations(match.text)
+    
+    def handle_calculation(self, match):
+        """Calculator"""
+        return self.calculate(match.entities['expression'])
+    
+    def handle_reminder(self, match):
+        """Reminders"""
+        return self.set_reminder(match.entities['reminder'])
+    
+    def handle_joke(self, match):
+        """Jokes"""
+        jokes = [
+            "Why don't scientists trust atoms? Because they make up everything!",
+            "I told my wife she was drawing her eyebrows too high. She looked surprised.",
+            "Why don't programmers like nature? It has too many bugs!",
+            "I'm reading a book about anti-gravity. It's impossible to put down!"
+        ]
+        import random
+        return random.choice(jokes)
+    
+    def handle_unknown(self, match):
+        """Default response"""
+        return "I'm not sure how to help with that, captain. Try asking about time, weather, opening apps, or system information."
+
 
 class LUFFYAdvancedGUI:
     def __init__(self):
         self.luffy = AdvancedLUFFY()
         self.luffy.gui_callback = self.handle_wake_word_activation
+        # Commands run on per-lane worker pools so quick ones bypass slow ones
+        self.command_queue = CommandScheduler(ADVANCED_DISPATCHER)
         self.setup_gui()
         
     def setup_gui(self):
@@ -736,8 +765,13 @@ class LUFFYAdvancedGUI:
         self.add_message("You", message)
         self.input_var.set("")
         
-        # Process command in separate thread
-        threading.Thread(target=self.process_message, args=(message,), daemon=True).start()
+        # Process command on its scheduler lane
+        self.submit_message(message)
+    
+    def submit_message(self, message):
+        """Queue a message on its scheduler lane, telling the user when the lane is full"""
+        if self.command_queue.submit(message, self.process_message, message) is None:
+            self.add_message("L.U.F.F.Y", "I'm still working on your previous commands. One moment please.")
         
     def process_message(self, message):
         """Process message and get response"""
@@ -825,7 +859,7 @@ class LUFFYAdvancedGUI:
     def quick_command(self, command):
         """Execute quick command"""
         self.add_message("You", command)
-        threading.Thread(target=self.process_message, args=(command,), daemon=True).start()
+        self.submit_message(command)
         
     def quick_search(self):
         """Quick search dialog"""
@@ -842,6 +876,8 @@ class LUFFYAdvancedGUI:
     def run(self):
         """Start the GUI"""
         self.root.mainloop()
+        self.command_queue.shutdown()
+        self.luffy.shutdown()
 
 if __name__ == "__main__":
     import tkinter.simpledialog
@@ -19,6 +19,11 @@ import socket
 import cv2
 import numpy as np
 from PIL import Image, ImageTk, ImageGrab
+from command_dispatch import CommandProcessor, CONVERSATION_DISPATCHER, LUFFY_DASHBOARD_DISPATCHER
+from command_scheduler import CommandScheduler
+from fuzzy_index import FuzzyIndex
+from instrumentation import METRICS
+from vector_memory import NUMPY_AVAILABLE, VectorMemory
 
 # Voice recognition imports
 try:
@@ -58,6 +63,8 @@ class LUFFYVoiceInterface:
     """Voice Interface Module - Speech recognition and synthesis"""
     
     def __init__(self):
+        # Commands run on several lanes at once, but the TTS engine speaks one reply at a time
+        self.speech_lock = threading.Lock()
         self.setup_voice()
         self.wake_word_active = False
         
@@ -133,22 +140,23 @@ class LUFFYVoiceInterface:
     
     def speak(self, text):
         print(f"L.U.F.F.Y: {text}")
-        if ADVANCED_TTS:
-            # Use advanced TTS for more natural Luffy voice
-            asyncio.run(self.speak_with_edge_tts(text))
-        elif VOICE_AVAILABLE:
-            try:
-                # Add Luffy-style vocal expressions
-                luffy_text = self.add_luffy_expressions(text)
-                
-                # Energetic speech settings for Luffy
-                self.tts_engine.setProperty('rate', 240)  # Very fast and energetic
-                self.tts_engine.setProperty('volume', 1.0)  # Full volume
-                
-                self.tts_engine.say(luffy_text)
-                self.tts_engine.runAndWait()
-            except:
-                pass
+        with self.speech_lock:
+            if ADVANCED_TTS:
+                # Use advanced TTS for more natural Luffy voice
+                asyncio.run(self.speak_with_edge_tts(text))
+            elif VOICE_AVAILABLE:
+                try:
+                    # Add Luffy-style vocal expressions
+                    luffy_text = self.add_luffy_expressions(text)
+                    
+                    # Energetic speech settings for Luffy
+                    self.tts_engine.setProperty('rate', 240)  # Very fast and energetic
+                    self.tts_engine.setProperty('volume', 1.0)  # Full volume
+                    
+                    self.tts_engine.say(luffy_text)
+                    self.tts_engine.runAndWait()
+                except:
+                    pass
     
     async def speak_with_edge_tts(self, text):
         """Use Microsoft Edge TTS for more natural Luffy voice"""
@@ -343,9 +351,12 @@ class LUFFYVisionModule:
 class LUFFYBrain:
     """AI Brain Module - Local LLM integration with tool calling"""
     
-    def __init__(self):
+    def __init__(self, data_dir="luffy_data"):
         self.setup_llm()
         self.memory = []
+        # Past exchanges are embedded locally and the most relevant ones go back to the LLM as context
+        # (recall is off when NumPy is missing)
+        self.vector_memory = VectorMemory(os.path.join(data_dir, "vector_memory")) if NUMPY_AVAILABLE else None
         
     def setup_llm(self):
         global LLM_AVAILABLE
@@ -369,85 +380,108 @@ class LUFFYBrain:
             return self.enhanced_response(query)
         
         try:
+            if not context:
+                context = self.recall_context(query)
             prompt = f"Context: {context}\nUser: {query}\nAssistant:"
             response = ollama.generate(model=self.model, prompt=prompt)
+            self.remember(query, response['response'])
             return response['response']
         except:
             return self.enhanced_response(query)
     
+    def recall_context(self, query, k=3):
+        """Most relevant past exchanges for query, formatted for the prompt"""
+        if self.vector_memory is None:
+            return ""
+        try:
+            turns = self.vector_memory.search(query, k)
+        except Exception as e:
+            print(f"Vector memory error: {e}")
+            return ""
+        return "\n".join(f"User: {turn['text']}\nAssistant: {turn.get('response', '')}" for _, turn in reversed(turns))
+    
+    def remember(self, query, response):
+        """Store an exchange in vector memory"""
+        if self.vector_memory is None:
+            return
+        try:
+            self.vector_memory.add(query, response=response, timestamp=datetime.datetime.now().isoformat())
+        except Exception as e:
+            print(f"Vector memory error: {e}")
+    
     def enhanced_response(self, query):
         """Enhanced responses with personality when LLM unavailable"""
-        query = query.lower()
-        
-        # Greetings with Luffy personality
-        if any(word in query for word in ["hello", "hi", "hey", "good morning", "good evening"]):
-            greetings = [
-                "Hey there! I'm Luffy! What adventure are we going on?",
-                "Yo! Ready for some fun?",
-                "Hi! Let's do something awesome together!",
-                "Hey! I'm super excited to help you out!",
-                "Yosh! What cool stuff are we gonna do today?"
-            ]
-            import random
-            return random.choice(greetings)
-        
-        # Time queries
-        elif "time" in query:
-            current_time = datetime.datetime.now().strftime('%I:%M %p')
-            return f"It's {current_time} right now! Time flies when you're having adventures!"
-        
-        # Date queries
-        elif "date" in query or "today" in query:
-            current_date = datetime.datetime.now().strftime('%A, %B %d, %Y')
-            return f"Today is {current_date}! What are we gonna do today?"
-        
-        # Weather (placeholder)
-        elif "weather" in query:
-            return "I wish I could check the weather for our next adventure! Weather integration is ready for setup!"
-        
-        # Personal questions
-        elif any(word in query for word in ["who are you", "what are you", "your name"]):
-            return "I'm Luffy! I'm gonna be the King of the Pirates... I mean, your awesome AI assistant! I can do tons of cool stuff!"
-        
-        # Capabilities
-        elif any(word in query for word in ["what can you do", "help me", "capabilities"]):
-            return "I can do so many things! Open apps, search the web, control your computer, and tons more! Just tell me what you want - I'm super strong... I mean, super helpful!"
-        
-        # Jokes
-        elif "joke" in query or "funny" in query:
-            jokes = [
-                "Why did the rubber band break? Because it stretched too far! Get it? Like my powers! Shishishi!",
-                "What's a pirate's favorite letter? You'd think it's R, but it's actually the C! Shishishi!",
-                "Why don't computers ever get hungry? Because they always have bytes! That's so funny!",
-                "What do you call a sleeping bull? A bulldozer! Ahaha, that's awesome!",
-                "Why did the scarecrow win an award? He was outstanding in his field! Just like me!"
-            ]
-            import random
-            return random.choice(jokes)
-        
-        # Thanks
-        elif any(word in query for word in ["thank", "thanks", "appreciate"]):
-            responses = [
-                "No problem! That was fun!",
-                "Yosh! Anytime!",
-                "Awesome! I love helping out!",
-                "That was easy! What's next?",
-                "Shishishi! You got it!"
-            ]
-            import random
-            return random.choice(responses)
-        
-        # Default response
-        else:
-            defaults = [
-                "What do you wanna do? I'm ready for anything!",
-                "Let's go! What's the plan?",
-                "I'm pumped! What can I help with?",
-                "Yosh! Tell me what you need!",
-                "This is gonna be awesome! What should we do?"
-            ]
-            import random
-            return random.choice(defaults)
+        return CONVERSATION_DISPATCHER.dispatch(self, query)
+    
+    def reply_greeting(self, match):
+        """Greetings with Luffy personality"""
+        greetings = [
+            "Hey there! I'm Luffy! What adventure are we going on?",
+            "Yo! Ready for some fun?",
+            "Hi! Let's do something awesome together!",
+            "Hey! I'm super excited to help you out!",
+            "Yosh! What cool stuff are we gonna do today?"
+        ]
+        import random
+        return random.choice(greetings)
+    
+    def reply_time(self, match):
+        """Time queries"""
+        current_time = datetime.datetime.now().strftime('%I:%M %p')
+        return f"It's {current_time} right now! Time flies when you're having adventures!"
+    
+    def reply_date(self, match):
+        """Date queries"""
+        current_date = datetime.datetime.now().strftime('%A, %B %d, %Y')
+        return f"Today is {current_date}! What are we gonna do today?"
+    
+    def reply_weather(self, match):
+        """Weather (placeholder)"""
+        return "I wish I could check the weather for our next adventure! Weather integration is ready for setup!"
+    
+    def reply_identity(self, match):
+        """Personal questions"""
+        return "I'm Luffy! I'm gonna be the King of the Pirates... I mean, your awesome AI assistant! I can do tons of cool stuff!"
+    
+    def reply_capabilities(self, match):
+        """Capabilities"""
+        return "I can do so many things! Open apps, search the web, control your computer, and tons more! Just tell me what you want - I'm super strong... I mean, super helpful!"
+    
+    def reply_joke(self, match):
+        """Jokes"""
+        jokes = [
+            "Why did the rubber band break? Because it stretched too far! Get it? Like my powers! Shishishi!",
+            "What's a pirate's favorite letter? You'd think it's R, but it's actually the C! Shishishi!",
+            "Why don't computers ever get hungry? Because they always have bytes! That's so funny!",
+            "What do you call a sleeping bull? A bulldozer! Ahaha, that's awesome!",
+            "Why did the scarecrow win an award? He was outstanding in his field! Just like me!"
+        ]
+        import random
+        return random.choice(jokes)
+    
+    def reply_thanks(self, match):
+        """Thanks"""
+        responses = [
+            "No problem! That was fun!",
+            "Yosh! Anytime!",
+            "Awesome! I love helping out!",
+            "That was easy! What's next?",
+            "Shishishi! You got it!"
+        ]
+        import random
+        return random.choice(responses)
+    
+    def reply_default(self, match):
+        """Default response"""
+        defaults = [
+            "What do you wanna do? I'm ready for anything!",
+            "Let's go! What's the plan?",
+            "I'm pumped! What can I help with?",
+            "Yosh! Tell me what you need!",
+            "This is gonna be awesome! What should we do?"
+        ]
+        import random
+        return random.choice(defaults)
 
 class SystemControl:
     """System Control Module - Application, file, web, and hardware control"""
@@ -481,6 +515,8 @@ class SystemControl:
         print("System Control Ready")
         self.app_cache = {}  # Cache for faster app discovery
         self.cache_time = 0
+        self.app_index = None  # Fuzzy index over app names, rebuilt with the cache
+        self.app_index_source = None
         
     def discover_applications(self):
         """Fast application discovery with caching"""
@@ -680,6 +716,14 @@ class SystemControl:
             except Exception as e:
                 return f"Failed to open {app}: {str(e)}"
         
+        # Misheard names ("crome", "spotfy") get a suggestion; nothing is launched on a guess
+        if self.app_index is None or self.app_index_source is not apps:
+            self.app_index = FuzzyIndex(apps.keys())
+            self.app_index_source = apps
+        corrected = self.app_index.lookup(app_name)
+        if corrected and corrected != app_name:
+            return f"Application '{app_name}' not found. Did you mean {corrected}? Say 'open {corrected}' to launch it."
+        
         # If no match found, show available options
         app_list = list(apps.keys())[:20]  # Show first 20 apps
         return f"Application '{app_name}' not found. Available apps include: {', '.join(app_list)}..."
@@ -733,23 +777,30 @@ class LUFFYInternetModule:
         except:
             return "News service unavailable"
 
-class LUFFYDashboard:
+class LUFFYDashboard(CommandProcessor):
     """Dashboard Module - GUI interface, status monitoring, command log"""
     
-    def __init__(self):
-        self.setup_gui()
+    def __init__(self, headless=False):
+        # Headless dashboards skip Tk and the voice interface (batch jobs, tests)
+        self.headless = headless
+        # Commands run on per-lane worker pools so quick ones bypass LLM/OCR calls
+        self.command_queue = CommandScheduler(LUFFY_DASHBOARD_DISPATCHER)
+        if not headless:
+            self.setup_gui()
         self.setup_modules()
         
     def setup_modules(self):
         """Initialize all system modules"""
-        self.voice = LUFFYVoiceInterface()
+        if not self.headless:
+            self.voice = LUFFYVoiceInterface()
         self.vision = LUFFYVisionModule()
         self.ai_brain = LUFFYBrain()
         self.system_control = SystemControl()
         self.internet = LUFFYInternetModule()
         
         # Set up voice callback
-        self.voice.start_wake_word_detection(self.process_voice_command)
+        if not self.headless:
+            self.voice.start_wake_word_detection(self.process_voice_command)
     
     def setup_gui(self):
         """Setup main dashboard interface"""
@@ -871,101 +922,111 @@ class LUFFYDashboard:
             self.input_var.set("")
             
             # Process command
-            threading.Thread(target=self.process_command, args=(message,), daemon=True).start()
+            if self.command_queue.submit(message, self.process_command, message) is None:
+                self.add_message("L.U.F.F.Y", "Hold on, I'm still working through your last few commands!")
     
     def process_command(self, command):
         """Process user command through appropriate module - optimized for speed"""
-        command_lower = command.lower().strip()
+        response = self.process_command_text(command).text
         
-        # Voice shortcuts and aliases
-        if any(phrase in command_lower for phrase in ["open", "launch", "start", "run"]):
-            app_name = command_lower
-            for word in ["open", "launch", "start", "run"]:
-                app_name = app_name.replace(word, "").strip()
-            response = self.system_control.open_application(app_name)
-            
-        # YouTube Music commands
-        elif any(phrase in command_lower for phrase in ["play youtube music", "youtube music", "open youtube music"]):
-            # Check if Brave is available
-            apps = self.system_control.discover_applications()
-            if "brave" in apps:
-                try:
-                    subprocess.Popen([apps["brave"], "https://music.youtube.com"])
-                    response = "Yosh! Opening YouTube Music in Brave!"
-                except:
-                    response = "Couldn't open YouTube Music in Brave!"
-            else:
-                # Fallback to default browser
-                import webbrowser
-                webbrowser.open("https://music.youtube.com")
-                response = "Opening YouTube Music in your default browser!"
-                
-        # Specific browser + site commands
-        elif "from brave" in command_lower or "in brave" in command_lower:
-            apps = self.system_control.discover_applications()
-            if "brave" in apps:
-                if "youtube" in command_lower:
-                    if "music" in command_lower:
-                        url = "https://music.youtube.com"
-                        site_name = "YouTube Music"
-                    else:
-                        url = "https://youtube.com"
-                        site_name = "YouTube"
-                elif "netflix" in command_lower:
-                    url = "https://netflix.com"
-                    site_name = "Netflix"
-                elif "spotify" in command_lower:
-                    url = "https://open.spotify.com"
-                    site_name = "Spotify"
-                else:
-                    url = "https://google.com"
-                    site_name = "Google"
-                
-                try:
-                    subprocess.Popen([apps["brave"], url])
-                    response = f"Awesome! Opening {site_name} in Brave!"
-                except:
-                    response = f"Couldn't open {site_name} in Brave!"
+        self.add_message("L.U.F.F.Y", response)
+        self.voice.speak(response)
+    
+    def process_command_text(self, command):
+        """Route a command and return a structured Response without touching Tk or TTS"""
+        return LUFFY_DASHBOARD_DISPATCHER.respond(self, command)
+    
+    def handle_stats(self, match):
+        """Performance statistics"""
+        return METRICS.reply(match.normalized)
+    
+    def handle_open_app(self, match):
+        """Voice shortcuts and aliases"""
+        return self.system_control.open_application(match.entities['app'])
+    
+    def handle_youtube_music(self, match):
+        """YouTube Music commands"""
+        # Check if Brave is available
+        apps = self.system_control.discover_applications()
+        if "brave" in apps:
+            try:
+                subprocess.Popen([apps["brave"], "https://music.youtube.com"])
+                return "Yosh! Opening YouTube Music in Brave!"
+            except:
+                return "Couldn't open YouTube Music in Brave!"
+        else:
+            # Fallback to default browser
+            import webbrowser
+            webbrowser.open("https://music.youtube.com")
+            return "Opening YouTube Music in your default browser!"
+    
+    def handle_brave_site(self, match):
+        """Specific browser + site commands"""
+        command_lower = match.normalized
+        apps = self.system_control.discover_applications()
+        if "brave" not in apps:
+            return "Brave browser not found! Want me to find it?"
+        
+        if "youtube" in command_lower:
+            if "music" in command_lower:
+                url = "https://music.youtube.com"
+                site_name = "YouTube Music"
             else:
-                response = "Brave browser not found! Want me to find it?"
-            
-        elif any(phrase in command_lower for phrase in ["search for", "google", "find", "look up"]):
-            query = command_lower
-            for phrase in ["search for", "search", "google", "find", "look up"]:
-                query = query.replace(phrase, "").strip()
-            response = self.internet.web_search(query)
-            
-        elif any(phrase in command_lower for phrase in ["analyze screen", "screen analysis", "what's on screen", "see screen"]):
-            response = self.vision.analyze_screen()
-            
-        elif any(phrase in command_lower for phrase in ["system status", "system info", "how's the system", "computer status"]):
-            response = self.system_control.get_system_info()
-            
-        elif any(phrase in command_lower for phrase in ["shutdown", "restart", "reboot", "lock", "sleep", "volume up", "volume down", "mute"]):
-            response = self.system_control.execute_system_command(command)
-            
-        # Natural language commands with Luffy personality
-        elif any(phrase in command_lower for phrase in ["what time", "current time", "time is it"]):
-            response = f"It's {datetime.datetime.now().strftime('%I:%M %p')} right now! Time for adventure!"
-            
-        elif any(phrase in command_lower for phrase in ["what date", "today's date", "what day"]):
-            response = f"Today is {datetime.datetime.now().strftime('%A, %B %d, %Y')}! What awesome stuff are we gonna do?"
-            
-        elif any(phrase in command_lower for phrase in ["tell me a joke", "make me laugh", "something funny"]):
-            jokes = [
-                "Why did the rubber band break? Because it stretched too far! Like my powers! Shishishi!",
-                "What's a pirate's favorite letter? You'd think it's R, but it's actually the C! Shishishi!",
-                "Why don't computers get hungry? They always have bytes! That's so funny!"
-            ]
-            import random
-            response = random.choice(jokes)
-            
+                url = "https://youtube.com"
+                site_name = "YouTube"
+        elif "netflix" in command_lower:
+            url = "https://netflix.com"
+            site_name = "Netflix"
+        elif "spotify" in command_lower:
+            url = "https://open.spotify.com"
+            site_name = "Spotify"
         else:
-            # Use AI Brain for general queries
-            response = self.ai_brain.process_with_llm(command)
+            url = "https://google.com"
+            site_name = "Google"
         
-        self.add_message("L.U.F.F.Y", response)
-        self.voice.speak(response)
+        try:
+            subprocess.Popen([apps["brave"], url])
+            return f"Awesome! Opening {site_name} in Brave!"
+        except:
+            return f"Couldn't open {site_name} in Brave!"
+    
+    def handle_search(self, match):
+        """Web search"""
+        return self.internet.web_search(match.entities['query'])
+    
+    def handle_screen_analysis(self, match):
+        """Screen analysis"""
+        return self.vision.analyze_screen()
+    
+    def handle_system_status(self, match):
+        """System status"""
+        return self.system_control.get_system_info()
+    
+    def handle_system_command(self, match):
+        """Power and volume control"""
+        return self.system_control.execute_system_command(match.text)
+    
+    def handle_time(self, match):
+        """Natural language time query with Luffy personality"""
+        return f"It's {datetime.datetime.now().strftime('%I:%M %p')} right now! Time for adventure!"
+    
+    def handle_date(self, match):
+        """Natural language date query with Luffy personality"""
+        return f"Today is {datetime.datetime.now().strftime('%A, %B %d, %Y')}! What awesome stuff are we gonna do?"
+    
+    def handle_joke(self, match):
+        """Jokes"""
+        jokes = [
+            "Why did the rubber band break? Because it stretched too far! Like my powers! Shishishi!",
+            "What's a pirate's favorite letter? You'd think it's R, but it's actually the C! Shishishi!",
+            "Why don't computers get hungry? They always have bytes! That's so funny!"
+        ]
+        import random
+        return random.choice(jokes)
+    
+    def handle_general_query(self, match):
+        """Use AI Brain for general queries"""
+        return self.ai_brain.process_with_llm(match.text)
     
     def process_voice_command(self, command=None):
         """Process voice command from wake word detection or manual input"""
@@ -1023,6 +1084,13 @@ L.U.F.F.Y System Status:
         self.add_message("System", "L.U.F.F.Y Complete System initialized. All modules online!")
         self.voice.speak("Hey Wesley! L.U.F.F.Y is ready to help you become the coding king you're meant to be! What's our mission today?")
         self.root.mainloop()
+        self.shutdown()
+    
+    def shutdown(self):
+        """Stop the lanes and close the vector memory"""
+        self.command_queue.shutdown()
+        if self.ai_brain.vector_memory is not None:
+            self.ai_brain.vector_memory.close()
 
 if __name__ == "__main__":
     import tkinter.simpledialog
@@ -14,6 +14,7 @@ import time
 import re
 import math
 import random
+from command_dispatch import BASIC_DISPATCHER, CommandProcessor, Response
 
 # Check for speech recognition
 try:
@@ -34,10 +35,11 @@ except ImportError:
     TTS_AVAILABLE = False
     print("TTS not available")
 
-class LUFFYWorking:
-    def __init__(self):
+class LUFFYWorking(CommandProcessor):
+    def __init__(self, headless=False):
         self.conversation_history = []
-        self.setup_voice()
+        if not headless:
+            self.setup_voice()
         
         # Personality responses
         self.greetings = [
@@ -166,63 +168,63 @@ class LUFFYWorking:
     
     def process_command(self, command):
         """Process and execute commands"""
+        return self.process_command_text(command).text
+    
+    def process_command_text(self, command):
+        """Process a command and return a structured Response"""
         if not command:
-            return "Please enter a command, captain."
-        
-        original_command = command
-        command = command.lower()
+            return Response("Please enter a command, captain.", command=command)
         
         # Store conversation
-        self.conversation_history.append({"user": original_command, "timestamp": datetime.datetime.now()})
-        
-        # Greetings
-        if any(word in command for word in ['hello', 'hi', 'hey', 'luffy']):
-            response = random.choice(self.greetings)
-            return response
-        
-        # Time queries
-        elif 'time' in command:
-            return self.get_current_time()
-        
-        # Date queries
-        elif 'date' in command or 'today' in command:
-            return self.get_current_date()
-        
-        # Calculations
-        elif any(word in command for word in ['calculate', 'compute', 'math', '+', '-', '*', '/', 'plus', 'minus', 'times', 'divided']):
-            math_pattern = r'[\d+\-*/().]+|plus|minus|times|divided by'
-            expression = ' '.join(re.findall(math_pattern, command))
-            expression = expression.replace('plus', '+').replace('minus', '-').replace('times', '*').replace('divided by', '/')
-            if expression:
-                return self.calculate(expression)
-            else:
-                return "Please provide a mathematical expression, captain."
-        
-        # Web search
-        elif 'search' in command or 'google' in command:
-            query = command.replace('search', '').replace('google', '').replace('for', '').strip()
-            if query:
-                return self.search_web(query)
-            else:
-                return "What would you like me to search for, captain?"
-        
-        # Open applications
-        elif 'open' in command:
-            app = command.replace('open', '').strip()
-            return self.open_application(app)
-        
-        # Exit commands
-        elif any(word in command for word in ['exit', 'quit', 'goodbye', 'bye']):
-            return "Goodbye, captain. It was a pleasure serving you."
+        self.conversation_history.append({"user": command, "timestamp": datetime.datetime.now()})
         
-        # Unknown command
+        return BASIC_DISPATCHER.respond(self, command)
+    
+    def handle_greeting(self, match):
+        """Greetings"""
+        return random.choice(self.greetings)
+    
+    def handle_time(self, match):
+        """Time queries"""
+        return self.get_current_time()
+    
+    def handle_date(self, match):
+        """Date queries"""
+        return self.get_current_date()
+    
+    def handle_calculation(self, match):
+        """Calculations"""
+        expression = match.entities['expression']
+        if expression:
+            return self.calculate(expression)
         else:
-            responses = [
-                "I'm not sure I understand that command, captain.",
-                "Could you please rephrase that, captain?",
-                "I didn't quite catch that, captain."
-            ]
-            return random.choice(responses)
+            return "Please provide a mathematical expression, captain."
+    
+    def handle_search(self, match):
+        """Web search"""
+        query = match.entities['query']
+        if query:
+            return self.search_web(query)
+        else:
+            return "What would you like me to search for, captain?"
+    
+    def handle_open_app(self, match):
+        """Open applications"""
+        return self.open_application(match.entities['app'])
+    
+    def handle_exit(self, match):
+        """Exit commands"""
+        return "Goodbye, captain. It was a pleasure serving you."
+    
+    def handle_unknown(self, match):
+        """Unknown command"""
+        responses = [
+            "I'm not sure I understand that command, captain.",
+            "Could you please rephrase that, captain?",
+            "I didn't quite catch that, captain."
+        ]
+        return random.choice(responses)
+
 
 class LUFFYWorkingGui:
     def __init__(self):
@@ -379,7 +381,8 @@ class LUFFYWorkingGui:
             self.command_entry.delete(0, tk.END)
             
             # Process command
-            response = self.luffy.process_command(command)
+            reply = self.luffy.process_command_text(command)
+            response = reply.text
             self.add_to_chat("L.U.F.F.Y", response)
             
             # Speak response if TTS available
@@ -387,7 +390,7 @@ class LUFFYWorkingGui:
                 threading.Thread(target=lambda: self.luffy.speak(response), daemon=True).start()
             
             # Check for exit
-            if any(word in command.lower() for word in ['exit', 'quit', 'goodbye', 'bye']):
+            if reply.end_session:
                 self.root.after(2000, self.root.quit)
     
     def voice_command(self):
@@ -410,7 +413,8 @@ class LUFFYWorkingGui:
                     self.root.after(0, lambda: self.add_to_chat("You", command))
                     
                     # Process command
-                    response = self.luffy.process_command(command)
+                    reply = self.luffy.process_command_text(command)
+                    response = reply.text
                     self.root.after(0, lambda: self.add_to_chat("L.U.F.F.Y", response))
                     
                     # Speak response
@@ -418,7 +422,7 @@ class LUFFYWorkingGui:
                         self.luffy.speak(response)
                     
                     # Check for exit
-                    if any(word in command.lower() for word in ['exit', 'quit', 'goodbye', 'bye']):
+                    if reply.end_session:
                         self.root.after(2000, self.root.quit)
                 else:
                     self.root.after(0, lambda: self.add_to_chat("L.U.F.F.Y", "I didn't hear anything, captain. Try again."))
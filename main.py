@@ -31,11 +31,20 @@ import time
 import re
 import math
 import random
-from ai_brain import AIBrain
+from brain_profiles import DEFAULT_PROFILE, BrainProfiles
+from autosave import AUTOSAVE
+from command_dispatch import CommandProcessor, LUFFY_DISPATCHER, Response, merge_responses, run_compound
+from command_scheduler import SLOW, CommandScheduler
+from conversation_store import time_window
+from instrumentation import METRICS
 
-class LUFFY:
-    def __init__(self):
-        if SPEECH_AVAILABLE:
+class LUFFY(CommandProcessor):
+    def __init__(self, headless=False):
+        global SPEECH_AVAILABLE, TTS_AVAILABLE
+        
+        # Headless instances skip microphone and TTS setup (batch jobs, tests)
+        self.headless = headless
+        if SPEECH_AVAILABLE and not headless:
             try:
                 self.recognizer = sr.Recognizer()
                 self.microphone = sr.Microphone()
@@ -43,7 +52,7 @@ class LUFFY:
                 SPEECH_AVAILABLE = False
                 print("Microphone not available - using text input only")
         
-        if TTS_AVAILABLE:
+        if TTS_AVAILABLE and not headless:
             try:
                 self.tts_engine = pyttsx3.init()
                 self.setup_voice()
@@ -51,10 +60,15 @@ class LUFFY:
                 TTS_AVAILABLE = False
                 print("Text-to-speech not available - using text output only")
         self.listening = False
-        self.command_queue = queue.Queue()
+        # Per-lane scheduler: quick intents never queue behind slow ones
+        self.command_queue = CommandScheduler(LUFFY_DISPATCHER)
+        # Held while speaking and while the microphone is open, so LUFFY never hears itself
+        self.speech_lock = threading.Lock()
         
-        # Initialize AI Brain
-        self.brain = AIBrain()
+        # Initialize AI Brain (one per user; idle profiles are written back and unloaded)
+        self.profiles = BrainProfiles()
+        self.user = DEFAULT_PROFILE
+        self.brain = self.profiles.get(self.user)
         self.conversation_context = {}
         
         # Import task automation
@@ -98,11 +112,13 @@ class LUFFY:
         """Convert text to speech"""
         print(f"L.U.F.F.Y: {text}")
         if TTS_AVAILABLE:
-            try:
-                self.tts_engine.say(text)
-                self.tts_engine.runAndWait()
-            except:
-                pass  # Just print if TTS fails
+            # Lanes run concurrently, but the TTS engine speaks one reply at a time
+            with self.speech_lock:
+                try:
+                    self.tts_engine.say(text)
+                    self.tts_engine.runAndWait()
+                except:
+                    pass  # Just print if TTS fails
     
     def listen(self):
         """Listen for voice commands"""
@@ -110,10 +126,12 @@ class LUFFY:
             return None
         
         try:
-            with self.microphone as source:
-                self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
-                print("Listening...")
-                audio = self.recognizer.listen(source, timeout=5, phrase_time_limit=10)
+            # A reply finishing on another lane waits until the microphone is closed again
+            with self.speech_lock:
+                with self.microphone as source:
+                    self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
+                    print("Listening...")
+                    audio = self.recognizer.listen(source, timeout=5, phrase_time_limit=10)
             
             command = self.recognizer.recognize_google(audio).lower()
             print(f"You said: {command}")
@@ -178,150 +196,175 @@ class LUFFY:
         else:
             return f"I don't know how to open {app_name}, captain."
     
-    def process_command(self, command):
+    def process_command(self, command, plan=None):
         """Process and execute commands with AI intelligence"""
-        if not command:
+        response = self.process_command_text(command, plan)
+        if response is None:
             return
         
-        original_command = command
-        command = command.lower()
-        
-        # Check for intelligent contextual response first
-        contextual_response = self.brain.get_contextual_response(command)
-        if contextual_response:
-            self.speak(contextual_response)
-            self.brain.add_to_memory(original_command, contextual_response, self.conversation_context)
-            return True
-        
-        # Greetings with AI enhancement
-        if any(word in command for word in ['hello', 'hi', 'hey', 'luffy']):
-            # Check for personalized greeting
-            personalized = self.brain.generate_personalized_response(command, self.brain.get_recent_context(), 'formal')
-            if personalized:
-                response = personalized
-            else:
-                response = random.choice(self.greetings).replace('sir', 'captain')
-                # Add smart suggestions
-                suggestions = self.brain.get_smart_suggestions()
-                if suggestions:
-                    response += " " + suggestions[0]
-            
-            self.speak(response)
-            self.brain.add_to_memory(original_command, response, self.conversation_context)
-        
-        # Time queries
-        elif 'time' in command:
-            response = self.get_current_time()
-            self.speak(response)
-            self.brain.add_to_memory(original_command, response, self.conversation_context)
+        self.speak(response.text)
+        return not response.end_session
+    
+    def process_command_text(self, command, plan=None):
+        """Process a command and return a structured Response without speaking it
         
-        # Date queries
-        elif 'date' in command or 'today' in command:
-            response = self.get_current_date()
-            self.speak(response)
-            self.brain.add_to_memory(original_command, response, self.conversation_context)
+        plan is LUFFY_DISPATCHER.plan(command) when the caller already routed it.
+        """
+        if not command:
+            return None
         
-        # Calculations with learning
-        elif any(word in command for word in ['calculate', 'compute', 'math', '+', '-', '*', '/', 'plus', 'minus', 'times', 'divided']):
-            # Extract mathematical expression
-            math_pattern = r'[\d+\-*/().]+|plus|minus|times|divided by'
-            expression = ' '.join(re.findall(math_pattern, command))
-            expression = expression.replace('plus', '+').replace('minus', '-').replace('times', '*').replace('divided by', '/')
-            if expression:
-                response = self.calculate(expression)
-                # Check if user frequently does calculations
-                if self.brain.user_profile.get('command_frequency', {}).get('calculation', 0) > 5:
-                    response += " I notice you do calculations often. I'm always ready for math, captain."
-            else:
-                response = "Please provide a mathematical expression, captain."
-            
-            self.speak(response)
-            self.brain.add_to_memory(original_command, response, self.conversation_context)
+        if plan is None:
+            plan = METRICS.timed('route', LUFFY_DISPATCHER.plan, command)
+        # "open notepad and what time is it" -> one merged reply
+        if len(plan) > 1 or len(plan[0]) > 1:
+            return merge_responses(command, run_compound(plan, self.respond_to))
+        return self.respond_to(plan[0][0])
+    
+    def respond_to(self, match):
+        """Reply to one routed (sub-)command"""
+        original_command = match.text
+        command = match.normalized
         
-        # Web search with intelligence
-        elif 'search' in command or 'google' in command:
-            query = command.replace('search', '').replace('google', '').replace('for', '').strip()
-            if query:
-                response = self.search_web(query)
-                # Remember search topics
-                self.conversation_context['last_search'] = query
-            else:
-                response = "What would you like me to search for, captain?"
-            
-            self.speak(response)
-            self.brain.add_to_memory(original_command, response, self.conversation_context)
+        # Check for intelligent contextual response first (diagnostics, profile switches and
+        # history searches bypass it: their answer depends on state, not on what was said last time)
+        if match.name not in ('stats', 'switch_user', 'history'):
+            contextual_response = METRICS.timed('brain.get_contextual_response', self.brain.get_contextual_response, command)
+            if contextual_response:
+                METRICS.timed('brain.add_to_memory', self.brain.add_to_memory, original_command, contextual_response, self.conversation_context)
+                return Response(contextual_response, 'contextual', command=original_command)
         
-        # Open applications with learning
-        elif 'open' in command:
-            app = command.replace('open', '').strip()
-            response = self.open_application(app)
-            # Remember frequently used apps
-            self.conversation_context['last_app'] = app
-            self.speak(response)
-            self.brain.add_to_memory(original_command, response, self.conversation_context)
+        text = LUFFY_DISPATCHER.handle(self, match)
+        # History questions are stored as such, so later history searches skip them
+        METRICS.timed('brain.add_to_memory', self.brain.add_to_memory, original_command, text, self.conversation_context,
+                      'history' if match.name == 'history' else None)
         
-        # Weather with learning
-        elif 'weather' in command:
-            response = "I would need a weather API key to provide weather information, captain. However, I can remember your weather preferences for future updates."
-            self.speak(response)
-            self.brain.add_to_memory(original_command, response, self.conversation_context)
+        # Exit commands end the session
+        return Response(text, match.name, match.entities, original_command, end_session=match.name == 'exit')
+    
+    def handle_stats(self, match):
+        """Performance statistics"""
+        return METRICS.reply(match.normalized)
+    
+    def handle_greeting(self, match):
+        """Greetings with AI enhancement"""
+        # Check for personalized greeting
+        personalized = self.brain.generate_personalized_response(match.normalized, self.brain.get_recent_context(), 'formal')
+        if personalized:
+            return personalized
         
-        # Exit commands with memory save
-        elif any(word in command for word in ['exit', 'quit', 'goodbye', 'bye']):
-            # Save learned data
-            self.brain.save_brain_data()
-            
-            # Personalized goodbye
-            total_interactions = self.brain.user_profile.get('total_interactions', 0)
-            if total_interactions > 20:
-                response = "Goodbye, captain. I've learned much from our conversations today. Until next time."
-            else:
-                response = "Goodbye, captain. It was a pleasure serving you."
-            
-            self.speak(response)
-            self.brain.add_to_memory(original_command, response, self.conversation_context)
-            return False
+        response = random.choice(self.greetings).replace('sir', 'captain')
+        # Add smart suggestions
+        suggestions = self.brain.get_smart_suggestions()
+        if suggestions:
+            response += " " + suggestions[0]
+        return response
+    
+    def handle_time(self, match):
+        """Time queries"""
+        return self.get_current_time()
+    
+    def handle_date(self, match):
+        """Date queries"""
+        return self.get_current_date()
+    
+    def handle_calculation(self, match):
+        """Calculations with learning"""
+        expression = match.entities['expression']
+        if not expression:
+            return "Please provide a mathematical expression, captain."
         
-        # Learning and memory commands
-        elif 'remember' in command or 'learn' in command:
-            if 'remember' in command:
-                info = command.replace('remember', '').strip()
-                self.brain.set_user_preference('remembered_info', info)
-                response = f"I'll remember that, captain: {info}"
-            else:
-                response = "I'm always learning from our interactions, captain."
-            
-            self.speak(response)
-            self.brain.add_to_memory(original_command, response, self.conversation_context)
+        response = self.calculate(expression)
+        # Check if user frequently does calculations
+        if self.brain.user_profile.get('command_frequency', {}).get('calculation', 0) > 5:
+            response += " I notice you do calculations often. I'm always ready for math, captain."
+        return response
+    
+    def handle_search(self, match):
+        """Web search with intelligence"""
+        query = match.entities['query']
+        if not query:
+            return "What would you like me to search for, captain?"
         
-        # Memory summary
-        elif 'what do you know' in command or 'memory' in command:
-            summary = self.brain.get_memory_summary()
-            response = f"I've had {summary['total_interactions']} interactions with you, learned {summary['learned_patterns']} patterns, and have {summary['preferences_set']} preferences stored, captain."
-            self.speak(response)
-            self.brain.add_to_memory(original_command, response, self.conversation_context)
+        # Remember search topics
+        self.conversation_context['last_search'] = query
+        return self.search_web(query)
+    
+    def handle_open_app(self, match):
+        """Open applications with learning"""
+        app = match.entities['app']
+        response = self.open_application(app)
+        # Remember frequently used apps
+        self.conversation_context['last_app'] = app
+        return response
+    
+    def handle_weather(self, match):
+        """Weather with learning"""
+        return "I would need a weather API key to provide weather information, captain. However, I can remember your weather preferences for future updates."
+    
+    def handle_exit(self, match):
+        """Exit commands with memory save"""
+        # Save learned data
+        self.brain.save_brain_data()
         
-        # Unknown command with learning
+        # Personalized goodbye
+        total_interactions = self.brain.user_profile.get('total_interactions', 0)
+        if total_interactions > 20:
+            return "Goodbye, captain. I've learned much from our conversations today. Until next time."
+        return "Goodbye, captain. It was a pleasure serving you."
+    
+    def handle_remember(self, match):
+        """Learning and memory commands"""
+        if 'remember' in match.normalized:
+            info = match.normalized.replace('remember', '').strip()
+            self.brain.set_user_preference('remembered_info', info)
+            return f"I'll remember that, captain: {info}"
+        return "I'm always learning from our interactions, captain."
+    
+    def handle_memory(self, match):
+        """Memory summary"""
+        summary = self.brain.get_memory_summary()
+        return f"I've had {summary['total_interactions']} interactions with you, learned {summary['learned_patterns']} patterns, and have {summary['preferences_set']} preferences stored, captain."
+    
+    def handle_switch_user(self, match):
+        """Load another person's brain profile"""
+        user = match.entities['user']
+        if not user:
+            return "Who should I switch to, captain?"
+        self.user = user
+        self.brain = self.profiles.get(user)
+        total_interactions = self.brain.user_profile.get('total_interactions', 0)
+        if total_interactions:
+            return f"Welcome back, {user}. We've talked {total_interactions} times before."
+        return f"Nice to meet you, {user}. I'll start learning your preferences."
+    
+    def handle_history(self, match):
+        """Search past conversations ("what did I ask about python last week")"""
+        since, until, topic = time_window(match.entities['topic'])
+        if not topic:
+            return "What topic should I look for in our conversations, captain?"
+        turns = self.brain.search_history(topic, since, until, limit=3)
+        if not turns:
+            return f"I don't recall you asking about {topic}, captain."
+        asked = [f"on {datetime.datetime.fromisoformat(turn['timestamp']).strftime('%A %B %d at %I:%M %p')} you said '{turn['user_input']}'"
+                 for turn in turns]
+        return "Captain, " + "; ".join(asked) + "."
+    
+    def handle_unknown(self, match):
+        """Unknown command with learning"""
+        # Analyze sentiment to provide appropriate response
+        sentiment = self.brain.analyze_sentiment(match.normalized)
+        if sentiment == 'negative':
+            responses = [
+                "I sense frustration, captain. Let me try to help better.",
+                "I apologize for the confusion, captain. Could you rephrase that?"
+            ]
         else:
-            # Analyze sentiment to provide appropriate response
-            sentiment = self.brain.analyze_sentiment(command)
-            if sentiment == 'negative':
-                responses = [
-                    "I sense frustration, captain. Let me try to help better.",
-                    "I apologize for the confusion, captain. Could you rephrase that?"
-                ]
-            else:
-                responses = [
-                    "I'm not sure I understand that command, captain. I'm still learning.",
-                    "Could you please rephrase that, captain? I'll remember for next time.",
-                    "I didn't quite catch that, captain. Help me learn by rephrasing."
-                ]
-            
-            response = random.choice(responses)
-            self.speak(response)
-            self.brain.add_to_memory(original_command, response, self.conversation_context)
-        
-        return True
+            responses = [
+                "I'm not sure I understand that command, captain. I'm still learning.",
+                "Could you please rephrase that, captain? I'll remember for next time.",
+                "I didn't quite catch that, captain. Help me learn by rephrasing."
+            ]
+        return random.choice(responses)
     
     def run(self):
         """Main execution loop"""
@@ -331,11 +374,31 @@ class LUFFY:
             try:
                 command = self.listen()
                 if command:
-                    if not self.process_command(command):
+                    # Routed once; the exit check, the lane and the reply all use this plan
+                    plan = METRICS.timed('route', LUFFY_DISPATCHER.plan, command)
+                    # Exit runs inline so the loop can stop; everything else is scheduled
+                    if any(match.name == 'exit' for stage in plan for match in stage):
+                        self.process_command(command, plan)
                         break
+                    lane = self.command_queue.lane_for(command, plan)
+                    ticket = self.command_queue.submit(command, self.process_command, command, plan, plan=plan)
+                    if ticket is None:
+                        self.speak("One moment, captain. I'm still working on your previous commands.")
+                    elif lane != SLOW:
+                        # Quick replies are spoken before listening again; slow commands keep
+                        # running while we listen, so a quick one can overtake them
+                        ticket.wait()
             except KeyboardInterrupt:
                 self.speak("Shutting down, sir.")
                 break
+        self.shutdown()
+        AUTOSAVE.shutdown()
+    
+    def shutdown(self):
+        """Stop the lanes, write back every brain profile and disarm task reminders"""
+        self.command_queue.shutdown()
+        self.profiles.close_all()
+        self.task_manager.close()
 
 if __name__ == "__main__":
     luffy = LUFFY()
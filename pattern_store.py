@@ -0,0 +1,240 @@
+"""
+L.U.F.F.Y Pattern Store - SQLite (WAL) storage for learned command patterns
+Each pattern key keeps bounded rolling statistics (a small ring of recent uses,
+exponentially decayed counts per response type and the most recent use), so
+memory and disk stay flat however many interactions are learned
+"""
+
+import datetime
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict, deque
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS patterns (
+    pattern_key TEXT PRIMARY KEY,
+    uses INTEGER NOT NULL DEFAULT 0,
+    last_seen TEXT
+);
+CREATE TABLE IF NOT EXISTS store_meta (
+    name TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_patterns_last_seen ON patterns (last_seen);
+"""
+
+
+def _epoch(timestamp):
+    try:
+        return datetime.datetime.fromisoformat(timestamp).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class PatternStats:
+    """Rolling statistics for one pattern key: recent ring, decayed counts, latest use"""
+    
+    RING_SIZE = 8
+    HALF_LIFE = 14 * 24 * 3600.0  # Seconds for a response type's weight to halve
+    
+    __slots__ = ('recent', 'counts', 'decayed_at', 'uses', 'latest')
+    
+    def __init__(self):
+        self.recent = deque(maxlen=self.RING_SIZE)
+        self.counts = {}
+        self.decayed_at = 0.0
+        self.uses = 0
+        self.latest = None
+    
+    def observe(self, entry):
+        """Fold one use into the statistics; an entry already in the ring is ignored"""
+        if entry in self.recent:
+            return False
+        when = _epoch(entry['timestamp'])
+        if when > self.decayed_at:
+            factor = 0.5 ** ((when - self.decayed_at) / self.HALF_LIFE) if self.decayed_at else 1.0
+            self.counts = {kind: weight * factor for kind, weight in self.counts.items()}
+            self.decayed_at = when
+            weight = 1.0
+        else:
+            # Out-of-order (migrated) entries count with the weight they would have had
+            weight = 0.5 ** ((self.decayed_at - when) / self.HALF_LIFE)
+        kind = entry.get('response_type')
+        self.counts[kind] = self.counts.get(kind, 0.0) + weight
+        self.recent.append(entry)
+        self.uses += 1
+        if self.latest is None or entry['timestamp'] >= self.latest['timestamp']:
+            self.latest = entry
+        return True
+    
+    def dominant_response_type(self):
+        """Response type with the highest decayed count"""
+        if not self.counts:
+            return None
+        return max(self.counts.items(), key=lambda item: item[1])[0]
+    
+    def to_dict(self):
+        return {
+            'recent': list(self.recent),
+            'counts': self.counts,
+            'decayed_at': self.decayed_at,
+            'uses': self.uses,
+            'latest': self.latest
+        }
+    
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        stats.recent.extend(data.get('recent', []))
+        stats.counts = data.get('counts', {})
+        stats.decayed_at = data.get('decayed_at', 0.0)
+        stats.uses = data.get('uses', 0)
+        stats.latest = data.get('latest')
+        return stats
+
+
+class PatternStore:
+    """Dict-like view of learned patterns backed by SQLite; the connection opens on first use"""
+    
+    CACHE_SIZE = 1024  # Pattern keys kept decoded in memory
+    
+    def __init__(self, path):
+        self.path = path
+        self._conn = None
+        self._cache = OrderedDict()
+        # Commands run on several scheduler lanes, so every query goes through one lock
+        self._lock = threading.Lock()
+    
+    def _connect(self):
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._upgrade(conn)
+            self._conn = conn
+        return self._conn
+    
+    def _upgrade(self, conn):
+        """Fold the unbounded per-use event table of older stores into rolling statistics"""
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(patterns)")]
+        if 'stats' not in columns:
+            conn.execute("ALTER TABLE patterns ADD COLUMN stats TEXT")
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'pattern_events'").fetchall():
+            return
+        conn.execute("BEGIN")
+        try:
+            folded = {}
+            rows = conn.execute(
+                "SELECT pattern_key, full_command, response_type, timestamp FROM pattern_events "
+                "ORDER BY pattern_key, timestamp"
+            ).fetchall()
+            for pattern_key, full_command, response_type, timestamp in rows:
+                folded.setdefault(pattern_key, PatternStats()).observe(
+                    {'full_command': full_command, 'response_type': response_type, 'timestamp': timestamp}
+                )
+            for pattern_key, stats in folded.items():
+                self._write(conn, pattern_key, stats)
+            conn.execute("DROP TABLE pattern_events")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    
+    def _write(self, conn, pattern_key, stats):
+        conn.execute(
+            "INSERT INTO patterns (pattern_key, uses, last_seen, stats) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (pattern_key) DO UPDATE SET uses = excluded.uses, "
+            "last_seen = excluded.last_seen, stats = excluded.stats",
+            (pattern_key, stats.uses, stats.latest['timestamp'] if stats.latest else None,
+             json.dumps(stats.to_dict()))
+        )
+    
+    def _stats(self, conn, pattern_key):
+        """Cached statistics for a key, decoded from its row on first access (None if unknown)"""
+        stats = self._cache.get(pattern_key)
+        if stats is not None:
+            self._cache.move_to_end(pattern_key)
+            return stats
+        row = conn.execute("SELECT stats FROM patterns WHERE pattern_key = ?", (pattern_key,)).fetchone()
+        if row is None:
+            return None
+        stats = PatternStats.from_dict(json.loads(row[0])) if row[0] else PatternStats()
+        self._remember(pattern_key, stats)
+        return stats
+    
+    def _remember(self, pattern_key, stats):
+        self._cache[pattern_key] = stats
+        self._cache.move_to_end(pattern_key)
+        if len(self._cache) > self.CACHE_SIZE:
+            self._cache.popitem(last=False)
+    
+    def add(self, pattern_key, entry):
+        """Record one use of a pattern; re-adding an entry still in the recent ring is a no-op"""
+        self.import_patterns({pattern_key: [entry]})
+    
+    def import_patterns(self, patterns, marker=None):
+        """Fold a {pattern_key: [entry, ...]} mapping into the statistics in one transaction.
+        
+        With a marker name the import is recorded and never repeated (legacy migrations).
+        """
+        with self._lock:
+            conn = self._connect()
+            if marker and conn.execute("SELECT 1 FROM store_meta WHERE name = ?", (marker,)).fetchall():
+                return
+            conn.execute("BEGIN")
+            try:
+                for pattern_key, entries in patterns.items():
+                    stats = self._stats(conn, pattern_key) or PatternStats()
+                    changed = False
+                    for entry in sorted(entries, key=lambda item: item['timestamp']):
+                        changed = stats.observe(entry) or changed
+                    if changed:
+                        self._write(conn, pattern_key, stats)
+                        self._remember(pattern_key, stats)
+                if marker:
+                    conn.execute("INSERT OR REPLACE INTO store_meta (name, value) VALUES (?, ?)",
+                                 (marker, datetime.datetime.now().isoformat()))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                # Cached statistics may hold changes that were just rolled back
+                self._cache.clear()
+                raise
+    
+    def stats(self, pattern_key):
+        """Rolling statistics for a pattern, or None"""
+        with self._lock:
+            return self._stats(self._connect(), pattern_key)
+    
+    def most_recent(self, pattern_key):
+        """Latest entry recorded for a pattern, or None"""
+        stats = self.stats(pattern_key)
+        return stats.latest if stats else None
+    
+    def __contains__(self, pattern_key):
+        return self.stats(pattern_key) is not None
+    
+    def __len__(self):
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM patterns").fetchone()[0]
+    
+    def __getitem__(self, pattern_key):
+        """Recent entries for a pattern (the ring), oldest first"""
+        stats = self.stats(pattern_key)
+        return list(stats.recent) if stats else []
+    
+    def keys(self):
+        with self._lock:
+            return [row[0] for row in self._connect().execute("SELECT pattern_key FROM patterns")]
+    
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,210 @@
+"""
+L.U.F.F.Y Recurring Triggers - Cron and interval automation rules with next-fire computation
+A rule's trigger can be a cron expression ("0 9 * * 1-5") or a fixed interval, optionally
+limited to certain weekdays and to the work hours from luffy_data/preferences.json.
+Each trigger computes its next fire time directly, so the reminder scheduler can sleep
+until the earliest one instead of polling
+"""
+
+import datetime
+import json
+import os
+
+DEFAULT_WORK_HOURS = ("09:00", "17:00")
+PREFERENCES_FILE = os.path.join("luffy_data", "preferences.json")
+
+CRON_ALIASES = {
+    '@hourly': '0 * * * *',
+    '@daily': '0 0 * * *',
+    '@weekly': '0 0 * * 0',
+    '@monthly': '0 0 1 * *',
+    '@yearly': '0 0 1 1 *',
+}
+# (low, high) of minute, hour, day of month, month and day of week (0 and 7 are Sunday)
+CRON_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+CRON_NAMES = {
+    3: {name: number for number, name in enumerate(
+        ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'], 1)},
+    4: {name: number for number, name in enumerate(['sun', 'mon', 'tue', 'wed', 'thu', 'fri', 'sat'])},
+}
+
+WEEKDAY_NAMES = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
+WEEKDAY_SETS = {'weekdays': {0, 1, 2, 3, 4}, 'weekends': {5, 6}}
+
+RECURRING_TYPES = ('cron', 'interval')
+
+# Longest stretch searched for a matching time before a trigger is declared unsatisfiable
+SEARCH_DAYS = 366 * 5
+
+
+def parse_clock(text):
+    hour, minute = str(text).split(':')[:2]
+    return datetime.time(int(hour), int(minute))
+
+
+def load_work_hours(path=PREFERENCES_FILE):
+    """(start, end) datetime.time from the work_hours preference, 09:00-17:00 when unset"""
+    start, end = DEFAULT_WORK_HOURS
+    try:
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                work_hours = json.load(f).get('work_hours') or {}
+            start = work_hours.get('start', start)
+            end = work_hours.get('end', end)
+        return parse_clock(start), parse_clock(end)
+    except Exception as e:
+        print(f"Error loading work hours: {e}")
+        return parse_clock(DEFAULT_WORK_HOURS[0]), parse_clock(DEFAULT_WORK_HOURS[1])
+
+
+def parse_weekdays(value):
+    """Set of weekday numbers (Monday is 0) from 'weekdays', 'weekends', or a list of numbers/names"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        if value.lower() in WEEKDAY_SETS:
+            return set(WEEKDAY_SETS[value.lower()])
+        value = value.replace(',', ' ').split()
+    days = set()
+    for day in value:
+        days.add(day if isinstance(day, int) else WEEKDAY_NAMES.index(str(day).lower()[:3]))
+    return days
+
+
+class CronExpression:
+    """Five-field cron expression (minute hour day-of-month month day-of-week)"""
+    
+    def __init__(self, expression):
+        self.expression = expression
+        fields = CRON_ALIASES.get(expression.strip().lower(), expression).split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expression!r}")
+        self.minutes, self.hours, self.days, self.months, weekdays = [
+            self._parse_field(text, index) for index, text in enumerate(fields)]
+        # Cron counts Sunday as 0 (or 7); datetime.weekday() counts Monday as 0
+        self.weekdays = {(day - 1) % 7 for day in weekdays}
+        self.sorted_minutes = sorted(self.minutes)
+        # Standard cron: when both day fields are restricted, either one matching is enough
+        self.day_restricted = fields[2] != '*'
+        self.weekday_restricted = fields[4] != '*'
+    
+    def _parse_field(self, text, index):
+        low, high = CRON_RANGES[index]
+        names = CRON_NAMES.get(index, {})
+        values = set()
+        for part in text.lower().split(','):
+            step = 1
+            if '/' in part:
+                part, step = part.split('/')
+                step = int(step)
+            if part in ('*', ''):
+                first, last = low, high
+            elif '-' in part:
+                first, last = [int(names.get(bound, bound)) for bound in part.split('-')]
+            else:
+                first = int(names.get(part, part))
+                last = high if step > 1 else first
+            if first < low or last > high or first > last or step < 1:
+                raise ValueError(f"Bad cron field {text!r}")
+            values.update(range(first, last + 1, step))
+        return values
+    
+    def day_matches(self, date):
+        day = date.day in self.days
+        weekday = date.weekday() in self.weekdays
+        if self.day_restricted and self.weekday_restricted:
+            return day or weekday
+        return day and weekday
+    
+    def next_after(self, moment):
+        """First matching minute strictly after moment, or None if none within SEARCH_DAYS"""
+        candidate = moment.replace(second=0, microsecond=0) + datetime.timedelta(minutes=1)
+        limit = moment + datetime.timedelta(days=SEARCH_DAYS)
+        while candidate <= limit:
+            if candidate.month not in self.months:
+                # Jump to the first day of the next month
+                candidate = (candidate.replace(day=1, hour=0, minute=0) + datetime.timedelta(days=32)).replace(day=1)
+                continue
+            if not self.day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + datetime.timedelta(days=1)
+                continue
+            if candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + datetime.timedelta(hours=1)
+                continue
+            minute = next((m for m in self.sorted_minutes if m >= candidate.minute), None)
+            if minute is None:
+                candidate = candidate.replace(minute=0) + datetime.timedelta(hours=1)
+                continue
+            return candidate.replace(minute=minute)
+        return None
+
+
+class RecurringTrigger:
+    """Next-fire computation for a 'cron' or 'interval' trigger dict
+    
+    {'type': 'cron', 'expression': '*/30 * * * *'} or
+    {'type': 'interval', 'minutes': 45} (also 'seconds'/'hours', anchored at 'start' or anchor),
+    either optionally with 'weekdays': 'weekdays' | [...] and 'work_hours': True.
+    """
+    
+    def __init__(self, trigger, work_hours=None, anchor=None):
+        self.trigger = trigger
+        self.kind = trigger.get('type')
+        if self.kind == 'cron':
+            self.cron = CronExpression(trigger['expression'])
+        elif self.kind == 'interval':
+            self.interval = datetime.timedelta(seconds=trigger.get('seconds', 0), minutes=trigger.get('minutes', 0),
+                                               hours=trigger.get('hours', 0))
+            if self.interval <= datetime.timedelta(0):
+                raise ValueError("Interval trigger needs a positive seconds, minutes or hours")
+            start = trigger.get('start') or anchor
+            self.anchor = datetime.datetime.fromisoformat(start) if isinstance(start, str) else start
+            self.anchor = (self.anchor or datetime.datetime.now()).replace(microsecond=0)
+        else:
+            raise ValueError(f"Not a recurring trigger type: {self.kind!r}")
+        self.weekdays = parse_weekdays(trigger.get('weekdays'))
+        self.work_hours = (work_hours or load_work_hours()) if trigger.get('work_hours') else None
+        if self.work_hours and self.work_hours[0] >= self.work_hours[1]:
+            raise ValueError("Work hours must end after they start")
+        if self.weekdays is not None and not self.weekdays:
+            raise ValueError("Trigger allows no weekdays")
+    
+    def allowed(self, moment):
+        if self.weekdays is not None and moment.weekday() not in self.weekdays:
+            return False
+        if self.work_hours is not None:
+            start, end = self.work_hours
+            return start <= moment.time() < end
+        return True
+    
+    def next_window(self, moment):
+        """Earliest time at or after moment that is inside the allowed days and hours"""
+        start = self.work_hours[0] if self.work_hours else datetime.time(0)
+        for offset in range(8):
+            day = moment.date() + datetime.timedelta(days=offset)
+            if self.weekdays is not None and day.weekday() not in self.weekdays:
+                continue
+            opening = datetime.datetime.combine(day, start)
+            if opening >= moment:
+                return opening
+        return None
+    
+    def _next_raw(self, moment):
+        if self.kind == 'cron':
+            return self.cron.next_after(moment)
+        steps = (moment - self.anchor) // self.interval + 1
+        return self.anchor + max(steps, 0) * self.interval
+    
+    def next_fire(self, after=None):
+        """First fire time strictly after after (default now), or None if the trigger can never fire"""
+        candidate = self._next_raw(after or datetime.datetime.now())
+        limit = (after or datetime.datetime.now()) + datetime.timedelta(days=SEARCH_DAYS)
+        while candidate is not None and candidate <= limit:
+            if self.allowed(candidate):
+                return candidate
+            window = self.next_window(candidate)
+            if window is None:
+                return None
+            # Resume from just before the window opens, so a fire time exactly at the opening counts
+            candidate = self._next_raw(window - datetime.timedelta(microseconds=1))
+        return None
@@ -0,0 +1,216 @@
+"""
+L.U.F.F.Y Reminder Scheduler - One thread and a min-heap for every pending reminder
+Reminders are (due time, callback) entries in a heap guarded by a condition
+variable; the scheduler thread sleeps until the earliest one is due, so thousands
+of reminders cost one thread instead of one sleeping thread each. Add and snooze
+are O(log n) heap pushes; cancel marks the entry dead in O(1) and the heap is
+compacted once dead entries outnumber live ones
+
+Usage: python reminder_scheduler.py  (benchmark with 100k reminders)
+"""
+
+import heapq
+import itertools
+import threading
+import time
+
+# Longest single sleep: wall-clock time keeps moving while a laptop is suspended, the
+# condition variable's timer doesn't, so the thread re-checks the heap at least this often
+MAX_SLEEP = 60.0
+
+
+class ScheduledReminder:
+    """One pending reminder; the heap holds (due, seq, entry) tuples so ordering is compared in C"""
+    
+    __slots__ = ('due', 'seq', 'key', 'callback', 'cancelled')
+    
+    def __init__(self, due, seq, key, callback):
+        self.due = due
+        self.seq = seq
+        self.key = key
+        self.callback = callback
+        self.cancelled = False
+
+
+class ReminderScheduler:
+    """Min-heap of due times served by a single thread; callbacks run on that thread"""
+    
+    def __init__(self, name="luffy-reminders", clock=time.time):
+        self.name = name
+        self.clock = clock
+        self._heap = []
+        self._entries = {}  # key -> live ScheduledReminder
+        self._dead = 0
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._closed = False
+        self.fired = 0
+        self.failed = 0
+    
+    def schedule(self, key, due, callback):
+        """Call callback() at epoch time due (right away if already past); replaces key's earlier entry"""
+        with self._cond:
+            self._discard(key)
+            entry = ScheduledReminder(due, next(self._seq), key, callback)
+            self._entries[key] = entry
+            heapq.heappush(self._heap, (due, entry.seq, entry))
+            if self._heap[0][2] is entry:
+                # New earliest reminder: wake the thread so it shortens its sleep
+                self._cond.notify()
+            self._start()
+        return entry
+    
+    def schedule_in(self, key, seconds, callback):
+        return self.schedule(key, self.clock() + seconds, callback)
+    
+    def cancel(self, key, entry=None):
+        """Drop a pending reminder; True if it was still pending
+        
+        Given the entry schedule() returned, only that entry is dropped, not one
+        that has since replaced it under the same key.
+        """
+        with self._cond:
+            if entry is not None and self._entries.get(key) is not entry:
+                return False
+            return self._discard(key)
+    
+    def snooze(self, key, seconds):
+        """Push a pending reminder back by seconds from now; True if it was still pending"""
+        with self._cond:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False
+            self.schedule(key, self.clock() + seconds, entry.callback)
+            return True
+    
+    def due_time(self, key):
+        entry = self._entries.get(key)
+        return entry.due if entry else None
+    
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        entry.cancelled = True
+        self._dead += 1
+        if self._dead > len(self._entries) and self._dead > 64:
+            # Rebuild without dead entries so cancelled reminders don't pile up in the heap
+            self._heap = [item for item in self._heap if not item[2].cancelled]
+            heapq.heapify(self._heap)
+            self._dead = 0
+        return True
+    
+    def _start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+    
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        return
+                    while self._heap and self._heap[0][2].cancelled:
+                        heapq.heappop(self._heap)
+                        self._dead -= 1
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    now = self.clock()
+                    delay = self._heap[0][0] - now
+                    if delay <= 0:
+                        # Take everything that is due in one pass under the lock
+                        due = []
+                        while self._heap and self._heap[0][0] <= now:
+                            entry = heapq.heappop(self._heap)[2]
+                            if entry.cancelled:
+                                self._dead -= 1
+                                continue
+                            del self._entries[entry.key]
+                            due.append(entry)
+                        break
+                    self._cond.wait(min(delay, MAX_SLEEP))
+            for entry in due:
+                try:
+                    entry.callback()
+                    self.fired += 1
+                except Exception as e:
+                    self.failed += 1
+                    print(f"Reminder error: {e}")
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def shutdown(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+
+
+# Shared by TaskAutomation and the advanced assistant; the thread starts with the first reminder
+REMINDERS = ReminderScheduler()
+
+
+def benchmark_reminders(count=100000, seed=9):
+    """Schedule, snooze, cancel and fire count reminders; report per-operation cost and lateness"""
+    import random
+    
+    rng = random.Random(seed)
+    scheduler = ReminderScheduler(name="luffy-reminder-benchmark")
+    threads_before = threading.active_count()
+    lateness = []
+    done = threading.Event()
+    now = time.time()
+    
+    def make_callback(due):
+        def callback():
+            lateness.append(time.time() - due)
+            if len(lateness) == live:
+                done.set()
+        return callback
+    
+    # Far-future reminders: pure heap cost
+    start = time.perf_counter()
+    for index in range(count):
+        due = now + 3600 + rng.random() * 86400
+        scheduler.schedule(('far', index), due, make_callback(due))
+    add_us = (time.perf_counter() - start) / count * 1e6
+    start = time.perf_counter()
+    for index in range(0, count, 10):
+        scheduler.snooze(('far', index), 7200)
+    snooze_us = (time.perf_counter() - start) / (count // 10) * 1e6
+    start = time.perf_counter()
+    for index in range(count):
+        scheduler.cancel(('far', index))
+    cancel_us = (time.perf_counter() - start) / count * 1e6
+    
+    # Reminders due 2-3.5 seconds out (after scheduling finishes): firing throughput and accuracy
+    live = count
+    now = time.time()
+    for index in range(count):
+        due = now + 2.0 + rng.random() * 1.5
+        scheduler.schedule(('soon', index), due, make_callback(due))
+    threads_during = threading.active_count()
+    done.wait(60)
+    scheduler.shutdown()
+    lateness.sort()
+    return {
+        'reminders': count,
+        'add_us': add_us,
+        'snooze_us': snooze_us,
+        'cancel_us': cancel_us,
+        'fired': len(lateness),
+        'late_p50_ms': lateness[len(lateness) // 2] * 1000 if lateness else None,
+        'late_p99_ms': lateness[int(len(lateness) * 0.99)] * 1000 if lateness else None,
+        'extra_threads': threads_during - threads_before,
+    }
+
+
+if __name__ == "__main__":
+    report = benchmark_reminders()
+    print(f"{report['reminders']} reminders: add {report['add_us']:.2f} us, snooze {report['snooze_us']:.2f} us, "
+          f"cancel {report['cancel_us']:.2f} us")
+    print(f"Fired {report['fired']} on {report['extra_threads']} thread(s); "
+          f"lateness p50 {report['late_p50_ms']:.2f} ms, p99 {report['late_p99_ms']:.2f} ms")
@@ -0,0 +1,190 @@
+"""
+L.U.F.F.Y Replay Benchmark - Transcript replay through the command pipeline
+Replays a JSONL transcript of utterances through each front end's process_command_text
+with speech, TTS, webbrowser and subprocess stubbed, and reports throughput and
+p50/p95/p99 latency per front end and per intent (the intent each reply came from)
+
+Usage: python replay_benchmark.py transcript.jsonl [--front-end luffy] [--repeat 3] [--json]
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import webbrowser
+from collections import defaultdict
+from unittest import mock
+
+from autosave import AUTOSAVE
+from intent_router import percentile
+
+FRONT_ENDS = ['luffy', 'advanced', 'dashboard']
+
+
+def load_transcript(path):
+    """Read utterances from a JSONL transcript (objects with a text field, or bare strings)"""
+    utterances = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            if isinstance(entry, dict):
+                entry = entry.get('text') or entry.get('utterance') or entry.get('command')
+            if entry:
+                utterances.append(entry)
+    return utterances
+
+
+class _SilentVoice:
+    """Stand-in for the dashboard voice interface"""
+    
+    def speak(self, text):
+        pass
+    
+    def listen(self, timeout=5):
+        return None
+
+
+@contextlib.contextmanager
+def stubbed_environment():
+    """Stub browser, process launching and OS shell calls, and run inside a scratch directory
+    
+    Yields the ExitStack; cleanups registered on it (front end shutdowns) run while
+    the scratch directory is still the working directory and still exists.
+    """
+    completed = subprocess.CompletedProcess(args=[], returncode=0)
+    original_cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="luffy_replay_") as scratch, contextlib.ExitStack() as stack:
+        stack.enter_context(mock.patch.object(webbrowser, 'open', lambda *args, **kwargs: True))
+        stack.enter_context(mock.patch.object(subprocess, 'Popen', mock.MagicMock()))
+        stack.enter_context(mock.patch.object(subprocess, 'run', lambda *args, **kwargs: completed))
+        stack.enter_context(mock.patch.object(subprocess, 'call', lambda *args, **kwargs: 0))
+        stack.enter_context(mock.patch.object(os, 'system', lambda *args, **kwargs: 0))
+        # Brain data, task files and file operations land in the scratch directory
+        os.chdir(scratch)
+        stack.callback(os.chdir, original_cwd)
+        # Queued saves are written before the scratch directory goes away
+        stack.callback(AUTOSAVE.flush)
+        yield stack
+
+
+def build_front_end(name, stack):
+    """Create a headless front end whose shutdown() runs when stack closes"""
+    if name == 'luffy':
+        from main import LUFFY
+        assistant = LUFFY(headless=True)
+        assistant.speak = lambda text: None
+    elif name == 'advanced':
+        from luffy_advanced import AdvancedLUFFY
+        assistant = AdvancedLUFFY(headless=True)
+        assistant.speak = lambda text: None
+    elif name == 'dashboard':
+        from luffy_complete import LUFFYDashboard
+        assistant = LUFFYDashboard(headless=True)
+        assistant.voice = _SilentVoice()
+        assistant.add_message = lambda sender, message, color=None: None
+    else:
+        raise ValueError(f"Unknown front end: {name}")
+    stack.callback(assistant.shutdown)
+    return assistant
+
+
+def _summarize(timings_ns, elapsed):
+    timings_ns.sort()
+    count = len(timings_ns)
+    return {
+        'count': count,
+        'throughput_per_s': count / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(timings_ns, 50) / 1e6,
+        'p95_ms': percentile(timings_ns, 95) / 1e6,
+        'p99_ms': percentile(timings_ns, 99) / 1e6,
+    }
+
+
+def replay(front_end, utterances, repeat, stack):
+    """Replay utterances through one front end and collect latency statistics"""
+    process_command_text = build_front_end(front_end, stack).process_command_text
+    
+    all_timings = []
+    per_intent = defaultdict(list)
+    per_intent_time = defaultdict(float)
+    clock = time.perf_counter_ns
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for text in utterances:
+            start = clock()
+            response = process_command_text(text)
+            duration = clock() - start
+            # Filed under what actually answered: 'compound', 'contextual' or the routed intent
+            label = (response.intent if response else None) or 'fallback'
+            all_timings.append(duration)
+            per_intent[label].append(duration)
+            per_intent_time[label] += duration / 1e9
+    elapsed = time.perf_counter() - started
+    
+    return {
+        'front_end': front_end,
+        'overall': _summarize(all_timings, elapsed),
+        'intents': {
+            intent: _summarize(timings, per_intent_time[intent])
+            for intent, timings in sorted(per_intent.items())
+        },
+    }
+
+
+def run_benchmark(transcript_path, front_ends=None, repeat=1):
+    """Replay a transcript through the selected front ends; unavailable ones are reported as skipped"""
+    utterances = load_transcript(transcript_path)
+    results = []
+    for front_end in front_ends or FRONT_ENDS:
+        with stubbed_environment() as stack:
+            try:
+                results.append(replay(front_end, utterances, repeat, stack))
+            except ImportError as e:
+                results.append({'front_end': front_end, 'skipped': f"missing dependency: {e}"})
+    return results
+
+
+def format_report(results):
+    """Render benchmark results as a plain-text table"""
+    lines = []
+    header = f"{'':<24}{'count':>8}{'cmd/s':>12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    for result in results:
+        lines.append(f"== {result['front_end']} ==")
+        if 'skipped' in result:
+            lines.append(f"  skipped ({result['skipped']})")
+            continue
+        lines.append(header)
+        rows = [('ALL', result['overall'])] + list(result['intents'].items())
+        for name, stats in rows:
+            lines.append(f"{name:<24}{stats['count']:>8}{stats['throughput_per_s']:>12.0f}"
+                         f"{stats['p50_ms']:>10.3f}{stats['p95_ms']:>10.3f}{stats['p99_ms']:>10.3f}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a transcript through the L.U.F.F.Y command pipeline")
+    parser.add_argument('transcript', help="JSONL file with one utterance per line")
+    parser.add_argument('--front-end', action='append', choices=FRONT_ENDS,
+                        help="front end to benchmark (repeatable, default: all)")
+    parser.add_argument('--repeat', type=int, default=1, help="replay the transcript this many times")
+    parser.add_argument('--json', action='store_true', help="print results as JSON")
+    args = parser.parse_args(argv)
+    
+    transcript = os.path.abspath(args.transcript)
+    results = run_benchmark(transcript, args.front_end, args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(format_report(results))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""
+L.U.F.F.Y Rule Matcher - Automation rules compiled into lookup indexes
+Time rules are bucketed by hour and every context rule's condition goes into one
+KeywordAutomaton (the intent router's Aho-Corasick automaton), which is run once
+over the event's context string.
+Checking an event then costs the length of the context plus the rules that
+match, not a substring search per rule defined
+
+Usage: python rule_matcher.py  (benchmark with 10k rules)
+"""
+
+import datetime
+
+from intent_router import KeywordAutomaton
+
+
+def canonical_context(context):
+    """The text context conditions are matched against; built once per event"""
+    return context if isinstance(context, str) else str(context)
+
+
+class RuleMatcher:
+    """Active automation rules indexed by trigger; match() returns the triggered actions in rule order"""
+    
+    def __init__(self, rules):
+        self.rules = [rule for rule in rules if rule.get('active', True)]
+        self.by_hour = {}  # hour -> indexes of time rules
+        self.always = []  # Context rules with an empty condition, which every context contains
+        conditions = []
+        for index, rule in enumerate(self.rules):
+            trigger = rule.get('trigger') or {}
+            if trigger.get('type') == 'time':
+                self.by_hour.setdefault(trigger.get('hour'), []).append(index)
+            elif trigger.get('type') == 'context':
+                condition = str(trigger.get('condition', ''))
+                if condition:
+                    conditions.append((condition, index))
+                else:
+                    self.always.append(index)
+        self.automaton = KeywordAutomaton(conditions)
+    
+    def match(self, context, now=None):
+        now = now or datetime.datetime.now()
+        matched = self.automaton.all_ranks(canonical_context(context))
+        matched.update(self.by_hour.get(now.hour, ()))
+        matched.update(self.always)
+        return [self.rules[index]['action'] for index in sorted(matched)]
+
+
+def benchmark_rules(count=10000, events=200, seed=5):
+    """Time the per-rule loop against the compiled matcher for count rules; both must agree"""
+    import random
+    import time
+    
+    rng = random.Random(seed)
+    words = ['coding', 'meeting', 'music', 'email', 'python', 'deploy', 'lunch', 'gym', 'report', 'browser',
+             'chrome', 'slack', 'budget', 'travel', 'weather', 'news', 'review', 'standup', 'backup', 'game']
+    rules = []
+    for index in range(count):
+        if index % 4 == 0:
+            trigger = {'type': 'time', 'hour': rng.randrange(24)}
+        else:
+            trigger = {'type': 'context', 'condition': '%s_%d' % (rng.choice(words), rng.randrange(count))}
+        rules.append({'id': index + 1, 'trigger': trigger, 'action': {'rule': index + 1}, 'active': True})
+    contexts = []
+    for _ in range(events):
+        contexts.append({
+            'command': ' '.join(rng.choice(words) for _ in range(6)),
+            'activity': '%s_%d' % (rng.choice(words), rng.randrange(count)),
+            'tags': ['%s_%d' % (rng.choice(words), rng.randrange(count)) for _ in range(3)],
+        })
+    now = datetime.datetime.now()
+    
+    def legacy(context):
+        actions = []
+        for rule in rules:
+            trigger = rule['trigger']
+            if trigger['type'] == 'time':
+                if now.hour == trigger['hour']:
+                    actions.append(rule['action'])
+            elif trigger['type'] == 'context':
+                if trigger['condition'] in str(context):
+                    actions.append(rule['action'])
+        return actions
+    
+    start = time.perf_counter()
+    matcher = RuleMatcher(rules)
+    compile_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    expected = [legacy(context) for context in contexts]
+    legacy_us = (time.perf_counter() - start) / events * 1e6
+    start = time.perf_counter()
+    actual = [matcher.match(context, now) for context in contexts]
+    compiled_us = (time.perf_counter() - start) / events * 1e6
+    return {
+        'rules': count,
+        'events': events,
+        'compile_ms': compile_ms,
+        'legacy_us': legacy_us,
+        'compiled_us': compiled_us,
+        'matches_per_event': sum(len(actions) for actions in actual) / events,
+        'agree': actual == expected,
+    }
+
+
+if __name__ == "__main__":
+    for count in (100, 1000, 10000):
+        report = benchmark_rules(count)
+        print(f"{report['rules']:>6} rules: loop {report['legacy_us']:.1f} us/event, "
+              f"compiled {report['compiled_us']:.1f} us/event (compile {report['compile_ms']:.1f} ms, "
+              f"{report['matches_per_event']:.1f} matches/event, agree={report['agree']})")
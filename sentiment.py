@@ -0,0 +1,150 @@
+"""
+L.U.F.F.Y Sentiment - Weighted lexicon scoring with negation and intensifiers
+Terms are looked up per token in a hash map, so the cost of scoring a sentence
+depends on its length and not on the size of the lexicon. Larger lexicons (VADER
+or AFINN style "term<TAB>weight" files, 10k+ terms) load from a text file;
+score_batch scores whole conversation logs at once with NumPy when it is installed
+"""
+
+import os
+import re
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+TOKEN_PATTERN = re.compile(r'\b\w+\b')
+
+# Built-in lexicon: the brain's original keyword lists plus common variants
+DEFAULT_TERMS = {
+    'good': 1.9, 'great': 3.1, 'excellent': 2.7, 'awesome': 3.1, 'perfect': 2.7,
+    'love': 3.2, 'like': 1.5, 'happy': 2.7, 'pleased': 1.9, 'nice': 1.8,
+    'thanks': 1.9, 'thank': 1.5, 'amazing': 2.8, 'brilliant': 2.8, 'cool': 1.3,
+    'fantastic': 2.6, 'wonderful': 2.7, 'helpful': 1.8, 'glad': 2.0, 'works': 0.8,
+    'bad': -2.5, 'terrible': -2.1, 'awful': -2.0, 'hate': -2.7, 'dislike': -1.6,
+    'angry': -2.3, 'frustrated': -2.0, 'annoyed': -1.6, 'annoying': -1.8,
+    'wrong': -2.1, 'useless': -1.8, 'stupid': -2.4, 'broken': -1.7, 'horrible': -2.5,
+    'sad': -2.1, 'worst': -3.1, 'fail': -2.3, 'failed': -2.3, 'slow': -0.8,
+}
+
+# "not", "never", "don't" (tokenized as "don" + "t"), ... flip the next few terms
+NEGATIONS = frozenset([
+    'not', 'no', 'never', 'nothing', 'nobody', 'none', 'neither', 'nor', 'without', 't',
+    'dont', 'doesnt', 'didnt', 'isnt', 'wasnt', 'cant', 'cannot', 'wont', 'wouldnt', 'shouldnt',
+])
+NEGATION_SCOPE = 3  # Tokens after a negation that it applies to
+NEGATION_SCALE = -0.74  # "not good" is mildly negative, not as strong as "bad"
+
+# Multipliers for the term right after the modifier
+INTENSIFIERS = {
+    'very': 1.3, 'really': 1.3, 'so': 1.2, 'extremely': 1.5, 'absolutely': 1.5,
+    'totally': 1.4, 'super': 1.4, 'incredibly': 1.5, 'too': 1.2, 'most': 1.3,
+    'slightly': 0.5, 'somewhat': 0.6, 'barely': 0.4, 'kinda': 0.7, 'little': 0.7,
+}
+
+THRESHOLD = 0.05  # Scores inside +/- THRESHOLD count as neutral
+
+
+def label(score):
+    """Map a numeric score to 'positive', 'negative' or 'neutral'"""
+    if score > THRESHOLD:
+        return 'positive'
+    if score < -THRESHOLD:
+        return 'negative'
+    return 'neutral'
+
+
+class SentimentLexicon:
+    """Hash-map lexicon of weighted terms scored per token with negation and intensifiers"""
+    
+    def __init__(self, terms=None):
+        self.terms = dict(DEFAULT_TERMS if terms is None else terms)
+    
+    @classmethod
+    def load(cls, path, include_defaults=True):
+        """Lexicon from a "term<TAB>weight[<TAB>...]" file (extra columns and multi-word terms are ignored)"""
+        lexicon = cls(DEFAULT_TERMS if include_defaults else {})
+        if path and os.path.exists(path):
+            try:
+                lexicon.update_from_file(path)
+            except Exception as e:
+                print(f"Error loading sentiment lexicon: {e}")
+        return lexicon
+    
+    def update_from_file(self, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip() or line.startswith('#'):
+                    continue
+                fields = line.rstrip('\n').split('\t')
+                if len(fields) < 2 or ' ' in fields[0]:
+                    continue
+                try:
+                    self.terms[fields[0].lower()] = float(fields[1])
+                except ValueError:
+                    continue
+    
+    def __len__(self):
+        return len(self.terms)
+    
+    def score_tokens(self, tokens):
+        """Sum of term weights, flipped inside negation scope and scaled by a preceding intensifier"""
+        terms = self.terms
+        score = 0.0
+        negated_until = -1
+        boost = 1.0
+        for index, token in enumerate(tokens):
+            weight = terms.get(token)
+            if weight is not None:
+                if index <= negated_until:
+                    weight *= NEGATION_SCALE
+                score += weight * boost
+            if token in NEGATIONS:
+                negated_until = index + NEGATION_SCOPE
+            boost = INTENSIFIERS.get(token, 1.0)
+        return score
+    
+    def score(self, text):
+        return self.score_tokens(TOKEN_PATTERN.findall(text.lower()))
+    
+    def classify(self, text):
+        return label(self.score(text))
+    
+    def classify_tokens(self, tokens):
+        return label(self.score_tokens(tokens))
+    
+    def score_batch(self, texts):
+        """Scores for many texts at once (a NumPy array when NumPy is available, else a list)"""
+        token_lists = [TOKEN_PATTERN.findall(text.lower()) for text in texts]
+        if not NUMPY_AVAILABLE:
+            return [self.score_tokens(tokens) for tokens in token_lists]
+        
+        lengths = np.fromiter((len(tokens) for tokens in token_lists), dtype=np.int64, count=len(token_lists))
+        flat = [token for tokens in token_lists for token in tokens]
+        if not flat:
+            return np.zeros(len(token_lists), dtype=np.float32)
+        doc = np.repeat(np.arange(len(token_lists)), lengths)
+        
+        # Look every distinct token up once, then broadcast back to all occurrences
+        ids = {}
+        inverse = np.fromiter((ids.setdefault(token, len(ids)) for token in flat), dtype=np.int64, count=len(flat))
+        vocabulary = list(ids)
+        weights = np.array([self.terms.get(token, 0.0) for token in vocabulary], dtype=np.float32)[inverse]
+        negators = np.array([token in NEGATIONS for token in vocabulary])[inverse]
+        boosts = np.array([INTENSIFIERS.get(token, 1.0) for token in vocabulary], dtype=np.float32)[inverse]
+        
+        # A token is negated when a negation sits within NEGATION_SCOPE tokens before it in the same text
+        negated = np.zeros(len(flat), dtype=bool)
+        for shift in range(1, NEGATION_SCOPE + 1):
+            negated[shift:] |= negators[:-shift] & (doc[shift:] == doc[:-shift])
+        previous_boost = np.ones(len(flat), dtype=np.float32)
+        same_text = doc[1:] == doc[:-1]
+        previous_boost[1:] = np.where(same_text, boosts[:-1], 1.0)
+        
+        contributions = weights * np.where(negated, NEGATION_SCALE, 1.0).astype(np.float32) * previous_boost
+        return np.bincount(doc, weights=contributions, minlength=len(token_lists)).astype(np.float32)
+    
+    def classify_batch(self, texts):
+        return [label(score) for score in self.score_batch(texts)]
@@ -0,0 +1,83 @@
+"""
+L.U.F.F.Y Sentiment Benchmark - Per-token scoring cost as the lexicon grows
+Scores the same utterances against lexicons from the built-in size up to 100k
+terms, next to the old substring scan over keyword lists, and times score_batch
+over the whole log
+
+Usage: python sentiment_benchmark.py
+"""
+
+import random
+import string
+import time
+
+from sentiment import DEFAULT_TERMS, NUMPY_AVAILABLE, TOKEN_PATTERN, SentimentLexicon
+
+LEXICON_SIZES = [len(DEFAULT_TERMS), 1000, 10000, 100000]
+
+UTTERANCES = [
+    "open notepad please", "that was really good thanks", "this is not working at all",
+    "i really hate when the music stops", "what's the weather like in london", "you are awesome luffy",
+    "search for python tutorials", "that is not bad actually", "the screen analysis was extremely slow",
+    "remind me to call mom at five", "i don't like this song", "perfect, now play something happy",
+]
+
+
+def synthetic_lexicon(size, seed=5):
+    """Built-in terms padded with random weighted words up to size"""
+    rng = random.Random(seed)
+    terms = dict(DEFAULT_TERMS)
+    while len(terms) < size:
+        word = ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 10)))
+        terms[word] = round(rng.uniform(-3.0, 3.0), 1)
+    return SentimentLexicon(terms)
+
+
+def legacy_scan(positive, negative):
+    """Reference: the brain's old substring search over keyword lists"""
+    def score(text):
+        text = text.lower()
+        return sum(1 for word in positive if word in text) - sum(1 for word in negative if word in text)
+    return score
+
+
+def _per_token_ns(score, texts, tokens):
+    start = time.perf_counter_ns()
+    for text in texts:
+        score(text)
+    return (time.perf_counter_ns() - start) / tokens
+
+
+def benchmark_sentiment(repeat=500):
+    """Nanoseconds per token for hash-map scoring, substring scanning and batch scoring"""
+    texts = UTTERANCES * repeat
+    tokens = sum(len(TOKEN_PATTERN.findall(text)) for text in texts)
+    rows = []
+    for size in LEXICON_SIZES:
+        lexicon = synthetic_lexicon(size)
+        positive = [term for term, weight in lexicon.terms.items() if weight > 0]
+        negative = [term for term, weight in lexicon.terms.items() if weight < 0]
+        legacy_texts = texts if size <= 1000 else texts[:len(UTTERANCES) * 5]  # The scan is too slow to run in full
+        legacy_tokens = sum(len(TOKEN_PATTERN.findall(text)) for text in legacy_texts)
+        
+        start = time.perf_counter_ns()
+        lexicon.score_batch(texts)
+        batch_ns = (time.perf_counter_ns() - start) / tokens
+        
+        rows.append({
+            'lexicon_terms': len(lexicon),
+            'lexicon_ns_per_token': _per_token_ns(lexicon.score, texts, tokens),
+            'batch_ns_per_token': batch_ns,
+            'substring_ns_per_token': _per_token_ns(legacy_scan(positive, negative), legacy_texts, legacy_tokens),
+        })
+    return {'texts': len(texts), 'tokens': tokens, 'numpy': NUMPY_AVAILABLE, 'rows': rows}
+
+
+if __name__ == "__main__":
+    report = benchmark_sentiment()
+    batch_path = "NumPy" if report['numpy'] else "pure Python (NumPy not installed)"
+    print(f"Scored {report['texts']} utterances ({report['tokens']} tokens); batch path: {batch_path}")
+    print(f"{'terms':>8} {'lexicon ns/token':>18} {'batch ns/token':>16} {'substring ns/token':>20}")
+    for row in report['rows']:
+        print(f"{row['lexicon_terms']:>8} {row['lexicon_ns_per_token']:>18.0f} "
+              f"{row['batch_ns_per_token']:>16.0f} {row['substring_ns_per_token']:>20.0f}")
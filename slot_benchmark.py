@@ -0,0 +1,111 @@
+"""
+L.U.F.F.Y Slot Benchmark - Compiled slot patterns vs the old str.replace chains
+Times entity extraction for the open/search/weather/reminder/calculation slots
+and lists utterances where the two disagree (the old chains strip substrings
+inside words, e.g. "run" out of "brunch")
+
+Usage: python slot_benchmark.py
+"""
+
+import random
+import time
+
+from command_dispatch import (
+    ADVANCED_DISPATCHER,
+    LUFFY_DASHBOARD_DISPATCHER,
+    LUFFY_DISPATCHER,
+)
+from intent_router import percentile
+
+
+def legacy_strip_words(*words):
+    """Reference extraction: the replace loops the front ends used before compiled slots"""
+    def extractor(command):
+        for word in words:
+            command = command.replace(word, "")
+        return command.strip()
+    return extractor
+
+
+# (dispatcher, intent, slot, legacy extractor, utterance templates)
+CASES = [
+    (LUFFY_DASHBOARD_DISPATCHER, 'open_app', 'app', legacy_strip_words('open', 'launch', 'start', 'run'),
+     ["open {}", "launch {}", "start {} please", "run {}", "could you open {} for me"]),
+    (LUFFY_DASHBOARD_DISPATCHER, 'search', 'query', legacy_strip_words('search for', 'search', 'google', 'find', 'look up'),
+     ["search for {}", "google {}", "find {}", "look up {} please"]),
+    (LUFFY_DISPATCHER, 'search', 'query', legacy_strip_words('search', 'google', 'for'),
+     ["search for {}", "google {}", "search {} for me"]),
+    (LUFFY_DISPATCHER, 'open_app', 'app', legacy_strip_words('open'),
+     ["open {}", "please open {}"]),
+    (ADVANCED_DISPATCHER, 'weather', 'city', legacy_strip_words('weather', 'in'),
+     ["weather in {}", "what's the weather in {}", "weather {}"]),
+    (ADVANCED_DISPATCHER, 'reminder', 'reminder', legacy_strip_words('remind me'),
+     ["remind me to {}", "remind me {}"]),
+]
+
+FILLERS = [
+    "notepad", "brunch planner", "google chrome", "spotify", "visual studio code",
+    "python tutorials", "flights for berlin", "restaurants in london", "interstellar runtime",
+    "new york", "paris", "berlin", "call mom", "start the oven", "printing documents",
+]
+
+
+def generate_cases(size=50000, seed=11):
+    """Random (dispatcher, intent, slot, legacy extractor, utterance) tuples"""
+    rng = random.Random(seed)
+    cases = []
+    for _ in range(size):
+        dispatcher, intent, slot, legacy, templates = rng.choice(CASES)
+        cases.append((dispatcher, intent, slot, legacy, rng.choice(templates).format(rng.choice(FILLERS))))
+    return cases
+
+
+def _time(extract, cases):
+    clock = time.perf_counter_ns
+    results = []
+    timings = []
+    for case in cases:
+        start = clock()
+        results.append(extract(case))
+        timings.append(clock() - start)
+    timings.sort()
+    return results, timings
+
+
+def benchmark_slots(cases=None):
+    """Compare compiled slot extraction against the legacy replace chains"""
+    if cases is None:
+        cases = generate_cases()
+    
+    def compiled(case):
+        dispatcher, intent, slot, _, command = case
+        return dispatcher.by_name[intent].extractors[slot](command)
+    
+    def legacy(case):
+        return case[3](case[4])
+    
+    legacy_results, legacy_timings = _time(legacy, cases)
+    compiled_results, compiled_timings = _time(compiled, cases)
+    differences = {}
+    for case, old, new in zip(cases, legacy_results, compiled_results):
+        if old != new:
+            differences[case[4]] = (old, new)
+    
+    return {
+        'utterances': len(cases),
+        'differences': len(differences),
+        'difference_examples': list(differences.items())[:10],
+        'legacy_p50_us': percentile(legacy_timings, 50) / 1000.0,
+        'legacy_p99_us': percentile(legacy_timings, 99) / 1000.0,
+        'compiled_p50_us': percentile(compiled_timings, 50) / 1000.0,
+        'compiled_p99_us': percentile(compiled_timings, 99) / 1000.0,
+    }
+
+
+if __name__ == "__main__":
+    report = benchmark_slots()
+    print(f"Extracted slots from {report['utterances']} utterances, {report['differences']} distinct differences")
+    print(f"Replace chains:  p50 {report['legacy_p50_us']:.2f} us, p99 {report['legacy_p99_us']:.2f} us")
+    print(f"Compiled slots:  p50 {report['compiled_p50_us']:.2f} us, p99 {report['compiled_p99_us']:.2f} us")
+    for command, (old, new) in report['difference_examples']:
+        print(f"  {command!r}: {old!r} -> {new!r}")
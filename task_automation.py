@@ -8,48 +8,155 @@ import os
 import threading
 import time
 from collections import defaultdict
+from autosave import AUTOSAVE
+from brain_journal import atomic_write_text
+from recurring_triggers import PREFERENCES_FILE, RECURRING_TYPES, RecurringTrigger, load_work_hours
+from reminder_scheduler import REMINDERS
+from rule_matcher import RuleMatcher
+from task_db import TaskDatabase
+from task_store import TaskStore
 
 class TaskAutomation:
-    def __init__(self, data_dir="jarvis_data"):
+    def __init__(self, data_dir="jarvis_data", backend=None, preferences_file=PREFERENCES_FILE):
         self.data_dir = data_dir
-        self.tasks = []
+        # Scheduler keys use the resolved data dir, so reopening it replaces the old entries
+        self.scope = os.path.realpath(data_dir)
+        self.scheduled = {}  # Scheduler key -> this instance's pending entry
+        self.closed = False
+        self.preferences_file = preferences_file
+        # "json" rewrites tasks.json (in the background); "sqlite" writes single rows to tasks.db
+        self.backend = backend or os.environ.get("LUFFY_TASK_BACKEND", "json")
+        self.db = TaskDatabase(os.path.join(data_dir, "tasks.db")) if self.backend == "sqlite" else None
+        # Held while changing tasks or reminders; the reminder thread updates them too
+        self.lock = threading.RLock()
+        self.tasks = TaskStore()
         self.reminders = []
+        self.reminders_by_id = {}
+        self.active_reminders = set()  # Ids of reminders that are neither triggered nor cancelled
+        self.next_reminder_id = 1
         self.automation_rules = []
-        self.active_timers = {}
+        self.next_rule_id = 1
+        self.rule_matcher = None  # Compiled from automation_rules on first check, dropped when they change
+        # Called with each reminder / recurring rule as it fires (front ends hook notifications in here)
+        self.on_reminder = None
+        self.on_automation = None
         
         self.load_tasks()
+        self.rearm_reminders()
+        self.arm_recurring_rules()
         
     def load_tasks(self):
         """Load saved tasks and reminders"""
         try:
             tasks_file = os.path.join(self.data_dir, "tasks.json")
-            if os.path.exists(tasks_file):
+            if self.db is not None:
+                imported = self.db.import_json(tasks_file)
+                if imported:
+                    print(f"Imported {imported} tasks, reminders and rules from tasks.json")
+                next_ids = self.db.next_ids()
+                self.restore(self.db.load('tasks'), self.db.load('reminders'), self.db.load('automation_rules'),
+                             {'task': next_ids.get('tasks', 1), 'reminder': next_ids.get('reminders', 1),
+                              'rule': next_ids.get('automation_rules', 1)})
+            elif os.path.exists(tasks_file):
                 with open(tasks_file, 'r') as f:
                     data = json.load(f)
-                    self.tasks = data.get('tasks', [])
-                    self.reminders = data.get('reminders', [])
-                    self.automation_rules = data.get('automation_rules', [])
+                self.restore(data.get('tasks', []), data.get('reminders', []), data.get('automation_rules', []),
+                             data.get('next_ids', {}))
         except Exception as e:
             print(f"Error loading tasks: {e}")
     
+    def restore(self, tasks, reminders, automation_rules, next_ids):
+        self.tasks = TaskStore(tasks, next_ids.get('task', 1))
+        self.reminders = reminders
+        for reminder in self.reminders:
+            self.index_reminder(reminder)
+        self.next_reminder_id = max([next_ids.get('reminder', 1)] + [r['id'] + 1 for r in self.reminders])
+        self.automation_rules = automation_rules
+        self.rule_matcher = None
+        self.next_rule_id = max([next_ids.get('rule', 1)] + [r['id'] + 1 for r in self.automation_rules])
+    
     def save_tasks(self):
-        """Save tasks and reminders"""
-        try:
-            tasks_file = os.path.join(self.data_dir, "tasks.json")
+        """Queue a save of tasks and reminders; bursts of changes are written once, in the background"""
+        if self.closed:
+            return
+        AUTOSAVE.mark_dirty(os.path.join(self.data_dir, "tasks.json"), self.write_tasks)
+    
+    def write_tasks(self):
+        """Write tasks and reminders to tasks.json atomically (runs on the autosave worker)"""
+        with self.lock:
             data = {
-                'tasks': self.tasks,
+                'tasks': self.tasks.to_list(),
                 'reminders': self.reminders,
-                'automation_rules': self.automation_rules
+                'automation_rules': self.automation_rules,
+                # Ids are never reused, even after the highest one is removed
+                'next_ids': {'task': self.tasks.next_id, 'reminder': self.next_reminder_id, 'rule': self.next_rule_id}
             }
-            with open(tasks_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            text = json.dumps(data, indent=2)
+        if not os.path.exists(self.data_dir):
+            os.makedirs(self.data_dir)
+        atomic_write_text(os.path.join(self.data_dir, "tasks.json"), text)
+    
+    def insert(self, table, record, add):
+        """Give a new task, reminder or rule its id, add(record) it in memory and save it
+        
+        With SQLite the id is allocated inside the insert's own transaction, so two LUFFY
+        processes sharing tasks.db never hand out the same one. Returns False (and adds
+        nothing) if the database write failed.
+        """
+        if self.db is None:
+            if table == 'tasks':
+                record['id'] = self.tasks.allocate_id()
+            elif table == 'reminders':
+                record['id'] = self.next_reminder_id
+            else:
+                record['id'] = self.next_rule_id
+        else:
+            try:
+                self.db.insert(table, record)
+            except Exception as e:
+                print(f"Error saving tasks: {e}")
+                return False
+        # Keep the in-memory counters past every id handed out, here or by another process
+        if table == 'reminders':
+            self.next_reminder_id = max(self.next_reminder_id, record['id'] + 1)
+        elif table == 'automation_rules':
+            self.next_rule_id = max(self.next_rule_id, record['id'] + 1)
+        add(record)
+        if self.db is None:
+            self.save_tasks()
+        return True
+    
+    def persist(self, table, record):
+        """Save one changed task, reminder or rule: a single-row write with SQLite, a queued rewrite of tasks.json otherwise"""
+        if self.closed:
+            return
+        if self.db is None:
+            self.save_tasks()
+            return
+        try:
+            self.db.update(table, record)
         except Exception as e:
             print(f"Error saving tasks: {e}")
     
+    def flush(self):
+        """Write any queued save now"""
+        AUTOSAVE.flush()
+    
+    def close(self):
+        """Disarm every reminder and rule this instance scheduled and write pending changes"""
+        with self.lock:
+            self.closed = True
+            scheduled, self.scheduled = self.scheduled, {}
+        for key, entry in scheduled.items():
+            REMINDERS.cancel(key, entry)
+        self.flush()
+        if self.db is not None:
+            self.db.close()
+    
     def add_task(self, description, priority="medium", due_date=None):
         """Add a new task"""
         task = {
-            'id': len(self.tasks) + 1,
+            'id': None,  # Assigned when it is saved, under the lock
             'description': description,
             'priority': priority,
             'status': 'pending',
@@ -57,26 +164,37 @@ class TaskAutomation:
             'due_date': due_date,
             'completed': None
         }
-        self.tasks.append(task)
-        self.save_tasks()
+        with self.lock:
+            if not self.insert('tasks', task, self.tasks.add):
+                return f"Sorry sir, I couldn't save the task: {description}"
         return f"Task added: {description}"
     
     def complete_task(self, task_id):
         """Mark task as completed"""
-        for task in self.tasks:
-            if task['id'] == task_id:
-                task['status'] = 'completed'
-                task['completed'] = datetime.datetime.now().isoformat()
+        with self.lock:
+            task = self.tasks.update(task_id, status='completed', completed=datetime.datetime.now().isoformat())
+            if task is None:
+                return f"Task {task_id} not found, sir."
+            self.persist('tasks', task)
+        return f"Task {task_id} marked as completed, sir."
+    
+    def remove_task(self, task_id):
+        """Delete a task; its id is not handed out again"""
+        with self.lock:
+            if self.tasks.remove(task_id) is None:
+                return f"Task {task_id} not found, sir."
+            if self.db is not None:
+                self.db.delete('tasks', task_id)
+            else:
                 self.save_tasks()
-                return f"Task {task_id} marked as completed, sir."
-        return f"Task {task_id} not found, sir."
+        return f"Task {task_id} removed, sir."
     
     def list_tasks(self, status="all"):
         """List tasks by status"""
         if status == "all":
-            filtered_tasks = self.tasks
+            filtered_tasks = self.tasks.to_list()
         else:
-            filtered_tasks = [t for t in self.tasks if t['status'] == status]
+            filtered_tasks = self.tasks.with_status(status)
         
         if not filtered_tasks:
             return "No tasks found, sir."
@@ -92,108 +210,191 @@ class TaskAutomation:
     def add_reminder(self, description, remind_time):
         """Add a reminder"""
         reminder = {
-            'id': len(self.reminders) + 1,
+            'id': None,  # Assigned when it is saved, under the lock
             'description': description,
             'remind_time': remind_time,
             'created': datetime.datetime.now().isoformat(),
             'triggered': False
         }
-        self.reminders.append(reminder)
-        self.save_tasks()
+        with self.lock:
+            if not self.insert('reminders', reminder, self.append_reminder):
+                return f"Sorry sir, I couldn't save the reminder: {description}"
         
         # Start reminder timer
         self.start_reminder_timer(reminder)
         return f"Reminder set for {remind_time}: {description}"
     
     def start_reminder_timer(self, reminder):
-        """Start a timer for a reminder"""
-        def reminder_worker():
-            try:
-                remind_datetime = datetime.datetime.fromisoformat(reminder['remind_time'])
-                current_time = datetime.datetime.now()
-                
-                if remind_datetime > current_time:
-                    sleep_seconds = (remind_datetime - current_time).total_seconds()
-                    time.sleep(sleep_seconds)
-                    
-                    if not reminder['triggered']:
-                        reminder['triggered'] = True
-                        self.save_tasks()
-                        # This would trigger a notification in the main system
-                        print(f"REMINDER: {reminder['description']}")
-                        
-            except Exception as e:
-                print(f"Reminder error: {e}")
-        
-        timer_thread = threading.Thread(target=reminder_worker, daemon=True)
-        timer_thread.start()
-        self.active_timers[reminder['id']] = timer_thread
+        """Arm a reminder on the shared scheduler thread (fires right away if already past)"""
+        try:
+            remind_datetime = datetime.datetime.fromisoformat(reminder['remind_time'])
+        except (TypeError, ValueError) as e:
+            print(f"Reminder error: {e}")
+            return
+        self.schedule(self.reminder_key(reminder['id']), remind_datetime.timestamp(),
+                      lambda: self.fire_reminder(reminder))
+    
+    def schedule(self, key, due, callback):
+        """Put a callback on the shared scheduler, remembering the entry so close() can disarm it"""
+        with self.lock:
+            if not self.closed:
+                self.scheduled[key] = REMINDERS.schedule(key, due, callback)
+    
+    def append_reminder(self, reminder):
+        self.reminders.append(reminder)
+        self.index_reminder(reminder)
+    
+    def index_reminder(self, reminder):
+        self.reminders_by_id[reminder['id']] = reminder
+        if not reminder.get('triggered') and not reminder.get('cancelled'):
+            self.active_reminders.add(reminder['id'])
+        else:
+            self.active_reminders.discard(reminder['id'])
+    
+    def reminder_key(self, reminder_id):
+        return ('task', self.scope, reminder_id)
+    
+    def rearm_reminders(self):
+        """Re-arm every untriggered reminder from tasks.json; ones missed while we were off fire now"""
+        for reminder in self.reminders:
+            if not reminder.get('triggered') and not reminder.get('cancelled'):
+                self.start_reminder_timer(reminder)
+    
+    def fire_reminder(self, reminder):
+        """Runs on the scheduler thread when a reminder is due"""
+        with self.lock:
+            if self.closed or reminder['triggered'] or reminder.get('cancelled'):
+                return
+            reminder['triggered'] = True
+            self.active_reminders.discard(reminder['id'])
+            self.persist('reminders', reminder)
+        missed = datetime.datetime.now() - datetime.datetime.fromisoformat(reminder['remind_time'])
+        if missed > datetime.timedelta(minutes=1):
+            print(f"REMINDER (missed at {reminder['remind_time']}): {reminder['description']}")
+        else:
+            print(f"REMINDER: {reminder['description']}")
+        if self.on_reminder:
+            self.on_reminder(reminder)
+    
+    def find_reminder(self, reminder_id):
+        return self.reminders_by_id.get(reminder_id)
+    
+    def cancel_reminder(self, reminder_id):
+        """Cancel a pending reminder"""
+        with self.lock:
+            reminder = self.find_reminder(reminder_id)
+            if reminder is None or reminder['triggered'] or reminder.get('cancelled'):
+                return f"Reminder {reminder_id} is not pending, sir."
+            key = self.reminder_key(reminder_id)
+            REMINDERS.cancel(key, self.scheduled.pop(key, None))
+            reminder['cancelled'] = True
+            self.active_reminders.discard(reminder_id)
+            self.persist('reminders', reminder)
+        return f"Reminder {reminder_id} cancelled, sir."
+    
+    def snooze_reminder(self, reminder_id, minutes=10):
+        """Push a reminder back by minutes from now (also re-arms one that already fired)"""
+        with self.lock:
+            reminder = self.find_reminder(reminder_id)
+            if reminder is None or reminder.get('cancelled'):
+                return f"Reminder {reminder_id} not found, sir."
+            remind_time = datetime.datetime.now() + datetime.timedelta(minutes=minutes)
+            reminder['remind_time'] = remind_time.isoformat()
+            reminder['triggered'] = False
+            self.active_reminders.add(reminder_id)
+            self.persist('reminders', reminder)
+        self.start_reminder_timer(reminder)
+        return f"Reminder {reminder_id} snoozed until {remind_time.strftime('%I:%M %p')}, sir."
     
     def add_automation_rule(self, trigger, action, description):
-        """Add automation rule"""
+        """Add automation rule (trigger types: time, context, cron, interval)"""
+        if trigger.get('type') in RECURRING_TYPES:
+            try:
+                RecurringTrigger(trigger, load_work_hours(self.preferences_file))
+            except (KeyError, TypeError, ValueError) as e:
+                return f"Invalid schedule for {description}: {e}"
+        
         rule = {
-            'id': len(self.automation_rules) + 1,
+            'id': None,  # Assigned when it is saved, under the lock
             'trigger': trigger,
             'action': action,
             'description': description,
             'created': datetime.datetime.now().isoformat(),
             'active': True
         }
-        self.automation_rules.append(rule)
-        self.save_tasks()
+        with self.lock:
+            if not self.insert('automation_rules', rule, self.automation_rules.append):
+                return f"Sorry sir, I couldn't save the automation rule: {description}"
+            self.rule_matcher = None
+        if trigger.get('type') in RECURRING_TYPES:
+            next_fire = self.arm_rule(rule)
+            if next_fire is None:
+                return f"Automation rule added, but its schedule never fires: {description}"
+            return f"Automation rule added: {description} (next at {next_fire.strftime('%a %I:%M %p')})"
         return f"Automation rule added: {description}"
     
+    def rule_key(self, rule_id):
+        return ('rule', self.scope, rule_id)
+    
+    def arm_recurring_rules(self):
+        """Schedule the next fire of every active cron and interval rule"""
+        work_hours = load_work_hours(self.preferences_file)
+        for rule in self.automation_rules:
+            if rule.get('active', True) and (rule.get('trigger') or {}).get('type') in RECURRING_TYPES:
+                self.arm_rule(rule, work_hours=work_hours)
+    
+    def arm_rule(self, rule, after=None, work_hours=None):
+        """Put a recurring rule's next fire time on the shared scheduler; returns that time or None"""
+        try:
+            trigger = RecurringTrigger(rule['trigger'], work_hours or load_work_hours(self.preferences_file),
+                                       anchor=rule.get('created'))
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"Automation rule {rule['id']} error: {e}")
+            return None
+        next_fire = trigger.next_fire(after or datetime.datetime.now())
+        if next_fire is not None:
+            self.schedule(self.rule_key(rule['id']), next_fire.timestamp(),
+                          lambda: self.fire_rule(rule, trigger, next_fire))
+        return next_fire
+    
+    def fire_rule(self, rule, trigger, due):
+        """Runs on the scheduler thread when a recurring rule is due; arms the following fire first"""
+        if self.closed or not rule.get('active', True):
+            return
+        # Fires missed while asleep are skipped rather than replayed
+        next_fire = trigger.next_fire(max(due, datetime.datetime.now()))
+        if next_fire is not None:
+            self.schedule(self.rule_key(rule['id']), next_fire.timestamp(),
+                          lambda: self.fire_rule(rule, trigger, next_fire))
+        print(f"AUTOMATION: {rule['description']}")
+        if self.on_automation:
+            self.on_automation(rule)
+    
+    def next_rule_fire(self, rule_id):
+        """When a recurring rule fires next, or None if it isn't scheduled"""
+        due = REMINDERS.due_time(self.rule_key(rule_id))
+        return datetime.datetime.fromtimestamp(due) if due is not None else None
+    
     def check_automation_triggers(self, context):
         """Check if any automation rules should trigger"""
-        triggered_actions = []
-        
-        for rule in self.automation_rules:
-            if not rule['active']:
-                continue
-                
-            trigger = rule['trigger']
-            
-            # Time-based triggers
-            if trigger['type'] == 'time':
-                current_hour = datetime.datetime.now().hour
-                if current_hour == trigger['hour']:
-                    triggered_actions.append(rule['action'])
-            
-            # Context-based triggers
-            elif trigger['type'] == 'context':
-                if trigger['condition'] in str(context):
-                    triggered_actions.append(rule['action'])
-        
-        return triggered_actions
+        matcher = self.rule_matcher
+        if matcher is None:
+            with self.lock:
+                matcher = self.rule_matcher = RuleMatcher(self.automation_rules)
+        return matcher.match(context)
     
     def get_task_summary(self):
         """Get summary of tasks"""
-        pending_tasks = len([t for t in self.tasks if t['status'] == 'pending'])
-        completed_tasks = len([t for t in self.tasks if t['status'] == 'completed'])
-        active_reminders = len([r for r in self.reminders if not r['triggered']])
-        
         return {
-            'pending_tasks': pending_tasks,
-            'completed_tasks': completed_tasks,
-            'active_reminders': active_reminders,
+            'pending_tasks': self.tasks.count('pending'),
+            'completed_tasks': self.tasks.count('completed'),
+            'active_reminders': len(self.active_reminders),
             'automation_rules': len(self.automation_rules)
         }
     
     def get_overdue_tasks(self):
-        """Get overdue tasks"""
-        current_time = datetime.datetime.now()
-        overdue = []
-        
-        for task in self.tasks:
-            if task['status'] == 'pending' and task['due_date']:
-                try:
-                    due_date = datetime.datetime.fromisoformat(task['due_date'])
-                    if due_date < current_time:
-                        overdue.append(task)
-                except:
-                    continue
-        
-        return overdue
+        """Get overdue tasks (a prefix of the due-date index)"""
+        return self.tasks.overdue()
     
     def suggest_task_optimization(self):
         """Suggest task optimizations based on patterns"""
@@ -205,12 +406,11 @@ class TaskAutomation:
             suggestions.append(f"You have {len(overdue)} overdue tasks that need attention, sir.")
         
         # Check task completion patterns
-        completed_today = [t for t in self.tasks if t['completed'] and 
-                          datetime.datetime.fromisoformat(t['completed']).date() == datetime.date.today()]
+        completed_today = self.tasks.completed_on(datetime.date.today())
         
-        if len(completed_today) > 3:
+        if completed_today > 3:
             suggestions.append("Excellent productivity today, sir. You've completed multiple tasks.")
-        elif len(completed_today) == 0 and len(self.tasks) > 0:
+        elif completed_today == 0 and len(self.tasks) > 0:
             suggestions.append("Consider tackling some pending tasks today, sir.")
         
         return suggestions
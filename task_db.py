@@ -0,0 +1,204 @@
+"""
+L.U.F.F.Y Task Database - SQLite (WAL) storage for tasks, reminders and automation rules
+Each change is a single-row write in its own transaction instead of a rewrite of
+the whole tasks.json, and SQLite's locking keeps the reminder thread, the GUI and
+a second LUFFY process from overwriting each other. An existing tasks.json is
+imported once, then kept as tasks.json.imported
+"""
+
+import json
+import os
+import sqlite3
+import threading
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    description TEXT NOT NULL,
+    priority TEXT,
+    status TEXT,
+    created TEXT,
+    due_date TEXT,
+    completed TEXT
+);
+CREATE TABLE IF NOT EXISTS reminders (
+    id INTEGER PRIMARY KEY,
+    description TEXT NOT NULL,
+    remind_time TEXT,
+    created TEXT,
+    triggered INTEGER NOT NULL DEFAULT 0,
+    cancelled INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS automation_rules (
+    id INTEGER PRIMARY KEY,
+    "trigger" TEXT,
+    action TEXT,
+    description TEXT,
+    created TEXT,
+    active INTEGER NOT NULL DEFAULT 1
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Columns of each table, in the order of the dicts TaskAutomation keeps in memory
+COLUMNS = {
+    'tasks': ('id', 'description', 'priority', 'status', 'created', 'due_date', 'completed'),
+    'reminders': ('id', 'description', 'remind_time', 'created', 'triggered', 'cancelled'),
+    'automation_rules': ('id', 'trigger', 'action', 'description', 'created', 'active'),
+}
+JSON_COLUMNS = {'trigger', 'action'}
+BOOL_COLUMNS = {'triggered', 'cancelled', 'active'}
+
+# meta key holding each table's next id, so ids are never reused
+NEXT_ID_KEYS = {'tasks': 'next_task_id', 'reminders': 'next_reminder_id', 'automation_rules': 'next_rule_id'}
+
+
+class TaskDatabase:
+    """Row-level persistence for TaskAutomation; the connection opens on first use"""
+    
+    def __init__(self, path):
+        self.path = path
+        self._conn = None
+        # One connection shared by the command, GUI and reminder threads
+        self._lock = threading.Lock()
+    
+    def _connect(self):
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            # Another process holding the write lock makes us wait instead of failing
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+    
+    def _row(self, table, record):
+        row = []
+        for column in COLUMNS[table]:
+            value = record.get(column)
+            if column in JSON_COLUMNS:
+                value = json.dumps(value)
+            elif column in BOOL_COLUMNS:
+                value = int(bool(value if value is not None else column == 'active'))
+            row.append(value)
+        return row
+    
+    def _record(self, table, row):
+        record = {}
+        for column, value in zip(COLUMNS[table], row):
+            if column in JSON_COLUMNS:
+                value = json.loads(value) if value else None
+            elif column in BOOL_COLUMNS:
+                value = bool(value)
+            record[column] = value
+        return record
+    
+    def _write(self, conn, verb, table, record):
+        columns = COLUMNS[table]
+        conn.execute(
+            "%s INTO %s (%s) VALUES (%s)" % (
+                verb, table, ', '.join('"%s"' % column for column in columns), ', '.join('?' * len(columns))),
+            self._row(table, record)
+        )
+    
+    def insert(self, table, record):
+        """Add a new row, allocating its id inside the write transaction; sets and returns record['id']
+        
+        The id comes from the meta counter read under BEGIN IMMEDIATE, so two LUFFY
+        processes sharing the file never hand out the same id or overwrite each other's rows.
+        """
+        key = NEXT_ID_KEYS[table]
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                stored = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+                highest = conn.execute("SELECT MAX(id) FROM %s" % table).fetchone()[0] or 0
+                record['id'] = max(int(stored[0]) if stored else 1, highest + 1)
+                self._write(conn, "INSERT", table, record)
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(record['id'] + 1)))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                record['id'] = None
+                raise
+        return record['id']
+    
+    def update(self, table, record):
+        """Rewrite one existing row"""
+        with self._lock:
+            self._write(self._connect(), "INSERT OR REPLACE", table, record)
+    
+    def delete(self, table, record_id):
+        with self._lock:
+            self._connect().execute("DELETE FROM %s WHERE id = ?" % table, (record_id,))
+    
+    def load(self, table):
+        """Every row of a table as dicts, in id order"""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT %s FROM %s ORDER BY id" % (', '.join('"%s"' % column for column in COLUMNS[table]), table)
+            ).fetchall()
+        return [self._record(table, row) for row in rows]
+    
+    def next_ids(self):
+        """{'tasks': n, 'reminders': n, 'automation_rules': n} for the tables that have stored one"""
+        with self._lock:
+            rows = dict(self._connect().execute("SELECT key, value FROM meta").fetchall())
+        return {table: int(rows[key]) for table, key in NEXT_ID_KEYS.items() if key in rows}
+    
+    def is_empty(self):
+        with self._lock:
+            conn = self._connect()
+            return not any(conn.execute("SELECT 1 FROM %s LIMIT 1" % table).fetchone() for table in COLUMNS)
+    
+    def import_json(self, json_path):
+        """One-time import of a tasks.json into an empty database; returns the number of rows imported
+        
+        The import is a single transaction. Afterwards the file is renamed to
+        tasks.json.imported so it is neither imported twice nor mistaken for live data.
+        """
+        if not os.path.exists(json_path) or not self.is_empty():
+            return 0
+        with open(json_path, 'r') as f:
+            data = json.load(f)
+        next_ids = data.get('next_ids', {})
+        imported = 0
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for table, key in (('tasks', 'task'), ('reminders', 'reminder'), ('automation_rules', 'rule')):
+                    records = data.get(table, [])
+                    next_id = max([next_ids.get(key, 1)] + [record['id'] + 1 for record in records
+                                                             if isinstance(record.get('id'), int)])
+                    seen = set()
+                    for record in records:
+                        if record.get('id') in seen or not isinstance(record.get('id'), int):
+                            # Older files could repeat ids (they were len + 1); give duplicates fresh ones
+                            record['id'] = next_id
+                            next_id += 1
+                        seen.add(record['id'])
+                        self._write(conn, "INSERT", table, record)
+                    conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                                 (NEXT_ID_KEYS[table], str(next_id)))
+                    imported += len(records)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        os.replace(json_path, json_path + ".imported")
+        return imported
+    
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
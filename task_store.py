@@ -0,0 +1,125 @@
+"""
+L.U.F.F.Y Task Store - Indexed in-memory task collection with stable ids
+Tasks are kept in an id map plus per-status and per-priority buckets and a
+due-date ordered index of pending tasks, all updated on every change, so
+lookups, filtered listings, counts and overdue checks cost O(result) rather
+than a scan of every task ever created. Ids come from a monotonic counter
+that is persisted, so removing tasks never leads to a reused id
+"""
+
+import bisect
+import datetime
+
+
+def due_key(task):
+    """Sortable due date of a task, or None if it has none or it isn't a local ISO timestamp"""
+    try:
+        due_date = datetime.datetime.fromisoformat(task.get('due_date') or '')
+    except (TypeError, ValueError):
+        return None
+    return due_date.isoformat() if due_date.tzinfo is None else None
+
+
+class TaskStore:
+    """id -> task map with status, priority and due-date indexes maintained incrementally"""
+    
+    def __init__(self, tasks=None, next_id=1):
+        self.by_id = {}
+        self.by_status = {}  # status -> {id: task}, in creation order
+        self.by_priority = {}  # priority -> {id: task}
+        self.due_index = []  # Sorted (due_date, id) of pending tasks with a due date
+        self.completed_by_day = {}  # 'YYYY-MM-DD' -> completed task count
+        self.next_id = next_id
+        for task in tasks or []:
+            if task.get('id') in self.by_id or not isinstance(task.get('id'), int):
+                # Older files could repeat ids (they were len(tasks) + 1); give duplicates fresh ones
+                task['id'] = None
+            self.add(task)
+    
+    def allocate_id(self):
+        task_id = self.next_id
+        self.next_id += 1
+        return task_id
+    
+    def add(self, task):
+        """Index a task dict, assigning the next id if it has none; returns the task"""
+        if task.get('id') is None:
+            task['id'] = self.allocate_id()
+        else:
+            self.next_id = max(self.next_id, task['id'] + 1)
+        self.by_id[task['id']] = task
+        self._index(task)
+        return task
+    
+    def _index(self, task):
+        self.by_status.setdefault(task.get('status'), {})[task['id']] = task
+        self.by_priority.setdefault(task.get('priority'), {})[task['id']] = task
+        due = due_key(task) if task.get('status') == 'pending' else None
+        if due:
+            bisect.insort(self.due_index, (due, task['id']))
+        if task.get('status') == 'completed' and task.get('completed'):
+            day = task['completed'][:10]
+            self.completed_by_day[day] = self.completed_by_day.get(day, 0) + 1
+    
+    def _unindex(self, task):
+        self.by_status.get(task.get('status'), {}).pop(task['id'], None)
+        self.by_priority.get(task.get('priority'), {}).pop(task['id'], None)
+        due = due_key(task) if task.get('status') == 'pending' else None
+        if due:
+            position = bisect.bisect_left(self.due_index, (due, task['id']))
+            if position < len(self.due_index) and self.due_index[position] == (due, task['id']):
+                del self.due_index[position]
+        if task.get('status') == 'completed' and task.get('completed'):
+            day = task['completed'][:10]
+            self.completed_by_day[day] = self.completed_by_day.get(day, 1) - 1
+    
+    def update(self, task_id, **fields):
+        """Change fields of a task and re-index it; returns the task or None"""
+        task = self.by_id.get(task_id)
+        if task is None:
+            return None
+        self._unindex(task)
+        task.update(fields)
+        self._index(task)
+        return task
+    
+    def remove(self, task_id):
+        task = self.by_id.pop(task_id, None)
+        if task is not None:
+            self._unindex(task)
+        return task
+    
+    def get(self, task_id):
+        return self.by_id.get(task_id)
+    
+    def with_status(self, status):
+        return list(self.by_status.get(status, {}).values())
+    
+    def with_priority(self, priority):
+        return list(self.by_priority.get(priority, {}).values())
+    
+    def count(self, status):
+        return len(self.by_status.get(status, ()))
+    
+    def completed_on(self, day):
+        """Number of tasks completed on a date"""
+        return self.completed_by_day.get(day.isoformat(), 0)
+    
+    def overdue(self, now=None):
+        """Pending tasks whose due date has passed, earliest first"""
+        now = (now or datetime.datetime.now()).isoformat()
+        overdue = []
+        for due_date, task_id in self.due_index:
+            if due_date >= now:
+                break
+            overdue.append(self.by_id[task_id])
+        return overdue
+    
+    def __iter__(self):
+        return iter(list(self.by_id.values()))
+    
+    def __len__(self):
+        return len(self.by_id)
+    
+    def to_list(self):
+        return list(self.by_id.values())
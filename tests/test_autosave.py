@@ -0,0 +1,81 @@
+"""
+L.U.F.F.Y Autosave tests - Debounced saves, flush, retry and shutdown
+Run with: python -m unittest discover tests
+"""
+
+import os
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from autosave import Autosaver
+
+
+class AutosaverTest(unittest.TestCase):
+    
+    def make_saver(self, delay):
+        saver = Autosaver(delay=delay, name="luffy-autosave-test")
+        self.addCleanup(saver.shutdown)
+        return saver
+    
+    def test_burst_of_marks_is_written_once(self):
+        saver = self.make_saver(0.05)
+        written = []
+        done = threading.Event()
+        
+        def save():
+            written.append(len(written))
+            done.set()
+        
+        for _ in range(50):
+            saver.mark_dirty('tasks', save)
+        self.assertTrue(done.wait(2))
+        self.assertEqual(written, [0])
+        self.assertEqual(saver.stats()['requests'], 50)
+    
+    def test_flush_writes_pending_saves_now(self):
+        saver = self.make_saver(60)
+        written = []
+        saver.mark_dirty('brain', lambda: written.append('brain'))
+        saver.mark_dirty('tasks', lambda: written.append('tasks'))
+        self.assertEqual(saver.pending(), 2)
+        saver.flush()
+        self.assertEqual(sorted(written), ['brain', 'tasks'])
+        self.assertEqual(saver.pending(), 0)
+    
+    def test_latest_save_callable_wins(self):
+        saver = self.make_saver(60)
+        written = []
+        saver.mark_dirty('tasks', lambda: written.append('old'))
+        saver.mark_dirty('tasks', lambda: written.append('new'))
+        saver.flush()
+        self.assertEqual(written, ['new'])
+    
+    def test_failed_save_is_retried(self):
+        saver = self.make_saver(60)
+        attempts = []
+        
+        def save():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise IOError("disk busy")
+        
+        saver.mark_dirty('tasks', save)
+        saver.flush()
+        self.assertEqual(saver.pending(), 1)
+        saver.flush()
+        self.assertEqual(len(attempts), 2)
+        self.assertEqual(saver.stats()['failures'], 1)
+    
+    def test_marks_after_shutdown_write_inline(self):
+        saver = self.make_saver(60)
+        saver.shutdown()
+        written = []
+        saver.mark_dirty('tasks', lambda: written.append('tasks'))
+        self.assertEqual(written, ['tasks'])
+
+
+if __name__ == "__main__":
+    unittest.main()
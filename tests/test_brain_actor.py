@@ -0,0 +1,74 @@
+"""
+L.U.F.F.Y Brain Actor tests - Mutations from many threads applied one at a time, in order
+Run with: python -m unittest discover tests
+"""
+
+import os
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from brain_actor import BrainActor
+
+
+class BrainActorTest(unittest.TestCase):
+    
+    def make_actor(self, publish=None):
+        actor = BrainActor(publish, name="luffy-brain-test")
+        self.addCleanup(actor.close)
+        return actor
+    
+    def test_concurrent_submits_never_interleave(self):
+        actor = self.make_actor()
+        state = {'count': 0, 'writers': set()}
+        
+        def increment():
+            # A read-modify-write that would lose updates if two ran at once
+            value = state['count']
+            state['writers'].add(threading.current_thread().name)
+            state['count'] = value + 1
+        
+        def client():
+            for _ in range(200):
+                actor.submit(increment)
+        
+        threads = [threading.Thread(target=client) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        actor.flush()
+        self.assertEqual(state['count'], 1600)
+        self.assertEqual(state['writers'], {"luffy-brain-test"})
+    
+    def test_submissions_from_one_thread_keep_their_order(self):
+        actor = self.make_actor()
+        applied = []
+        for index in range(100):
+            actor.submit(applied.append, index)
+        actor.flush()
+        self.assertEqual(applied, list(range(100)))
+    
+    def test_call_returns_result_after_publish(self):
+        published = []
+        actor = self.make_actor(lambda: published.append(True))
+        self.assertEqual(actor.call(lambda: 42), 42)
+        self.assertTrue(published)
+    
+    def test_call_raises_the_mutation_error(self):
+        actor = self.make_actor()
+        with self.assertRaises(ValueError):
+            actor.call(int, "not a number")
+    
+    def test_submit_after_close_runs_on_caller(self):
+        actor = self.make_actor()
+        actor.close()
+        applied = []
+        actor.submit(applied.append, 'late').wait(1)
+        self.assertEqual(applied, ['late'])
+
+
+if __name__ == "__main__":
+    unittest.main()
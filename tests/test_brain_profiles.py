@@ -0,0 +1,69 @@
+"""
+L.U.F.F.Y Brain Profiles tests - Lazy loading, LRU eviction and write-back of per-user brains
+Run with: python -m unittest discover tests
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from brain_profiles import DEFAULT_PROFILE, BrainProfiles, profile_key
+
+
+class FakeBrain:
+    """Stands in for AIBrain: remembers where it lives and whether it was closed"""
+    
+    def __init__(self, data_dir):
+        self.data_dir = data_dir
+        self.closed = False
+    
+    def close(self):
+        self.closed = True
+
+
+class BrainProfilesTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.scratch = tempfile.TemporaryDirectory(prefix="luffy_test_")
+        self.data_dir = self.scratch.name
+    
+    def tearDown(self):
+        self.scratch.cleanup()
+    
+    def test_profile_names_are_normalized(self):
+        self.assertEqual(profile_key("Wesley S."), "wesley_s")
+        self.assertEqual(profile_key("  "), DEFAULT_PROFILE)
+    
+    def test_least_recently_used_profile_is_closed(self):
+        profiles = BrainProfiles(self.data_dir, max_loaded=2, brain_factory=FakeBrain)
+        wesley = profiles.get("wesley")
+        nami = profiles.get("nami")
+        profiles.get("wesley")  # nami is now the least recently used
+        profiles.get("zoro")
+        self.assertEqual(profiles.loaded(), ["wesley", "zoro"])
+        self.assertTrue(nami.closed)
+        self.assertFalse(wesley.closed)
+        self.assertEqual((profiles.loads, profiles.evictions), (3, 1))
+    
+    def test_default_profile_lives_in_the_data_dir(self):
+        profiles = BrainProfiles(self.data_dir, brain_factory=FakeBrain)
+        self.assertEqual(profiles.get().data_dir, self.data_dir)
+        self.assertEqual(profiles.get("Wesley").data_dir, os.path.join(self.data_dir, "profiles", "wesley"))
+    
+    def test_evicted_profile_reloads_its_data(self):
+        profiles = BrainProfiles(self.data_dir, max_loaded=1)
+        self.addCleanup(profiles.close_all)
+        brain = profiles.get("wesley")
+        brain.update_user_profile("what time is it")
+        profiles.get("nami")
+        reloaded = profiles.get("wesley")
+        self.assertIsNot(reloaded, brain)
+        self.assertEqual(reloaded.user_profile['total_interactions'], 1)
+        self.assertEqual(profiles.available(), [DEFAULT_PROFILE, "nami", "wesley"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+L.U.F.F.Y Command Dispatch tests - Compound splitting, session ending and typo correction
+Run with: python -m unittest discover tests
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from command_dispatch import (ADVANCED_DISPATCHER, BASIC_DISPATCHER, DASHBOARD_DISPATCHER, LUFFY_DASHBOARD_DISPATCHER,
+                              LUFFY_DISPATCHER)
+
+
+class EchoFrontEnd:
+    """Minimal dispatch target: every handler replies with the intent it was routed to"""
+    
+    def __getattr__(self, name):
+        if name.startswith('handle_'):
+            return lambda match: name[len('handle_'):]
+        raise AttributeError(name)
+
+
+class SplitCompoundTest(unittest.TestCase):
+    
+    def test_search_queries_containing_and_stay_whole(self):
+        # "hi" inside "chips", "white"/"roll" are not commands of their own
+        for command in ["search for fish and chips", "search for black and white movies",
+                        "google rock and roll history", "search for tom and jerry"]:
+            self.assertEqual(LUFFY_DISPATCHER.split_compound(command), [[command]], command)
+    
+    def test_real_compounds_still_split(self):
+        self.assertEqual(
+            LUFFY_DISPATCHER.split_compound("open brave and search for python tutorials then what time is it"),
+            [['open brave', 'search for python tutorials'], ['what time is it']]
+        )
+        self.assertEqual(LUFFY_DISPATCHER.split_compound("hello and what's the weather"),
+                         [['hello', "what's the weather"]])
+
+
+class EndSessionTest(unittest.TestCase):
+    
+    def test_exit_ends_session(self):
+        self.assertTrue(BASIC_DISPATCHER.respond(EchoFrontEnd(), "goodbye").end_session)
+    
+    def test_compound_ending_in_exit_ends_session(self):
+        response = BASIC_DISPATCHER.respond(EchoFrontEnd(), "open notepad and exit")
+        self.assertEqual(response.intent, 'compound')
+        self.assertTrue(response.end_session)
+    
+    def test_other_commands_keep_session(self):
+        self.assertFalse(BASIC_DISPATCHER.respond(EchoFrontEnd(), "open notepad and what time is it").end_session)
+
+
+class FuzzyCorrectionTest(unittest.TestCase):
+    
+    def test_everyday_words_never_become_exit(self):
+        for command in ["edit my document", "give me a quiz"]:
+            self.assertNotEqual(LUFFY_DISPATCHER.match(command).name, 'exit', command)
+    
+    def test_real_words_are_not_corrected_into_triggers(self):
+        # "oven" -> "open", "fine" -> "find", "data"/"late" -> "date", "dime" -> "time"
+        dispatchers = [BASIC_DISPATCHER, LUFFY_DISPATCHER, ADVANCED_DISPATCHER, DASHBOARD_DISPATCHER,
+                       LUFFY_DASHBOARD_DISPATCHER]
+        for command in ["turn the oven on", "that is fine", "i have some data", "it is too late",
+                        "give me a dime"]:
+            for dispatcher in dispatchers:
+                self.assertIsNone(dispatcher.match(command).name, command)
+    
+    def test_apps_and_search_need_exact_triggers(self):
+        self.assertIsNone(LUFFY_DISPATCHER.match("serch for cats").name)
+        self.assertIsNone(LUFFY_DASHBOARD_DISPATCHER.match("lanch notepad").name)
+    
+    def test_typos_still_route_to_safe_intents(self):
+        self.assertEqual(LUFFY_DISPATCHER.match("what tiem is it").name, 'time')
+        self.assertEqual(LUFFY_DISPATCHER.match("whats the waether").name, 'weather')
+
+
+if __name__ == "__main__":
+    unittest.main()
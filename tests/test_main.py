@@ -0,0 +1,64 @@
+"""
+L.U.F.F.Y main assistant tests - Headless command processing through LUFFY
+Run with: python -m unittest discover tests (skipped when main.py's dependencies are missing)
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import main
+    MAIN_AVAILABLE = True
+except ImportError:
+    MAIN_AVAILABLE = False
+
+
+@unittest.skipUnless(MAIN_AVAILABLE, "main.py dependencies not installed")
+class HistoryTest(unittest.TestCase):
+    
+    def setUp(self):
+        # LUFFY keeps its data under the working directory
+        self.original_cwd = os.getcwd()
+        self.scratch = tempfile.TemporaryDirectory(prefix="luffy_test_")
+        os.chdir(self.scratch.name)
+        self.luffy = main.LUFFY(headless=True)
+    
+    def tearDown(self):
+        self.luffy.shutdown()
+        os.chdir(self.original_cwd)
+        self.scratch.cleanup()
+    
+    def ask(self, command):
+        response = self.luffy.process_command_text(command)
+        # Memory and history are written by the brain's writer thread
+        self.luffy.brain.actor.flush()
+        return response
+    
+    def test_same_history_question_twice_searches_both_times(self):
+        self.ask("how do python decorators work")
+        for _ in range(2):
+            response = self.ask("what did I ask about python")
+            self.assertEqual(response.intent, 'history')
+            self.assertIn("python decorators", response.text)
+    
+    def test_repeated_history_questions_do_not_crowd_out_real_turns(self):
+        self.ask("how do python decorators work")
+        for _ in range(3):
+            self.ask("what did I ask about python")
+        response = self.ask("what did I ask about python")
+        self.assertIn("python decorators", response.text)
+        self.assertNotIn("what did I ask about python", response.text)
+    
+    def test_history_question_after_emotional_turn(self):
+        self.ask("how do python decorators work")
+        self.ask("this is terrible and awful")
+        response = self.ask("what did I ask about python")
+        self.assertEqual(response.intent, 'history')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+"""
+L.U.F.F.Y Pattern Store tests - One-time migrations and bounded, decaying pattern statistics
+Run with: python -m unittest discover tests
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pattern_store import PatternStats, PatternStore
+
+
+def use(command, response_type, timestamp):
+    return {'full_command': command, 'response_type': response_type, 'timestamp': timestamp}
+
+
+class MigrationTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.scratch = tempfile.TemporaryDirectory(prefix="luffy_test_")
+        self.path = os.path.join(self.scratch.name, "patterns.db")
+    
+    def tearDown(self):
+        self.scratch.cleanup()
+    
+    def open_store(self):
+        store = PatternStore(self.path)
+        self.addCleanup(store.close)
+        return store
+    
+    def test_marked_import_runs_only_once(self):
+        legacy = {'what time': [use('what time is it', 'time_query', '2026-01-05T09:00:00')]}
+        store = self.open_store()
+        store.import_patterns(legacy, marker='legacy_patterns_pkl')
+        store.close()
+        # The same legacy file is seen again on the next start, with a newer entry added
+        legacy['what time'].append(use('what time now', 'time_query', '2026-01-06T09:00:00'))
+        store = self.open_store()
+        store.import_patterns(legacy, marker='legacy_patterns_pkl')
+        self.assertEqual(store.stats('what time').uses, 1)
+    
+    def test_unmarked_imports_fold_new_entries(self):
+        store = self.open_store()
+        store.add('what time', use('what time is it', 'time_query', '2026-01-05T09:00:00'))
+        store.add('what time', use('what time is it', 'time_query', '2026-01-05T09:00:00'))
+        store.add('what time', use('what time now', 'time_query', '2026-01-06T09:00:00'))
+        self.assertEqual(store.stats('what time').uses, 2)
+        self.assertEqual(store.most_recent('what time')['full_command'], 'what time now')
+    
+    def test_event_table_is_folded_and_dropped(self):
+        conn = sqlite3.connect(self.path)
+        conn.executescript("""
+            CREATE TABLE patterns (pattern_key TEXT PRIMARY KEY, uses INTEGER NOT NULL DEFAULT 0, last_seen TEXT);
+            CREATE TABLE pattern_events (pattern_key TEXT, full_command TEXT, response_type TEXT, timestamp TEXT);
+            INSERT INTO patterns VALUES ('open notepad', 2, '2026-01-05T10:00:00');
+            INSERT INTO pattern_events VALUES ('open notepad', 'open notepad', 'app_launch', '2026-01-05T09:00:00');
+            INSERT INTO pattern_events VALUES ('open notepad', 'open notepad now', 'app_launch', '2026-01-05T10:00:00');
+        """)
+        conn.close()
+        store = self.open_store()
+        self.assertEqual(store.stats('open notepad').uses, 2)
+        store.close()
+        conn = sqlite3.connect(self.path)
+        tables = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+        conn.close()
+        self.assertNotIn('pattern_events', tables)
+        # Reopening doesn't fold anything twice
+        self.assertEqual(self.open_store().stats('open notepad').uses, 2)
+
+
+
+class PatternStatsTest(unittest.TestCase):
+    
+    def test_recent_ring_stays_bounded(self):
+        stats = PatternStats()
+        for day in range(1, 29):
+            stats.observe(use('what time is it', 'time_query', '2026-02-%02dT09:00:00' % day))
+        self.assertEqual(stats.uses, 28)
+        self.assertEqual(len(stats.recent), PatternStats.RING_SIZE)
+        self.assertEqual(stats.latest['timestamp'], '2026-02-28T09:00:00')
+    
+    def test_old_response_types_decay(self):
+        stats = PatternStats()
+        for day in range(1, 6):
+            stats.observe(use('find python docs', 'web_search', '2026-01-%02dT09:00:00' % day))
+        # Two uses two months later outweigh five old ones
+        stats.observe(use('find python docs', 'general', '2026-03-05T09:00:00'))
+        stats.observe(use('find python docs', 'general', '2026-03-06T09:00:00'))
+        self.assertEqual(stats.dominant_response_type(), 'general')
+        self.assertLess(stats.counts['web_search'], 1.0)
+    
+    def test_out_of_order_entry_counts_with_its_decayed_weight(self):
+        stats = PatternStats()
+        stats.observe(use('open notepad', 'app_launch', '2026-01-29T09:00:00'))
+        stats.observe(use('open notepad', 'general', '2026-01-01T09:00:00'))
+        self.assertAlmostEqual(stats.counts['general'], 0.25, places=3)
+        self.assertEqual(stats.latest['timestamp'], '2026-01-29T09:00:00')
+    
+    def test_round_trip(self):
+        stats = PatternStats()
+        stats.observe(use('open notepad', 'app_launch', '2026-01-05T09:00:00'))
+        copy = PatternStats.from_dict(stats.to_dict())
+        self.assertEqual(copy.to_dict(), stats.to_dict())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+"""
+L.U.F.F.Y Recurring Triggers tests - Cron and interval next-fire times checked against a brute-force scan
+Run with: python -m unittest discover tests
+"""
+
+import datetime
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recurring_triggers import CronExpression, RecurringTrigger, parse_weekdays
+
+START = datetime.datetime(2024, 2, 27, 22, 47, 30)  # Crosses a leap day, a month end and a weekend
+WORK_HOURS = (datetime.time(9, 0), datetime.time(17, 0))
+MINUTE = datetime.timedelta(minutes=1)
+
+
+def cron_day(cron, moment):
+    """Plain reading of the cron day rules: month, then day of month and/or day of week"""
+    if moment.month not in cron.months:
+        return False
+    day = moment.day in cron.days
+    weekday = moment.weekday() in cron.weekdays
+    if cron.day_restricted and cron.weekday_restricted:
+        return day or weekday
+    return day and weekday
+
+
+def cron_matches(cron, moment):
+    return moment.minute in cron.minutes and moment.hour in cron.hours and cron_day(cron, moment)
+
+
+def brute_force(matches, after, days, day_ok=None):
+    """First whole minute strictly after after for which matches(minute) is true, trying every minute
+    
+    day_ok, when given, lets whole days that can never match be skipped.
+    """
+    moment = after.replace(second=0, microsecond=0) + MINUTE
+    limit = after + datetime.timedelta(days=days)
+    while moment <= limit:
+        if day_ok is not None and not day_ok(moment):
+            moment = moment.replace(hour=0, minute=0) + datetime.timedelta(days=1)
+            continue
+        if matches(moment):
+            return moment
+        moment += MINUTE
+    return None
+
+
+class CronExpressionTest(unittest.TestCase):
+    
+    EXPRESSIONS = [
+        "*/15 9-17 * * 1-5",
+        "30 8 1,15 * *",
+        "0 12 1 * mon",  # Both day fields restricted: either one matching fires
+        "5 0 * jan,jun sun",
+        "0 */6 * * *",
+        "59 23 31 * *",
+        "@weekly",
+        "0 0 29 2 *",
+    ]
+    
+    def test_next_after_matches_a_minute_scan(self):
+        for expression in self.EXPRESSIONS:
+            cron = CronExpression(expression)
+            moment = START
+            for _ in range(4):
+                expected = brute_force(lambda candidate: cron_matches(cron, candidate), moment, days=5 * 366,
+                                       day_ok=lambda candidate: cron_day(cron, candidate))
+                self.assertEqual(cron.next_after(moment), expected, f"{expression} after {moment}")
+                if expected is None:
+                    break
+                moment = expected
+    
+    def test_sunday_is_zero_or_seven_and_day_fields_are_ored(self):
+        self.assertEqual(CronExpression("@weekly").next_after(START), datetime.datetime(2024, 3, 3, 0, 0))
+        self.assertEqual(CronExpression("0 0 * * 7").next_after(START), datetime.datetime(2024, 3, 3, 0, 0))
+        either = CronExpression("0 12 1 * mon")
+        self.assertEqual(either.next_after(START), datetime.datetime(2024, 3, 1, 12, 0))  # A Friday, the 1st
+        self.assertEqual(either.next_after(datetime.datetime(2024, 3, 1, 12, 0)), datetime.datetime(2024, 3, 4, 12, 0))
+    
+    def test_impossible_date_never_fires(self):
+        self.assertIsNone(CronExpression("0 0 30 2 *").next_after(START))
+    
+    def test_bad_expressions_raise(self):
+        for expression in ("60 * * * *", "* * *", "5-1 * * * *", "*/0 * * * *", "0 0 0 * *", "0 0 * 13 *"):
+            with self.assertRaises(ValueError, msg=expression):
+                CronExpression(expression)
+
+
+class RecurringTriggerTest(unittest.TestCase):
+    
+    def check_against_scan(self, trigger, matches, fires=6):
+        moment = START
+        for _ in range(fires):
+            expected = brute_force(matches, moment, days=30)
+            self.assertEqual(trigger.next_fire(moment), expected, f"{trigger.trigger} after {moment}")
+            moment = expected
+    
+    def test_cron_inside_work_hours_on_weekdays(self):
+        spec = {'type': 'cron', 'expression': "*/20 * * * *", 'weekdays': 'weekdays', 'work_hours': True}
+        trigger = RecurringTrigger(spec, work_hours=WORK_HOURS)
+        self.check_against_scan(trigger, lambda moment: (
+            moment.minute % 20 == 0 and moment.weekday() < 5 and WORK_HOURS[0] <= moment.time() < WORK_HOURS[1]))
+    
+    def test_interval_keeps_its_anchor_across_closed_hours(self):
+        anchor = datetime.datetime(2024, 2, 1, 8, 10)
+        spec = {'type': 'interval', 'minutes': 45, 'weekdays': ['mon', 'wed', 'sat'], 'work_hours': True}
+        trigger = RecurringTrigger(spec, work_hours=WORK_HOURS, anchor=anchor)
+        self.check_against_scan(trigger, lambda moment: (
+            (moment - anchor) % datetime.timedelta(minutes=45) == datetime.timedelta(0)
+            and moment.weekday() in (0, 2, 5) and WORK_HOURS[0] <= moment.time() < WORK_HOURS[1]), fires=20)
+    
+    def test_interval_before_its_start_fires_at_the_start(self):
+        trigger = RecurringTrigger({'type': 'interval', 'hours': 2, 'start': "2024-03-01T10:00:00"})
+        self.assertEqual(trigger.next_fire(START), datetime.datetime(2024, 3, 1, 10, 0))
+        self.assertEqual(trigger.next_fire(datetime.datetime(2024, 3, 1, 10, 0)), datetime.datetime(2024, 3, 1, 12, 0))
+    
+    def test_weekday_names(self):
+        self.assertEqual(parse_weekdays("Mon, friday"), {0, 4})
+        self.assertEqual(parse_weekdays('weekends'), {5, 6})
+        self.assertIsNone(parse_weekdays(None))
+    
+    def test_bad_triggers_raise(self):
+        for spec, work_hours in (
+            ({'type': 'interval', 'minutes': 0}, None),
+            ({'type': 'interval', 'minutes': 5, 'weekdays': []}, None),
+            ({'type': 'cron', 'expression': "* * * * *", 'work_hours': True}, (datetime.time(17), datetime.time(9))),
+            ({'type': 'time', 'time': "08:00"}, None),
+        ):
+            with self.assertRaises(ValueError, msg=str(spec)):
+                RecurringTrigger(spec, work_hours=work_hours)
+
+
+if __name__ == "__main__":
+    unittest.main()
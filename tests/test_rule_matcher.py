@@ -0,0 +1,48 @@
+"""
+L.U.F.F.Y Rule Matcher tests - Compiled automation rules agree with the per-rule loop
+Run with: python -m unittest discover tests
+"""
+
+import datetime
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from intent_router import KeywordAutomaton
+from rule_matcher import RuleMatcher, benchmark_rules
+
+
+def context_rule(rule_id, condition):
+    return {'id': rule_id, 'trigger': {'type': 'context', 'condition': condition}, 'action': {'rule': rule_id}}
+
+
+class KeywordAutomatonTest(unittest.TestCase):
+    
+    def test_all_ranks_reports_overlapping_and_repeated_keywords(self):
+        automaton = KeywordAutomaton([('he', 0), ('she', 1), ('hers', 2), ('his', 3), ('she', 4)])
+        self.assertEqual(automaton.all_ranks("ushers"), {0, 1, 2, 4})
+        self.assertEqual(automaton.all_ranks("nothing"), set())
+        self.assertEqual(automaton.best_rank("ushers"), 0)
+
+
+class RuleMatcherTest(unittest.TestCase):
+    
+    def test_actions_come_back_in_rule_order(self):
+        rules = [context_rule(1, 'python'), context_rule(2, 'code'), context_rule(3, 'music'),
+                 {'id': 4, 'trigger': {'type': 'time', 'hour': 9}, 'action': {'rule': 4}}]
+        matcher = RuleMatcher(rules)
+        now = datetime.datetime(2026, 1, 5, 9, 30)
+        self.assertEqual(matcher.match("writing python code", now), [{'rule': 1}, {'rule': 2}, {'rule': 4}])
+    
+    def test_empty_condition_and_inactive_rules(self):
+        rules = [context_rule(1, ''), dict(context_rule(2, 'music'), active=False)]
+        self.assertEqual(RuleMatcher(rules).match("music", datetime.datetime(2026, 1, 5, 9)), [{'rule': 1}])
+    
+    def test_agrees_with_per_rule_loop(self):
+        self.assertTrue(benchmark_rules(count=500, events=50)['agree'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+"""
+L.U.F.F.Y Task Automation tests - Reminder cancel, snooze, and close/reopen on the shared scheduler
+Run with: python -m unittest discover tests
+"""
+
+import datetime
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reminder_scheduler import REMINDERS, ReminderScheduler
+from task_automation import TaskAutomation
+
+
+def in_an_hour():
+    return (datetime.datetime.now() + datetime.timedelta(hours=1)).isoformat()
+
+
+class CloseTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.scratch = tempfile.TemporaryDirectory(prefix="luffy_test_")
+        self.data_dir = self.scratch.name
+    
+    def tearDown(self):
+        self.scratch.cleanup()
+    
+    def test_close_disarms_reminders(self):
+        tasks = TaskAutomation(self.data_dir)
+        tasks.add_reminder("later", in_an_hour())
+        key = tasks.reminder_key(1)
+        self.assertIsNotNone(REMINDERS.due_time(key))
+        tasks.close()
+        self.assertIsNone(REMINDERS.due_time(key))
+    
+    def test_reopen_replaces_entries_and_late_close_keeps_them(self):
+        first = TaskAutomation(self.data_dir)
+        first.add_reminder("later", in_an_hour())
+        first.flush()
+        second = TaskAutomation(self.data_dir)
+        self.assertEqual(first.reminder_key(1), second.reminder_key(1))
+        # Closing the old instance after the reopen must not disarm the new one's reminder
+        first.close()
+        self.assertIsNotNone(REMINDERS.due_time(second.reminder_key(1)))
+        second.close()
+        self.assertIsNone(REMINDERS.due_time(second.reminder_key(1)))
+    
+    def test_closed_instance_ignores_fires(self):
+        tasks = TaskAutomation(self.data_dir)
+        tasks.add_reminder("later", in_an_hour())
+        reminder = tasks.find_reminder(1)
+        tasks.close()
+        tasks.fire_reminder(reminder)
+        self.assertFalse(reminder['triggered'])
+
+
+class ReminderTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.scratch = tempfile.TemporaryDirectory(prefix="luffy_test_")
+        self.tasks = TaskAutomation(self.scratch.name)
+        self.tasks.add_reminder("stretch", in_an_hour())
+        self.key = self.tasks.reminder_key(1)
+    
+    def tearDown(self):
+        self.tasks.close()
+        self.scratch.cleanup()
+    
+    def test_cancel_disarms_and_persists(self):
+        self.assertEqual(self.tasks.cancel_reminder(1), "Reminder 1 cancelled, sir.")
+        self.assertIsNone(REMINDERS.due_time(self.key))
+        self.assertNotIn(1, self.tasks.active_reminders)
+        self.assertEqual(self.tasks.cancel_reminder(1), "Reminder 1 is not pending, sir.")
+        self.assertEqual(self.tasks.cancel_reminder(99), "Reminder 99 is not pending, sir.")
+        self.tasks.flush()
+        reopened = TaskAutomation(self.scratch.name)
+        self.addCleanup(reopened.close)
+        self.assertTrue(reopened.find_reminder(1)['cancelled'])
+        self.assertIsNone(REMINDERS.due_time(self.key))
+    
+    def test_cancelled_reminder_does_not_fire(self):
+        reminder = self.tasks.find_reminder(1)
+        self.tasks.cancel_reminder(1)
+        self.tasks.fire_reminder(reminder)
+        self.assertFalse(reminder['triggered'])
+    
+    def test_snooze_rearms_a_fired_reminder(self):
+        reminder = self.tasks.find_reminder(1)
+        self.tasks.fire_reminder(reminder)
+        self.assertTrue(reminder['triggered'])
+        self.assertIsNotNone(REMINDERS.due_time(self.key))  # the hour-out entry is still queued
+        before = datetime.datetime.now()
+        self.assertIn("snoozed until", self.tasks.snooze_reminder(1, minutes=5))
+        self.assertFalse(reminder['triggered'])
+        self.assertIn(1, self.tasks.active_reminders)
+        due = datetime.datetime.fromtimestamp(REMINDERS.due_time(self.key))
+        self.assertLess(abs((due - before).total_seconds() - 300), 5)
+        self.assertEqual(due.isoformat(), reminder['remind_time'])
+    
+    def test_snooze_unknown_or_cancelled_reminder(self):
+        self.assertEqual(self.tasks.snooze_reminder(99), "Reminder 99 not found, sir.")
+        self.tasks.cancel_reminder(1)
+        self.assertEqual(self.tasks.snooze_reminder(1), "Reminder 1 not found, sir.")
+        self.assertIsNone(REMINDERS.due_time(self.key))
+
+
+class ReminderSchedulerTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.scheduler = ReminderScheduler(name="luffy-test-reminders")
+    
+    def tearDown(self):
+        self.scheduler.shutdown()
+    
+    def test_cancel_and_snooze(self):
+        self.scheduler.schedule_in('a', 3600, lambda: None)
+        self.assertTrue(self.scheduler.snooze('a', 7200))
+        self.assertGreater(self.scheduler.due_time('a'), self.scheduler.clock() + 3600)
+        self.assertTrue(self.scheduler.cancel('a'))
+        self.assertFalse(self.scheduler.cancel('a'))
+        self.assertFalse(self.scheduler.snooze('a', 60))
+        self.assertEqual(len(self.scheduler), 0)
+    
+    def test_cancel_with_a_stale_entry_keeps_the_replacement(self):
+        stale = self.scheduler.schedule_in('a', 3600, lambda: None)
+        self.scheduler.schedule_in('a', 1800, lambda: None)
+        self.assertFalse(self.scheduler.cancel('a', stale))
+        self.assertIsNotNone(self.scheduler.due_time('a'))
+    
+    def test_due_reminders_fire_in_order_and_cancelled_ones_do_not(self):
+        fired = []
+        done = threading.Event()
+        self.scheduler.schedule_in('late', 0.05, lambda: (fired.append('late'), done.set()))
+        self.scheduler.schedule_in('early', 0.01, lambda: fired.append('early'))
+        self.scheduler.schedule_in('dropped', 0.02, lambda: fired.append('dropped'))
+        self.scheduler.cancel('dropped')
+        self.assertTrue(done.wait(5))
+        self.assertEqual(fired, ['early', 'late'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+"""
+L.U.F.F.Y Task Database tests - tasks.json import and id allocation in SQLite
+Run with: python -m unittest discover tests
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from task_automation import TaskAutomation
+from task_db import TaskDatabase
+
+
+def task(description, task_id=None):
+    return {'id': task_id, 'description': description, 'priority': 'medium', 'status': 'pending'}
+
+
+class TaskDatabaseTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.scratch = tempfile.TemporaryDirectory(prefix="luffy_test_")
+        self.data_dir = self.scratch.name
+        self.db_path = os.path.join(self.data_dir, "tasks.db")
+        self.json_path = os.path.join(self.data_dir, "tasks.json")
+    
+    def tearDown(self):
+        self.scratch.cleanup()
+    
+    def open_db(self):
+        db = TaskDatabase(self.db_path)
+        self.addCleanup(db.close)
+        return db
+    
+    def write_json(self, data):
+        with open(self.json_path, 'w') as f:
+            json.dump(data, f)
+    
+    def test_import_renames_the_file_and_runs_once(self):
+        self.write_json({
+            'tasks': [task("a", 1), task("b", 2), task("c", 2)],
+            'reminders': [{'id': 1, 'description': "call", 'remind_time': "2024-05-01T09:00:00", 'triggered': True}],
+            'automation_rules': [{'id': 1, 'trigger': {'type': 'time', 'time': "08:00"},
+                                  'action': {'type': 'speak'}, 'description': "wake"}],
+            'next_ids': {'task': 7},
+        })
+        db = self.open_db()
+        self.assertEqual(db.import_json(self.json_path), 5)
+        self.assertFalse(os.path.exists(self.json_path))
+        self.assertTrue(os.path.exists(self.json_path + ".imported"))
+        # The repeated id 2 gets a fresh one from past the stored counter
+        self.assertEqual([(row['id'], row['description']) for row in db.load('tasks')], [(1, "a"), (2, "b"), (7, "c")])
+        self.assertEqual(db.next_ids(), {'tasks': 8, 'reminders': 2, 'automation_rules': 2})
+        self.assertTrue(db.load('reminders')[0]['triggered'])
+        self.assertEqual(db.load('automation_rules')[0]['trigger'], {'type': 'time', 'time': "08:00"})
+        
+        # A tasks.json showing up again is not imported into a database that already has rows
+        self.write_json({'tasks': [task("late", 1)]})
+        self.assertEqual(db.import_json(self.json_path), 0)
+        self.assertTrue(os.path.exists(self.json_path))
+        self.assertEqual(len(db.load('tasks')), 3)
+    
+    def test_insert_allocates_increasing_ids_and_never_reuses_them(self):
+        db = self.open_db()
+        self.assertEqual([db.insert('tasks', task(name)) for name in "abc"], [1, 2, 3])
+        db.delete('tasks', 3)
+        self.assertEqual(db.insert('tasks', task("d")), 4)
+        self.assertEqual(db.insert('reminders', {'description': "call"}), 1)
+        self.assertEqual(db.next_ids(), {'tasks': 5, 'reminders': 2})
+    
+    def test_update_replaces_and_insert_skips_past_its_rows(self):
+        db = self.open_db()
+        record = task("a")
+        db.insert('tasks', record)
+        record['status'] = 'completed'
+        db.update('tasks', record)
+        self.assertEqual(db.load('tasks')[0]['status'], 'completed')
+        # Rows written behind the counter's back still push allocation past them
+        db.update('tasks', task("z", 10))
+        self.assertEqual(db.insert('tasks', task("b")), 11)
+    
+    def test_two_connections_get_distinct_ids(self):
+        first, second = self.open_db(), self.open_db()
+        ids = []
+        for _ in range(5):
+            ids.append(first.insert('tasks', task("first")))
+            ids.append(second.insert('tasks', task("second")))
+        self.assertEqual(ids, list(range(1, 11)))
+        self.assertEqual(len(first.load('tasks')), 10)
+    
+    def test_sqlite_backend_imports_and_keeps_allocating(self):
+        self.write_json({'tasks': [task("a", 1), task("b", 2)], 'next_ids': {'task': 5}})
+        tasks = TaskAutomation(self.data_dir, backend="sqlite")
+        self.addCleanup(tasks.close)
+        self.assertEqual(tasks.remove_task(2), "Task 2 removed, sir.")
+        tasks.add_task("c")
+        self.assertEqual(sorted(task['id'] for task in tasks.tasks), [1, 5])
+        self.assertEqual([row['id'] for row in self.open_db().load('tasks')], [1, 5])
+
+
+if __name__ == "__main__":
+    unittest.main()
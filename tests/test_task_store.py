@@ -0,0 +1,79 @@
+"""
+L.U.F.F.Y Task Store tests - Stable task ids and incrementally maintained indexes
+Run with: python -m unittest discover tests
+"""
+
+import datetime
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from task_automation import TaskAutomation
+from task_store import TaskStore
+
+
+class TaskStoreTest(unittest.TestCase):
+    
+    def test_removed_ids_are_not_reused(self):
+        store = TaskStore()
+        for description in ("a", "b", "c"):
+            store.add({'description': description, 'status': 'pending'})
+        store.remove(3)
+        store.remove(2)
+        self.assertEqual(store.add({'description': "d", 'status': 'pending'})['id'], 4)
+        self.assertEqual(sorted(store.by_id), [1, 4])
+    
+    def test_duplicate_ids_get_fresh_ones_on_load(self):
+        # Older tasks.json files handed out len(tasks) + 1, so ids could repeat
+        store = TaskStore([{'id': 1, 'status': 'pending'}, {'id': 2, 'status': 'pending'},
+                           {'id': 2, 'status': 'completed'}])
+        self.assertEqual(sorted(store.by_id), [1, 2, 3])
+        self.assertEqual(store.count('completed'), 1)
+        self.assertEqual(store.get(3)['status'], 'completed')
+    
+    def test_indexes_follow_updates_and_removals(self):
+        now = datetime.datetime(2024, 5, 1, 12, 0)
+        store = TaskStore()
+        store.add({'status': 'pending', 'priority': 'high', 'due_date': "2024-04-30T09:00:00"})
+        store.add({'status': 'pending', 'priority': 'low', 'due_date': "2024-04-29T09:00:00"})
+        store.add({'status': 'pending', 'priority': 'high', 'due_date': "2024-05-02T09:00:00"})
+        self.assertEqual([task['id'] for task in store.overdue(now)], [2, 1])
+        store.update(2, status='completed', completed="2024-05-01T10:00:00")
+        store.remove(1)
+        self.assertEqual(store.overdue(now), [])
+        self.assertEqual([task['id'] for task in store.with_priority('high')], [3])
+        self.assertEqual(store.completed_on(datetime.date(2024, 5, 1)), 1)
+
+
+class TaskIdPersistenceTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.scratch = tempfile.TemporaryDirectory(prefix="luffy_test_")
+        self.data_dir = self.scratch.name
+    
+    def tearDown(self):
+        self.scratch.cleanup()
+    
+    def test_ids_stay_stable_after_remove_and_reload(self):
+        tasks = TaskAutomation(self.data_dir, backend="json")
+        for description in ("wash the ship", "feed the crew", "chart the course"):
+            tasks.add_task(description)
+        self.assertEqual(tasks.remove_task(3), "Task 3 removed, sir.")
+        self.assertEqual(tasks.remove_task(3), "Task 3 not found, sir.")
+        tasks.close()
+        with open(os.path.join(self.data_dir, "tasks.json")) as f:
+            self.assertEqual(json.load(f)['next_ids']['task'], 4)
+        
+        reopened = TaskAutomation(self.data_dir, backend="json")
+        self.addCleanup(reopened.close)
+        reopened.add_task("find the treasure")
+        self.assertEqual(sorted(task['id'] for task in reopened.tasks), [1, 2, 4])
+        self.assertEqual(reopened.tasks.get(2)['description'], "feed the crew")
+
+
+if __name__ == "__main__":
+    unittest.main()
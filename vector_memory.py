@@ -0,0 +1,205 @@
+"""
+L.U.F.F.Y Vector Memory - Local embedding store for recalling relevant past turns
+Each turn is embedded with a signed hashing vectorizer (word unigrams and bigrams,
+no model download, no network) into a row of one contiguous float32 matrix that
+is memory-mapped from disk; recall is a single matrix product plus a top-k
+partition, so it stays fast with 100k+ stored turns. Needs NumPy; callers check
+NUMPY_AVAILABLE and go without recall when it is missing
+"""
+
+import json
+import os
+import re
+import threading
+import zlib
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+TOKEN_PATTERN = re.compile(r'\b\w+\b')
+
+# Function words carry no topic and would dilute short utterances
+STOPWORDS = frozenset('''
+a an the and or but if of to in on at for with from by about as is are was were be been am do does did
+i me my you your it its this that what how why when where who which can could would should will please
+'''.split())
+
+
+class HashingVectorizer:
+    """Feature-hashed bag of words and bigrams, log-scaled and L2-normalized"""
+    
+    def __init__(self, dim=256):
+        self.dim = dim
+    
+    def features(self, text):
+        tokens = [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+        return tokens + [a + ' ' + b for a, b in zip(tokens, tokens[1:])]
+    
+    def transform(self, text):
+        """One float32 vector of length dim (all zeros for text without words)"""
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature in self.features(text):
+            # crc32 rather than hash(): string hashes change between runs, stored vectors must not
+            code = zlib.crc32(feature.encode('utf-8'))
+            vector[code % self.dim] += 1.0 if code & 0x80000000 else -1.0
+        vector = np.sign(vector) * np.log1p(np.abs(vector))
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+    
+    def transform_batch(self, texts):
+        return np.vstack([self.transform(text) for text in texts]) if texts else np.zeros((0, self.dim), dtype=np.float32)
+
+
+class VectorMemory:
+    """Append-only turn store: vectors in a memory-mapped float32 matrix, turn text in a JSONL file"""
+    
+    INITIAL_CAPACITY = 1024  # Rows allocated up front; the matrix file doubles when full
+    
+    def __init__(self, directory, dim=256):
+        self.directory = directory
+        self.vectorizer = HashingVectorizer(dim)
+        self.dim = dim
+        self.vectors_path = os.path.join(directory, "vectors.f32")
+        self.turns_path = os.path.join(directory, "turns.jsonl")
+        self.turns = []
+        self.count = 0
+        self.matrix = None
+        self._lock = threading.Lock()
+        self._turns_file = None
+        self.load()
+    
+    def load(self):
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory)
+        meta_path = os.path.join(self.directory, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, 'r') as f:
+                if json.load(f).get('dim') != self.dim:
+                    # Vectors of another width can't be compared; start over rather than misread them
+                    for path in (self.vectors_path, self.turns_path):
+                        if os.path.exists(path):
+                            os.remove(path)
+        with open(meta_path, 'w') as f:
+            json.dump({'dim': self.dim}, f)
+        
+        if os.path.exists(self.turns_path):
+            intact = 0
+            with open(self.turns_path, 'rb') as f:
+                for line in f:
+                    # A turn counts once its metadata line is complete; its vector row was written first
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        self.turns.append(json.loads(line))
+                    except ValueError:
+                        break
+                    intact += len(line)
+            if intact < os.path.getsize(self.turns_path):
+                # Drop the torn tail so new turns start on a clean line
+                with open(self.turns_path, 'r+b') as f:
+                    f.truncate(intact)
+        capacity = self.INITIAL_CAPACITY
+        if os.path.exists(self.vectors_path):
+            capacity = max(capacity, os.path.getsize(self.vectors_path) // (self.dim * 4))
+        self.turns = self.turns[:capacity]
+        self.count = len(self.turns)
+        self._map(capacity)
+    
+    def _map(self, capacity):
+        """(Re)map the vector file with room for capacity rows"""
+        if self.matrix is not None:
+            self.matrix.flush()
+            del self.matrix
+        size = capacity * self.dim * 4
+        with open(self.vectors_path, 'ab') as f:
+            if f.tell() < size:
+                f.truncate(size)
+        self.matrix = np.memmap(self.vectors_path, dtype=np.float32, mode='r+', shape=(capacity, self.dim))
+    
+    def add(self, text, **fields):
+        """Embed text and store it with its fields (response, timestamp, ...); returns the row index"""
+        vector = self.vectorizer.transform(text)
+        turn = dict(fields, text=text)
+        with self._lock:
+            if self.count == len(self.matrix):
+                self._map(len(self.matrix) * 2)
+            row = self.count
+            self.matrix[row] = vector
+            if self._turns_file is None:
+                self._turns_file = open(self.turns_path, 'ab')
+            self._turns_file.write((json.dumps(turn) + '\n').encode('utf-8'))
+            self._turns_file.flush()
+            self.turns.append(turn)
+            self.count += 1
+        return row
+    
+    def search(self, query, k=3, min_score=0.1):
+        """The k stored turns most similar to query as (score, turn) pairs, best first"""
+        return self.search_batch([query], k, min_score)[0]
+    
+    def search_batch(self, queries, k=3, min_score=0.1):
+        """Top-k turns for several queries with one matrix product"""
+        queries_matrix = self.vectorizer.transform_batch(queries)
+        with self._lock:
+            count = self.count
+            if not count:
+                return [[] for _ in queries]
+            scores = self.matrix[:count] @ queries_matrix.T
+            turns = self.turns
+        results = []
+        k = min(k, count)
+        for column in scores.T:
+            top = np.argpartition(-column, k - 1)[:k]
+            top = top[np.argsort(-column[top])]
+            results.append([(float(column[row]), turns[row]) for row in top if column[row] >= min_score])
+        return results
+    
+    def __len__(self):
+        return self.count
+    
+    def close(self):
+        with self._lock:
+            if self.matrix is not None:
+                self.matrix.flush()
+            if self._turns_file is not None:
+                self._turns_file.close()
+                self._turns_file = None
+
+
+def benchmark_recall(turns=100000, dim=256, queries=20, seed=3):
+    """Add random turns to a temporary store and time single-query recall"""
+    import random
+    import shutil
+    import tempfile
+    import time
+    
+    rng = random.Random(seed)
+    vocabulary = ['word%d' % index for index in range(20000)]
+    directory = tempfile.mkdtemp()
+    try:
+        memory = VectorMemory(directory, dim)
+        start = time.perf_counter()
+        for _ in range(turns):
+            memory.add(' '.join(rng.choice(vocabulary) for _ in range(8)))
+        add_us = (time.perf_counter() - start) / turns * 1e6
+        timings = []
+        for _ in range(queries):
+            query = ' '.join(rng.choice(vocabulary) for _ in range(4))
+            start = time.perf_counter()
+            memory.search(query)
+            timings.append((time.perf_counter() - start) * 1000)
+        memory.close()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    timings.sort()
+    return {'turns': turns, 'dim': dim, 'add_us': add_us,
+            'search_p50_ms': timings[len(timings) // 2], 'search_max_ms': timings[-1]}
+
+
+if __name__ == "__main__":
+    report = benchmark_recall()
+    print(f"{report['turns']} turns x {report['dim']} dims: add {report['add_us']:.0f} us/turn, "
+          f"recall p50 {report['search_p50_ms']:.2f} ms, max {report['search_max_ms']:.2f} ms")